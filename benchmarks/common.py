@@ -23,6 +23,7 @@ from datalad.utils import (
 
 from datalad.api import (
     Dataset,
+    create,
     create_test_dataset,
 )
 
@@ -157,3 +158,45 @@ class SampleSuperDatasetBenchmarks(SuprocBenchmarks):
         self.ds = Dataset(epath_unique)
         self.repo = self.ds.repo
         self.log("Finished setup for %s", tempdir)
+
+
+class LargeDatasetBenchmarks(SuprocBenchmarks):
+    """
+    Setup a synthetic dataset with many (annexed) files in a single
+    repository, to measure how the memory use of commands scales with
+    the size of a tree
+    """
+
+    timeout = 3600
+
+    dsname = 'largeds'
+    tarfile = 'largeds.tar'
+    # 10000 files in total
+    ndirs = 50
+    nfiles_per_dir = 200
+
+    def setup_cache(self):
+        ds = create(self.dsname)
+        for d in range(self.ndirs):
+            dpath = op.join(self.dsname, 'd%d' % d)
+            os.mkdir(dpath)
+            for f in range(self.nfiles_per_dir):
+                with open(op.join(dpath, 'f%d' % f), 'w') as fp:
+                    fp.write('%d-%d' % (d, f))
+        ds.save(message='Add files')
+        self.log("Setup cache ds path %s. CWD: %s", ds.path, getpwd())
+        with tarfile.open(self.tarfile, "w") as tar:
+            from datalad.utils import rotree
+            rotree(self.dsname, ro=False, chmod_files=False)
+            tar.add(self.dsname, recursive=True)
+        rmtree(self.dsname)
+
+    def setup(self):
+        tempdir = tempfile.mkdtemp(
+            **get_tempfile_kwargs({}, prefix="bm_large")
+        )
+        self.remove_paths.append(tempdir)
+        with tarfile.open(self.tarfile) as tar:
+            tar.extractall(tempdir)
+        self.ds = Dataset(op.join(tempdir, self.dsname))
+        self.repo = self.ds.repo
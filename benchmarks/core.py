@@ -12,10 +12,15 @@ import sys
 import os.path as osp
 from os.path import join as opj
 import tarfile
+import tempfile
 import timeit
 
 from time import time
-from subprocess import call
+from subprocess import (
+    call,
+    check_output,
+    DEVNULL,
+)
 
 from datalad.cmd import (
     WitlessRunner,
@@ -34,6 +39,7 @@ from datalad.api import uninstall
 
 from datalad.utils import rmtree
 from datalad.utils import getpwd
+from datalad.utils import get_tempfile_kwargs
 
 # Some tracking example -- may be we should track # of datasets.datalad.org
 #import gc
@@ -42,7 +48,10 @@ from datalad.utils import getpwd
 #track_num_objects.unit = "objects"
 
 
-from .common import SuprocBenchmarks
+from .common import (
+    LargeDatasetBenchmarks,
+    SuprocBenchmarks,
+)
 
 scripts_dir = osp.join(osp.dirname(__file__), 'scripts')
 heavyout_cmd = "{} 1000".format(osp.join(scripts_dir, 'heavyout'))
@@ -69,6 +78,106 @@ class startup(SuprocBenchmarks):
         call([sys.executable, "-c", "import datalad.api"])
 
 
+# The peak RSS of a child also accounts for the memory of the process it was
+# forked from, so commands are started from a minimal Python process
+_maxrss_script = """\
+import resource, subprocess, sys
+subprocess.call(sys.argv[1:], stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL)
+print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+"""
+
+
+def _get_maxrss(cmd, **kwargs):
+    """Run a command and return its peak resident set size in kB"""
+    maxrss = int(check_output(
+        [sys.executable, "-c", _maxrss_script] + cmd, **kwargs))
+    # reported in bytes on OSX
+    return maxrss // 1024 if sys.platform == 'darwin' else maxrss
+
+
+class command_startup(SuprocBenchmarks):
+    """
+    Benchmarks for the cold start of datalad commands on an empty dataset
+
+    Those commands have nothing to do, so any regression is due to the
+    startup cost of datalad itself (e.g. new imports). Use
+    DATALAD_PROFILE_IMPORTS to find the modules to blame.
+    """
+
+    params = ['status', 'get', 'save']
+    param_names = ['command']
+
+    def setup(self, command):
+        python_path = osp.dirname(sys.executable)
+        self.env = os.environ.copy()
+        self.env['PATH'] = '%s:%s' % (python_path, self.env.get('PATH', ''))
+        self.path = tempfile.mkdtemp(
+            **get_tempfile_kwargs({}, prefix='bm_startup'))
+        self.remove_paths.append(self.path)
+        create(self.path)
+
+    def teardown(self, command):
+        self._cleanup()
+
+    def time_command(self, command):
+        call(["datalad", command, "."], cwd=self.path, env=self.env,
+             stdout=DEVNULL)
+
+    def track_maxrss_command(self, command):
+        return _get_maxrss(["datalad", command, "."],
+                           cwd=self.path, env=self.env)
+
+    track_maxrss_command.unit = "kB"
+
+
+class import_memory(SuprocBenchmarks):
+    """
+    Peak memory of importing datalad
+    """
+
+    def track_maxrss_import(self):
+        return _get_maxrss([sys.executable, "-c", "import datalad"])
+
+    track_maxrss_import.unit = "kB"
+
+    def track_maxrss_import_api(self):
+        return _get_maxrss([sys.executable, "-c", "import datalad.api"])
+
+    track_maxrss_import_api.unit = "kB"
+
+
+class large_dataset(LargeDatasetBenchmarks):
+    """
+    Peak memory of commands on a dataset with many files
+
+    Use datalad.runtime.profile-memory to find out where memory is spent.
+    """
+
+    def peakmem_status(self):
+        self.ds.status()
+
+    def peakmem_status_annex(self):
+        self.ds.status(annex='basic')
+
+
+class large_dataset_save(LargeDatasetBenchmarks):
+    """
+    Peak memory of saving many new files in a dataset with many files
+    """
+
+    def setup(self):
+        super().setup()
+        newdir = osp.join(self.ds.path, 'new')
+        os.mkdir(newdir)
+        for f in range(1000):
+            with open(osp.join(newdir, 'f%d' % f), 'w') as fp:
+                fp.write('new%d' % f)
+
+    def peakmem_save(self):
+        self.ds.save(message='Add new files')
+
+
 class witlessrunner(SuprocBenchmarks):
     """Some rudimentary tests to see if there is no major slowdowns of WitlessRunner
     """
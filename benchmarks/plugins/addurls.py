@@ -21,9 +21,9 @@ class addurls1(SuprocBenchmarks):
     params = [None, '*']
     param_names = ['exclude_metadata']
 
+    nfiles = 20
 
     def setup(self, exclude_metadata):
-        self.nfiles = 20
         self.temp = Path(
             tempfile.mkdtemp(
                 **get_tempfile_kwargs({}, prefix='bm_addurls1')))
@@ -61,3 +61,17 @@ class addurls1(SuprocBenchmarks):
             exclude_autometa=exclude_autometa
         )
         assert not any(r['status'] == 'error' for r in ret)
+
+
+class addurls_large(addurls1):
+    """Same as addurls1, but for many files, to also measure the peak memory
+    """
+
+    nfiles = 1000
+
+    def peakmem_addurls(self, exclude_autometa):
+        ret = dl.addurls(
+            self.ds, str(self.listfile), '{url}', '{filename}',
+            exclude_autometa=exclude_autometa
+        )
+        assert not any(r['status'] == 'error' for r in ret)
@@ -8,6 +8,7 @@
 """Benchmarks of the basic repos (Git/Annex) functionality"""
 
 from .common import (
+    LargeDatasetBenchmarks,
     SampleSuperDatasetBenchmarks,
     SuprocBenchmarks,
 )
@@ -21,3 +22,14 @@ class gitrepo(SampleSuperDatasetBenchmarks):
     def time_get_content_info(self):
         info = self.repo.get_content_info()
         assert isinstance(info, dict)   # just so we do not end up with a generator
+
+
+class large_gitrepo(LargeDatasetBenchmarks):
+
+    def peakmem_get_content_info(self):
+        info = self.repo.get_content_info()
+        assert isinstance(info, dict)
+
+    def peakmem_get_content_annexinfo(self):
+        info = self.repo.get_content_annexinfo(eval_availability=True)
+        assert isinstance(info, dict)
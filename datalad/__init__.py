@@ -26,6 +26,11 @@ if _seed:
     import random
     random.seed(_seed)
 
+# To troubleshoot startup delays, time all subsequent imports
+if os.environ.get('DATALAD_PROFILE_IMPORTS'):
+    from .support.importprofile import enable_from_environment
+    enable_from_environment()
+
 import atexit
 # Colorama (for Windows terminal colors) must be imported before we use/bind
 # any sys.stdout
@@ -8,7 +8,9 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Python DataLad API exposing user-oriented commands (also available via CLI)"""
 
-from datalad.coreapi import *
+# Should have no spurious imports/definitions at the module level.
+# Commands are only imported when they are first accessed (see below).
+from datalad.distribution.dataset import Dataset
 
 
 def _command_summary():
@@ -35,34 +37,27 @@ def _command_summary():
     return "\n".join(get_cmd_summaries(grp_short_descriptions, groups))
 
 
-__doc__ += "\n\n{}".format(_command_summary())
+def _get_command_specs():
+    """Return a mapping of API names to the specs of their interfaces
 
-
-def _load_plugins():
-    from datalad.plugin import _get_plugins
-    from datalad.plugin import _load_plugin
-    import re
-
-    camel = re.compile(r'([a-z])([A-Z])')
-
-    for pname, props in _get_plugins():
-        pi = _load_plugin(props['file'], fail=False)
-        if pi is None:
-            continue
-        globals()[camel.sub('\\1_\\2', pi.__name__).lower()] = pi.__call__
-
-
-def _generate_extension_api():
-    """Auto detect all available extensions and generate an API from them
+    Each name is mapped to a list of specs, in the order of precedence:
+    plugins replace commands of extensions, which replace built-in commands
+    of the same name, unless they fail to load.
     """
-    from importlib import import_module
-    from pkg_resources import iter_entry_points
-    from .interface.base import get_api_name
+    from datalad.interface.base import get_api_name
+    from datalad.interface.base import get_interface_groups
+    from datalad.plugin import _get_plugins
+    from datalad.support.entrypoints import iter_entry_points
 
     from datalad.dochelpers import exc_str
     import logging
     lgr = logging.getLogger('datalad.api')
 
+    specs = {}
+    for _, _, interfaces in get_interface_groups():
+        for intfspec in interfaces:
+            specs.setdefault(get_api_name(intfspec), []).insert(0, intfspec)
+
     for entry_point in iter_entry_points('datalad.extensions'):
         try:
             lgr.debug(
@@ -77,22 +72,89 @@ def _generate_extension_api():
             continue
 
         for intfspec in interfaces:
-            # turn the interface spec into an instance
-            mod = import_module(intfspec[0])
-            intf = getattr(mod, intfspec[1])
             api_name = get_api_name(intfspec)
-            if api_name in globals():
+            if api_name in specs:
                 lgr.debug(
                     'Command %s from extension %s is replacing a previously loaded implementation',
                     api_name,
                     entry_point.name)
-            globals()[api_name] = intf.__call__
+            specs.setdefault(api_name, []).insert(0, intfspec)
+
+    # plugins are named after their file
+    for pname, props in _get_plugins():
+        specs.setdefault(pname, []).insert(0, (pname, props))
+    return specs
+
+
+def _setup_lazy_api():
+    """Turn this module into one that loads commands on first access
+
+    Module-level `__getattr__` and `__dir__` resolve command names via
+    `_get_command_specs()`, which is only called once a command is
+    requested. The command summary in `__doc__` is composed on first
+    access of `__doc__` (e.g., by `help()`).
+    """
+    import sys
+    import threading
+    from types import ModuleType
+
+    from datalad.interface.base import load_interface
+
+    command_summary = _command_summary
+    get_command_specs = _get_command_specs
+
+    module = sys.modules[__name__]
+    namespace = module.__dict__
+    specs = {}
+    lock = threading.Lock()
+
+    def get_specs():
+        with lock:
+            if not specs:
+                specs.update(get_command_specs())
+        return specs
+
+    def __getattr__(name):
+        if name == '__all__':
+            return sorted(set(get_specs()).union(['Dataset']))
+        intf = None
+        if not name.startswith('_'):
+            for spec in get_specs().get(name, []):
+                intf = load_interface(spec)
+                if intf is not None:
+                    break
+        if intf is None:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name))
+        # any later access goes to the module dict directly
+        namespace[name] = intf.__call__
+        return namespace[name]
+
+    def __dir__():
+        return sorted(set(namespace).union(get_specs()))
+
+    doc = {'summary': None}
+
+    def get_doc(mod):
+        if doc['summary'] is None:
+            doc['summary'] = command_summary()
+            namespace['__doc__'] += "\n\n{}".format(doc['summary'])
+        return namespace['__doc__']
+
+    def set_doc(mod, value):
+        namespace['__doc__'] = value
+
+    class LazyAPIModule(ModuleType):
+        __doc__ = property(get_doc, set_doc)
+
+    namespace['__getattr__'] = __getattr__
+    namespace['__dir__'] = __dir__
+    module.__class__ = LazyAPIModule
 
 
-_generate_extension_api()
-_load_plugins()
+_setup_lazy_api()
 
 # Be nice and clean up the namespace properly
-del _load_plugins
-del _generate_extension_api
+del _setup_lazy_api
+del _get_command_specs
 del _command_summary
@@ -29,7 +29,9 @@ from .dochelpers import (
     exc_str,
 )
 from .support import path as op
+from .support.callaccounting import invalidate_memoized_calls
 from .support.exceptions import CommandError
+from .support.tracing import trace_span
 from .utils import (
     auto_repr,
     ensure_unicode,
@@ -261,6 +263,58 @@ class KillOutput(WitlessProtocol):
                 len(data), self.pid, self.FD_NAMES[fd])
 
 
+# protocol class -> subclass counting the bytes received
+_counting_protocols = {}
+
+
+def _get_counting_protocol(protocol):
+    """Return a subclass of a protocol that reports the bytes it received
+
+    The number of bytes received from stdout and stderr is reported
+    as a list under the '_nbytes' key of the result.
+    """
+    counting = _counting_protocols.get(protocol, None)
+    if counting is not None:
+        return counting
+
+    def __init__(self, *args, **kwargs):
+        protocol.__init__(self, *args, **kwargs)
+        self._nbytes = [0, 0]
+
+    def pipe_data_received(self, fd, data):
+        self._nbytes[fd - 1] += len(data)
+        protocol.pipe_data_received(self, fd, data)
+
+    def _prepare_result(self):
+        results = protocol._prepare_result(self)
+        results['_nbytes'] = self._nbytes
+        return results
+
+    counting = _counting_protocols[protocol] = type(
+        protocol.__name__, (protocol,), dict(
+            __init__=__init__,
+            pipe_data_received=pipe_data_received,
+            _prepare_result=_prepare_result,
+        ))
+    return counting
+
+
+def _get_span_name(cmd):
+    """Return a name of a command for tracing, e.g. 'git annex'"""
+    if isinstance(cmd, str):
+        return cmd.split(maxsplit=1)[0] if cmd.strip() else cmd
+    name = [op.basename(cmd[0])]
+    args = iter(cmd[1:])
+    for arg in args:
+        if arg in ('-c', '-C'):
+            # skip option value
+            next(args, None)
+        elif not arg.startswith('-'):
+            name.append(arg)
+            break
+    return ' '.join(name)
+
+
 class WitlessRunner(object):
     """Minimal Runner with support for online command output processing
 
@@ -360,6 +414,8 @@ class WitlessRunner(object):
             env or self.env,
             cwd=cwd,
         )
+        # any command could modify a repository
+        invalidate_memoized_calls()
 
         # rescue any event-loop to be able to reassign after we are done
         # with our own event loop management
@@ -376,18 +432,26 @@ class WitlessRunner(object):
             event_loop = self._get_new_event_loop()
             new_loop = True
         try:
-            # include the subprocess manager in the asyncio event loop
-            results = event_loop.run_until_complete(
-                run_async_cmd(
-                    event_loop,
-                    cmd,
-                    protocol,
-                    stdin,
-                    protocol_kwargs=kwargs,
-                    cwd=cwd,
-                    env=env,
+            with trace_span(_get_span_name(cmd), 'run',
+                            cmd=cmd, cwd=cwd) as span:
+                # include the subprocess manager in the asyncio event loop
+                results = event_loop.run_until_complete(
+                    run_async_cmd(
+                        event_loop,
+                        cmd,
+                        # count the output that is traced
+                        _get_counting_protocol(protocol)
+                        if span is not None else protocol,
+                        stdin,
+                        protocol_kwargs=kwargs,
+                        cwd=cwd,
+                        env=env,
+                    )
                 )
-            )
+                if span is not None:
+                    span['code'] = results.get('code', None)
+                    span['stdout_bytes'], span['stderr_bytes'] = \
+                        results.pop('_nbytes')
         finally:
             if new_loop:
                 # be kind to callers and leave asyncio as we found it
@@ -779,20 +843,53 @@ class BatchedCommand(SafeDelCloseMixin):
 
         and returns a single result.
         """
-        # TODO: add checks -- may be process died off and needs to be reinitiated
-        if not self._process:
+        self.send(arg)
+        return self.receive()
+
+    def send(self, arg):
+        """Send a single command argument without waiting for its result
+
+        Together with `receive()` this allows to keep multiple requests
+        outstanding. Each `send()` must be matched by a `receive()` before
+        the process is used via `proc1()` again.
+
+        Returns
+        -------
+        bool
+          True, if a new process was started for this command, e.g. because
+          the previous one terminated. Results of commands sent before, but
+          not received yet, are lost then.
+        """
+        started = not self._process
+        if started:
             self._initialize()
 
+        # batched processes (e.g. git-annex addurl or metadata) could modify
+        # a repository without going through WitlessRunner.run()
+        invalidate_memoized_calls()
         entry = arg + '\n'
         lgr.log(5, "Sending %r to batched command %s" % (entry, self))
         # apparently communicate is just a one time show
         # stdout, stderr = self._process.communicate(entry)
         # according to the internet wisdom there is no easy way with subprocess
-        self._check_process(restart=True)
+        alive, _ = self._check_process(restart=True)
         process = self._process  # _check_process might have restarted it
         process.stdin.write(entry)
         process.stdin.flush()
         lgr.log(5, "Done sending.")
+        return started or not alive
+
+    def receive(self):
+        """Receive the result of the oldest command sent via `send()`
+
+        Returns
+        -------
+        str or None
+          None, if the process is no longer running.
+        """
+        process = self._process
+        if not process:
+            return None
         still_alive, stderr = self._check_process(restart=False)
         # TODO: we might want to handle still_alive, e.g. to allow for
         #       a number of restarts/resends, but it should be per command
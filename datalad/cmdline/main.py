@@ -217,9 +217,16 @@ def setup_parser(
     else:  # the command to handle
         known_commands = get_commands_from_groups(interface_groups)
         if unparsed_arg not in known_commands:
-            # need to load all the extensions and try again
-            add_entrypoints_to_interface_groups(interface_groups)
-            known_commands = get_commands_from_groups(interface_groups)
+            # look up extension commands in the index, instead of loading
+            # all the extensions
+            extension_index = get_extension_command_index()
+            known_commands.update(
+                (c, tuple(e['spec'])) for c, e in extension_index.items())
+            if unparsed_arg in extension_index:
+                ext = extension_index[unparsed_arg]
+                interface_groups.append(
+                    (ext['group'], ext['group_descr'],
+                     [tuple(ext['spec'])]))
 
         if unparsed_arg not in known_commands:
             # check if might be coming from known extensions
@@ -386,7 +393,7 @@ def get_commands_from_groups(groups):
 
 def add_entrypoints_to_interface_groups(interface_groups):
     lgr.debug("Loading entrypoints")
-    from pkg_resources import iter_entry_points  # delay expensive import
+    from datalad.support.entrypoints import iter_entry_points
     for ep in iter_entry_points('datalad.extensions'):
         lgr.debug(
             'Loading entrypoint %s from datalad.extensions for docs building',
@@ -404,6 +411,59 @@ def add_entrypoints_to_interface_groups(interface_groups):
             lgr.warning('Failed to load entrypoint %s: %s', ep.name, exc_str(e))
             continue
 
+
+def get_extension_command_index():
+    """Return the commands that are provided by installed extensions
+
+    Loading all extension entry points is expensive, hence the index is
+    cached in 'datalad.locations.cache', and only rebuilt when the DataLad
+    version or the set of installed packages changes (see
+    `get_environment_fingerprint()`).
+
+    Returns
+    -------
+    dict
+      Mapping of command names to dicts with the 'group' and 'group_descr'
+      of the providing extension and the interface 'spec'.
+    """
+    import json
+    from ..interface.base import get_cmdline_command_name
+    from ..support.entrypoints import get_environment_fingerprint
+    index_path = os.path.join(
+        datalad.cfg.obtain('datalad.locations.cache'),
+        'cmdline', 'extension-commands.json')
+    fingerprint = get_environment_fingerprint()
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get('fingerprint') == fingerprint:
+            return index['commands']
+    except (OSError, ValueError) as e:
+        lgr.debug("Cannot use command index at %s: %s",
+                  index_path, exc_str(e))
+
+    groups = []
+    add_entrypoints_to_interface_groups(groups)
+    commands = {
+        get_cmdline_command_name(spec): dict(
+            group=group, group_descr=group_descr, spec=list(spec))
+        for group, group_descr, specs in groups
+        for spec in specs
+    }
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        # write to the side and move, concurrent calls might read it
+        tmp_path = '{}.{}'.format(index_path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(fingerprint=fingerprint, commands=commands), f)
+        os.replace(tmp_path, index_path)
+    except (OSError, TypeError) as e:
+        # e.g. a read-only cache, or specs that cannot be serialized
+        lgr.debug("Failed to store command index at %s: %s",
+                  index_path, exc_str(e))
+    return commands
+
+
 def _fix_datalad_ri(s):
     """Fixup argument if it was a DataLadRI and had leading / removed
 
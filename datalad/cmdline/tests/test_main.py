@@ -18,6 +18,8 @@ import datalad
 from ..main import (
     main,
     fail_with_short_help,
+    get_extension_command_index,
+    setup_parser,
     _fix_datalad_ri,
 )
 from datalad import __version__
@@ -41,6 +43,7 @@ from datalad.tests.utils import (
     assert_raises,
     in_,
     ok_startswith,
+    patch_config,
     assert_in,
     assert_re_in,
     assert_not_in,
@@ -312,3 +315,30 @@ def test_fix_datalad_ri():
     assert_equal(_fix_datalad_ri('///a'), '///a')
     assert_equal(_fix_datalad_ri('//a/b'), '///a/b')
     assert_equal(_fix_datalad_ri('///a/b'), '///a/b')
+
+
+@with_tempfile(mkdir=True)
+def test_extension_command_index(cachedir):
+    def add_fake_extension(groups):
+        groups.append(('fakeext', 'Fake extension',
+                       [('datalad.interface.clean', 'Clean', 'fake-clean')]))
+
+    with patch_config({'datalad.locations.cache': cachedir}), \
+            patch('datalad.cmdline.main.add_entrypoints_to_interface_groups',
+                  side_effect=add_fake_extension) as add_ep:
+        parser = setup_parser(['datalad', 'fake-clean'])
+        assert_equal(add_ep.call_count, 1)
+        # the index is used from now on, and the extension command is found
+        # without loading the extensions
+        parser = setup_parser(['datalad', 'fake-clean'])
+        assert_equal(add_ep.call_count, 1)
+        args = parser.parse_args(['fake-clean'])
+        assert_equal(args.func.__self__.__name__, 'Clean')
+        # core commands do not need the index
+        setup_parser(['datalad', 'clean'])
+        assert_equal(add_ep.call_count, 1)
+        # a changed environment invalidates the index
+        with patch('datalad.support.entrypoints.get_environment_fingerprint',
+                   return_value='changed'):
+            get_extension_command_index()
+        assert_equal(add_ep.call_count, 2)
@@ -29,7 +29,10 @@ from datalad.interface.common_opts import (
 from datalad.interface.utils import (
     eval_results,
 )
-from datalad.interface.results import annexjson2result
+from datalad.interface.results import (
+    ResultSummary,
+    annexjson2result,
+)
 from datalad.log import log_progress
 from datalad.support.annexrepo import (
     AnnexJsonProtocol,
@@ -61,6 +64,20 @@ from datalad.core.local.diff import diff_dataset
 lgr = logging.getLogger('datalad.core.distributed.push')
 
 
+class PushResultSummary(ResultSummary):
+    """Collects the unique hints of push results"""
+
+    def __init__(self):
+        super().__init__()
+        self.hints = []
+
+    def update(self, res):
+        super().update(res)
+        hint = res.get('hints', None)
+        if hint is not None and hint not in self.hints:
+            self.hints.append(hint)
+
+
 @build_doc
 class Push(Interface):
     """Push a dataset to a known :term:`sibling`.
@@ -273,12 +290,12 @@ class Push(Interface):
                 path=ds.path,
             )
 
+    custom_result_summary_aggregator = PushResultSummary
+
     @staticmethod
-    def custom_result_summary_renderer(results):  # pragma: more cover
+    def custom_result_summary_renderer(summary):  # pragma: more cover
         # report on any hints at the end
-        # get all unique hints
-        hints = set([r.get('hints', None) for r in results])
-        hints = [hint for hint in hints if hint is not None]
+        hints = summary.hints
         if hints:
             from datalad.ui import ui
             from datalad.support import ansi_colors
@@ -14,9 +14,16 @@ __docformat__ = 'restructuredtext'
 
 import logging
 import json
+from itertools import chain
+from weakref import WeakKeyDictionary
 
 lgr = logging.getLogger('datalad.core.local.resulthooks')
 
+# result keys by which hooks are indexed, in order of preference
+_index_keys = ('action', 'status', 'type')
+# ConfigManager -> (hook configuration, JsonHookMatcher or None)
+_matcher_cache = WeakKeyDictionary()
+
 
 def get_jsonhooks_from_config(cfg):
     """Parse out hook definitions given a ConfigManager instance
@@ -109,6 +116,26 @@ def match_jsonhook2result(hook, res, match):
       True if the given result matches the hook's match definition, or
       False otherwise.
     """
+    return compile_jsonhook_match(hook, match)(res)
+
+
+def compile_jsonhook_match(hook, match):
+    """Turn a hook's result match definition into a predicate
+
+    Parameters
+    ----------
+    hook : str
+      Name of the hook
+    match : dict
+      Match definition (see `match_jsonhook2result()`).
+
+    Returns
+    -------
+    callable
+      Takes a result dictionary, and returns True if the result matches
+      the definition, or False otherwise.
+    """
+    tests = []
     for k, v in match.items():
         # do not test 'k not in res', because we could have a match that
         # wants to make sure that a particular value is not present, and
@@ -118,24 +145,128 @@ def match_jsonhook2result(hook, res, match):
         # must be given
         action, val = (v[0], v[1]) if isinstance(v, list) else ('eq', v)
         if action == 'eq':
-            if k in res and res[k] == val:
-                continue
+            tests.append(lambda res, k=k, val=val: k in res and res[k] == val)
         elif action == 'neq':
-            if k not in res or res[k] != val:
-                continue
+            tests.append(
+                lambda res, k=k, val=val: k not in res or res[k] != val)
         elif action == 'in':
-            if k in res and res[k] in val:
-                continue
+            tests.append(lambda res, k=k, val=val: k in res and res[k] in val)
         elif action == 'nin':
-            if k not in res or res[k] not in val:
-                continue
+            tests.append(
+                lambda res, k=k, val=val: k not in res or res[k] not in val)
         else:
             lgr.warning(
-                'Unknown result comparison operation %s for hook %s, skipped',
+                'Unknown result comparison operation %s for hook %s, '
+                'hook will not match any result',
                 action, hook)
-        # indentation level is intended!
-        return False
-    return True
+            return lambda res: False
+    if len(tests) == 1:
+        return tests[0]
+    return lambda res: all(t(res) for t in tests)
+
+
+def _get_index_values(match):
+    """Return a key and the values it must have to match, if possible"""
+    for k in _index_keys:
+        if k not in match:
+            continue
+        v = match[k]
+        action, val = (v[0], v[1]) if isinstance(v, list) else ('eq', v)
+        if action == 'eq':
+            values = [val]
+        elif action == 'in' and isinstance(val, (list, tuple)):
+            values = val
+        else:
+            continue
+        try:
+            # values must be usable as dict keys
+            for value in values:
+                hash(value)
+        except TypeError:
+            continue
+        return k, values
+    return None
+
+
+class JsonHookMatcher(object):
+    """Determines the hooks a result matches
+
+    All match definitions are compiled into predicates once. Hooks whose
+    definition requires particular values of a result's 'action', 'status',
+    or 'type' are indexed by these values, such that only hooks that can
+    possibly match are tested against a result.
+
+    Parameters
+    ----------
+    hooks : dict
+      Hook definitions as returned by `get_jsonhooks_from_config()`.
+    """
+    def __init__(self, hooks):
+        self.hooks = hooks
+        # (key, value) -> [(position, hook, spec, predicate), ...]
+        self._index = {}
+        self._unindexed = []
+        for pos, (hook, spec) in enumerate(hooks.items()):
+            entry = (pos, hook, spec,
+                     compile_jsonhook_match(hook, spec['match']))
+            index = _get_index_values(spec['match'])
+            if index is None:
+                self._unindexed.append(entry)
+                continue
+            k, values = index
+            for value in values:
+                self._index.setdefault((k, value), []).append(entry)
+        self._keys = [k for k in _index_keys
+                      if any(i[0] == k for i in self._index)]
+
+    def __call__(self, res):
+        """Return the hooks that match a result
+
+        Returns
+        -------
+        list
+          (hook name, hook definition) tuples, in the order of the
+          definitions.
+        """
+        candidates = [self._unindexed] if self._unindexed else []
+        for k in self._keys:
+            try:
+                entries = self._index.get((k, res.get(k, None)))
+            except TypeError:
+                # unhashable value, cannot be equal to any indexed one
+                continue
+            if entries:
+                candidates.append(entries)
+        if not candidates:
+            return []
+        # every hook is present in at most one list
+        candidates = candidates[0] if len(candidates) == 1 \
+            else sorted(chain(*candidates), key=lambda e: e[0])
+        return [(hook, spec) for _, hook, spec, predicate in candidates
+                if predicate(res)]
+
+
+def get_jsonhook_matcher(cfg):
+    """Return a matcher for the hooks defined in a ConfigManager instance
+
+    The matcher is cached, and only recreated when the hook configuration
+    changes.
+
+    Returns
+    -------
+    JsonHookMatcher or None
+      None if no hooks are defined.
+    """
+    hook_cfg = tuple(
+        (k, cfg[k]) for k in cfg.keys()
+        if k.startswith('datalad.result-hook.'))
+    cached = _matcher_cache.get(cfg, None)
+    if cached is not None and cached[0] == hook_cfg:
+        return cached[1]
+    hooks = get_jsonhooks_from_config(cfg) if hook_cfg else None
+    matcher = JsonHookMatcher(hooks) if hooks else None
+    _matcher_cache[cfg] = (hook_cfg, matcher)
+    return matcher
 
 
 def run_jsonhook(hook, spec, res, dsarg=None):
@@ -30,6 +30,7 @@ from datalad.interface.common_opts import (
     recursion_limit,
     recursion_flag,
 )
+from datalad.interface.results import ResultSummary
 from datalad.interface.utils import eval_results
 import datalad.support.ansi_colors as ac
 from datalad.support.param import Parameter
@@ -160,6 +161,34 @@ def _yield_status(ds, paths, annexinfo, untracked, recursion_limit, queried,
                     yield r
 
 
+class StatusResultSummary(ResultSummary):
+    """Aggregates the annexed file sizes and the state of status results"""
+
+    def __init__(self):
+        super().__init__()
+        self.annexed = 0
+        self.annexed_size = 0
+        self.present_size = 0
+        # whether any result reports on content availability
+        self.have_availability = False
+        self.all_clean = True
+
+    def update(self, res):
+        super().update(res)
+        is_status = res.get('action', None) == 'status'
+        if is_status and 'key' in res and 'bytesize' in res:
+            size = int(res['bytesize'])
+            has_content = res.get('has_content', None)
+            self.annexed += 1
+            self.annexed_size += size
+            if has_content is not None:
+                self.have_availability = True
+            if has_content:
+                self.present_size += size
+        if not (is_status and res.get('state', None) == 'clean'):
+            self.all_clean = False
+
+
 @build_doc
 class Status(Interface):
     """Report on the state of dataset content.
@@ -453,35 +482,28 @@ class Status(Interface):
             type_=' ({})'.format(
                 ac.color_word(type_, ac.MAGENTA) if type_ else '')))
 
+    custom_result_summary_aggregator = StatusResultSummary
+
     @staticmethod
-    def custom_result_summary_renderer(results):  # pragma: more cover
-        # fish out sizes of annexed files. those will only be present
-        # with --annex ...
-        annexed = [
-            (int(r['bytesize']), r.get('has_content', None))
-            for r in results
-            if r.get('action', None) == 'status' \
-            and 'key' in r and 'bytesize' in r]
-        if annexed:
-            have_availability = any(a[1] is not None for a in annexed)
-            total_size = bytes2human(sum(a[0] for a in annexed))
+    def custom_result_summary_renderer(summary):  # pragma: more cover
+        # sizes of annexed files will only be present with --annex ...
+        if summary.annexed:
+            total_size = bytes2human(summary.annexed_size)
             # we have availability info encoded in the results
             from datalad.ui import ui
-            if have_availability:
+            if summary.have_availability:
                 ui.message(
                     "{} annex'd {} ({}/{} present/total size)".format(
-                        len(annexed),
-                        single_or_plural('file', 'files', len(annexed)),
-                        bytes2human(sum(a[0] for a in annexed if a[1])),
+                        summary.annexed,
+                        single_or_plural('file', 'files', summary.annexed),
+                        bytes2human(summary.present_size),
                         total_size))
             else:
                 ui.message(
                     "{} annex'd {} ({} recorded total size)".format(
-                        len(annexed),
-                        single_or_plural('file', 'files', len(annexed)),
+                        summary.annexed,
+                        single_or_plural('file', 'files', summary.annexed),
                         total_size))
-        if all(r.get('action', None) == 'status'
-               and r.get('state', None) == 'clean'
-               for r in results):
+        if summary.all_clean:
             from datalad.ui import ui
             ui.message("nothing to save, working tree clean")
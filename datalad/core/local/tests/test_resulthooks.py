@@ -8,6 +8,8 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Test result hooks"""
 
+from collections import OrderedDict
+
 from datalad.utils import (
     on_windows,
 )
@@ -21,6 +23,11 @@ from datalad.api import (
     Dataset,
     install,
 )
+from ..resulthooks import (
+    JsonHookMatcher,
+    get_jsonhook_matcher,
+    match_jsonhook2result,
+)
 
 
 @with_tempfile()
@@ -117,3 +124,50 @@ def test_basics(src, dst):
         ok_(not annoyed_file.exists())
         clone.get('file1')
         ok_(annoyed_file.exists())
+
+
+def test_jsonhook_matcher():
+    hooks = OrderedDict([
+        ('any_ok', dict(cmd='c1', args='{{}}', match={'status': 'ok'})),
+        ('file_get', dict(cmd='c2', args='{{}}', match={
+            'type': ['in', ['file', 'symlink']], 'action': 'get'})),
+        ('no_dataset', dict(cmd='c3', args='{{}}', match={
+            'type': ['neq', 'dataset']})),
+        ('bogus', dict(cmd='c4', args='{{}}', match={'type': ['xx', 1]})),
+    ])
+    match = JsonHookMatcher(hooks)
+
+    def matching(**res):
+        names = [h for h, _ in match(res)]
+        # same as testing each hook individually
+        eq_(names, [h for h, spec in hooks.items()
+                    if match_jsonhook2result(h, res, spec['match'])])
+        return names
+
+    eq_(matching(action='get', status='ok', type='file'),
+        ['any_ok', 'file_get', 'no_dataset'])
+    eq_(matching(action='get', status='error', type='symlink'),
+        ['file_get', 'no_dataset'])
+    eq_(matching(action='get', status='ok', type='dataset'), ['any_ok'])
+    eq_(matching(action='drop', status='error', type='file'), ['no_dataset'])
+    eq_(matching(action='get', status='error'), ['no_dataset'])
+    # unhashable values do not break the lookup
+    eq_(matching(action=['get'], status=['ok'], type='dataset'), [])
+
+
+@with_tempfile(mkdir=True)
+def test_jsonhook_matcher_cache(path):
+    ds = Dataset(path).create()
+    eq_(get_jsonhook_matcher(ds.config), None)
+    ds.config.set('datalad.result-hook.h.call-json', 'wtf', where='local')
+    ds.config.set('datalad.result-hook.h.match-json', '{"action": "get"}',
+                  where='local')
+    match = get_jsonhook_matcher(ds.config)
+    ok_(match is get_jsonhook_matcher(ds.config))
+    eq_([h for h, _ in match(dict(action='get'))], ['h'])
+    # a change of the hook configuration is detected
+    ds.config.set('datalad.result-hook.h.match-json', '{"action": "drop"}',
+                  where='local')
+    match = get_jsonhook_matcher(ds.config)
+    eq_(match(dict(action='get')), [])
+    eq_([h for h, _ in match(dict(action='drop'))], ['h'])
@@ -14,6 +14,7 @@ from logging import getLogger
 
 import os
 import re
+import threading
 from os.path import dirname, abspath, join as pathjoin
 from urllib.parse import urlparse
 from collections import OrderedDict
@@ -35,6 +36,7 @@ from ..support.configparserinc import SafeConfigParserWithIncludes
 from ..support.external_versions import external_versions
 from ..support.network import RI
 from ..support import path
+from ..dochelpers import exc_str
 from ..utils import auto_repr
 from ..utils import ensure_list_from_str
 from ..utils import get_dataset_root
@@ -132,18 +134,21 @@ class Provider(object):
         """
         if self._downloader is None:
             # we need to create a new one
-            Downloader = self._get_downloader_class(url)
-            # we might need to provide it with credentials and authenticator
-            # Let's do via kwargs so we could accomodate cases when downloader does not necessarily
-            # cares about those... duck typing or what it is in action
-            kwargs = kwargs.copy()
-            if self.credential:
-                kwargs['credential'] = self.credential
-            if self.authenticator:
-                kwargs['authenticator'] = self.authenticator
-            self._downloader = Downloader(**kwargs)
+            self._downloader = self._new_downloader(url, **kwargs)
         return self._downloader
 
+    def _new_downloader(self, url, **kwargs):
+        Downloader = self._get_downloader_class(url)
+        # we might need to provide it with credentials and authenticator
+        # Let's do via kwargs so we could accomodate cases when downloader does not necessarily
+        # cares about those... duck typing or what it is in action
+        kwargs = kwargs.copy()
+        if self.credential:
+            kwargs['credential'] = self.credential
+        if self.authenticator:
+            kwargs['authenticator'] = self.authenticator
+        return Downloader(**kwargs)
+
 
 class Providers(object):
     """
@@ -487,6 +492,60 @@ type = {credential_type}
     def get_status(self, url, *args, **kwargs):
         return self.get_provider(url).get_downloader(url).get_status(url, *args, **kwargs)
 
+    def get_status_many(self, urls, jobs=None):
+        """Get the status of many URLs concurrently
+
+        URLs are probed by `jobs` threads. Each thread uses its own
+        downloader (and thereby session) per provider, and reuses it for all
+        URLs of that provider it probes.
+
+        Parameters
+        ----------
+        urls : iterable of str
+          URLs are consumed lazily. Repeated URLs are probed only once.
+        jobs : int or None or "auto", optional
+          Number of threads, see `ProducerConsumer`.
+
+        Returns
+        -------
+        generator
+          (url, status) tuples in the order in which probes complete, one
+          for each distinct URL. The
+          status is the return value of `get_status()`, or the exception
+          that it raised.
+        """
+        from ..support.parallel import ProducerConsumer
+
+        local = threading.local()
+        lock = threading.Lock()
+
+        def get_status(url):
+            with lock:
+                # could initialize a default provider
+                provider = self.get_provider(url)
+            downloaders = getattr(local, 'downloaders', None)
+            if downloaders is None:
+                downloaders = local.downloaders = {}
+            try:
+                downloader = downloaders.get(id(provider))
+                if downloader is None:
+                    downloader = downloaders[id(provider)] = \
+                        provider._new_downloader(url)
+                return url, downloader.get_status(url)
+            except Exception as exc:
+                lgr.debug("Failed to get status of %s: %s", url, exc_str(exc))
+                return url, exc
+
+        def unique(urls):
+            # ProducerConsumer requires unique items
+            seen = set()
+            for url in urls:
+                if url not in seen:
+                    seen.add(url)
+                    yield url
+
+        yield from ProducerConsumer(unique(urls), get_status, jobs=jobs)
+
     def needs_authentication(self, url):
         provider = self.get_provider(url, only_nondefault=True)
         if provider is None:
@@ -10,9 +10,11 @@
 """
 
 import re
+import threading
 
 from urllib.parse import urlsplit, unquote as urlunquote
 
+from .. import cfg
 from ..utils import (
     auto_repr,
     ensure_dict_from_str,
@@ -31,6 +33,7 @@ from .base import Authenticator
 from .base import BaseDownloader, DownloaderSession
 from ..support.exceptions import (
     AccessPermissionExpiredError,
+    IncompleteDownloadError,
     TargetFileAbsent,
 )
 from ..support.s3 import (
@@ -41,6 +44,7 @@ from ..support.s3 import (
     get_bucket,
     try_multiple_dec_s3,
 )
+from ..support.s3listing import get_bucket_snapshot
 from ..support.status import FileStatus
 
 import logging
@@ -141,6 +145,13 @@ class S3DownloaderSession(DownloaderSession):
                 except:  # MIH: what does it do? MemoryError?
                     pass  # do not let pbar spoil our fun
 
+        total = self.key.size if size is None else min(size, self.key.size)
+        jobs = cfg.obtain('datalad.s3.download-jobs')
+        part_size = cfg.obtain('datalad.s3.download-part-size') * 1024 ** 2
+        if f and getattr(f, 'seekable', lambda: False)() \
+                and jobs > 1 and part_size > 0 and total > part_size:
+            return self._download_parts(f, pbar, total, part_size, jobs)
+
         headers = {}
         # report for every % for files > 10MB, otherwise every 10%
         kwargs = dict(headers=headers, cb=pbar_callback,
@@ -154,6 +165,48 @@ class S3DownloaderSession(DownloaderSession):
         else:
             return self.key.get_contents_as_string(encoding=None, **kwargs)
 
+    def _download_parts(self, f, pbar, total, part_size, jobs):
+        """Download the first `total` bytes in parts of `part_size` in parallel
+
+        Each part is written into `f` at its offset as soon as it is
+        received, nothing is stored elsewhere.
+        """
+        from ..support.parallel import ProducerConsumer
+
+        key = self.key
+        parts = [(start, min(start + part_size, total) - 1)
+                 for start in range(0, total, part_size)]
+        offset = f.tell()
+        lock = threading.Lock()
+        downloaded = [0]
+
+        def fetch_part(part):
+            start, end = part
+            # boto keys keep the state of a request, so one per part
+            part_key = Key(bucket=key.bucket, name=key.name)
+            part_key.version_id = key.version_id
+            data = try_multiple_dec_s3(part_key.get_contents_as_string)(
+                headers={'Range': 'bytes=%d-%d' % (start, end)},
+                encoding=None)
+            if len(data) != end - start + 1:
+                raise IncompleteDownloadError(
+                    "Received %d bytes instead of %d for bytes %d-%d of %s"
+                    % (len(data), end - start + 1, start, end, key.name))
+            with lock:
+                f.seek(offset + start)
+                f.write(data)
+                downloaded[0] += len(data)
+                if pbar:
+                    try:
+                        pbar.update(downloaded[0])
+                    except:  # see pbar_callback in download()
+                        pass
+            return start
+
+        for _ in ProducerConsumer(parts, fetch_part, jobs=jobs):
+            pass
+        f.seek(offset + total)
+
 
 @auto_repr
 class S3Downloader(BaseDownloader):
@@ -242,6 +295,13 @@ class S3Downloader(BaseDownloader):
                 "Credential %s has expired" % self.credential)
 
     def _get_key(self, key_name, version_id=None, headers=None):
+        snapshot = get_bucket_snapshot(self._bucket.name)
+        if snapshot and not headers:
+            key = snapshot.get_key(key_name, version_id=version_id,
+                                   bucket=self._bucket)
+            if key is not False:
+                lgr.debug("Using key %s from %s", key_name, snapshot)
+                return key
         try:
             return self._bucket.get_key(key_name, version_id=version_id, headers=headers)
         except S3ResponseError as e:
@@ -361,7 +421,10 @@ class S3Downloader(BaseDownloader):
         }
 
         if key.last_modified:
-            headers['Last-Modified'] = rfc2822_to_epoch(key.last_modified)
+            # keys from listings come with ISO 8601 dates
+            headers['Last-Modified'] = (
+                iso8601_to_epoch if re.match(r'\d{4}-', key.last_modified)
+                else rfc2822_to_epoch)(key.last_modified)
 
         # Consult about filename
         url_filename = get_url_straight_filename(url)
@@ -23,8 +23,10 @@ from ...tests.utils import assert_in
 from ...tests.utils import assert_false
 from ...tests.utils import assert_greater
 from ...tests.utils import assert_equal
+from ...tests.utils import assert_is_instance
 from ...tests.utils import assert_raises
 from ...tests.utils import ok_exists
+from ...tests.utils import serve_path_via_http
 from ...tests.utils import swallow_logs
 from ...tests.utils import with_tempfile
 from ...tests.utils import with_tree
@@ -255,3 +257,28 @@ def test_providers_badre(path):
     with swallow_logs(logging.WARNING) as msg:
         the_chosen_one = providers.get_provider('https://foo.org/data')
         assert_in("Invalid regex", msg.out)
+
+
+@with_tree(tree={'a.txt': 'aaa', 'b.txt': 'bb'})
+@serve_path_via_http
+def test_get_status_many(path, url):
+    providers = Providers.from_config_files()
+    urls = [url + 'a.txt', url + 'b.txt', url + 'nothere.txt']
+    statuses = dict(providers.get_status_many(iter(urls), jobs=2))
+    assert_equal(set(statuses), set(urls))
+    assert_equal(statuses[urls[0]].size, 3)
+    assert_equal(statuses[urls[1]].size, 2)
+    assert_is_instance(statuses[urls[2]], Exception)
+
+
+@with_tree(tree={'a.txt': 'aaa'})
+@serve_path_via_http
+def test_get_status_many_duplicates(path, url):
+    providers = Providers.from_config_files()
+    urls = [url + 'a.txt', url + 'a.txt', url + 'nothere.txt',
+            url + 'a.txt']
+    for jobs in (None, 2):
+        statuses = list(providers.get_status_many(iter(urls), jobs=jobs))
+        assert_equal(sorted(u for u, _ in statuses),
+                     sorted([url + 'a.txt', url + 'nothere.txt']))
+        assert_equal(dict(statuses)[urls[0]].size, 3)
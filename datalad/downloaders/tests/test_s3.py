@@ -9,6 +9,7 @@
 """Tests for S3 downloader"""
 
 import os
+from glob import glob
 from unittest.mock import patch
 
 from ..s3 import S3Authenticator
@@ -214,6 +215,57 @@ def test_get_key():
         yield check_get_key, b, p, v
 
 
+@with_tempfile
+def test_download_parts(tempfile):
+    from ..s3 import S3DownloaderSession
+    from ...tests.utils import patch_config
+
+    content = os.urandom(3 * 1024 ** 2 + 10)
+    requested = []
+    fail_at = [1024 ** 2]
+
+    class FakeKey(object):
+        def __init__(self, bucket=None, name=None):
+            self.bucket, self.name = bucket, name
+            self.size = len(content)
+            self.version_id = self.etag = None
+
+        def get_contents_as_string(self, headers=None, encoding=None):
+            start, end = map(int, headers['Range'][6:].split('-'))
+            if start in fail_at:
+                raise RuntimeError("connection broke")
+            requested.append(start)
+            return content[start:end + 1]
+
+    session = S3DownloaderSession(size=len(content), key=FakeKey(name='k'))
+    with patch('datalad.downloaders.s3.Key', FakeKey), \
+            patch_config({'datalad.s3.download-jobs': '2',
+                          'datalad.s3.download-part-size': '1'}):
+        with open(tempfile, 'wb') as f:
+            assert_raises(RuntimeError, session.download, f)
+        # nothing is left next to the download
+        assert(requested)
+        assert_equal(glob(tempfile + '*'), [tempfile])
+
+        del requested[:]
+        del fail_at[:]
+        with open(tempfile, 'wb') as f:
+            session.download(f)
+            # positioned at the end, like after a sequential download
+            assert_equal(f.tell(), len(content))
+        assert_equal(sorted(requested), [i * 1024 ** 2 for i in range(4)])
+        with open(tempfile, 'rb') as f:
+            assert_equal(f.read(), content)
+
+        # limited size
+        del requested[:]
+        with open(tempfile, 'wb') as f:
+            session.download(f, size=2 * 1024 ** 2 + 1)
+        assert_equal(sorted(requested), [0, 1024 ** 2, 2 * 1024 ** 2])
+        with open(tempfile, 'rb') as f:
+            assert_equal(f.read(), content[:2 * 1024 ** 2 + 1])
+
+
 # not really to be ran as part of the tests since it does
 # largely nothing but wait for token to expire!
 # It is still faster than waiting for real case to crash
@@ -262,6 +262,17 @@ definitions = {
         'ui': ('question', {
                'title': 'Runs TraceBack function with collide set to True, if this flag is set to "collide". This replaces any common prefix between current traceback log and previous invocation with "..."'}),
     },
+    'datalad.trace.file': {
+        'ui': ('question', {
+               'title': 'File to write a performance trace to',
+               'text': 'If set, executions of external commands, DataLad '
+                       'commands, and parallel jobs are recorded in this '
+                       'file in the Chrome trace event format. '
+                       'A "{pid}" placeholder is replaced by the process '
+                       'ID. Without it, processes started by the traced '
+                       'process write to a file with their process ID '
+                       'inserted before the extension.'}),
+    },
     'datalad.ssh.identityfile': {
         'ui': ('question', {
                'title': "If set, pass this file as ssh's -i option."}),
@@ -318,6 +329,34 @@ definitions = {
                'title': 'Native dataset metadata scheme',
                'text': 'Set this label to engage a particular metadata extraction parser'}),
     },
+    'datalad.metadata.extractor-cache': {
+        'ui': ('yesno', {
+               'title': 'Cache content metadata of extractors',
+               'text': 'If this flag is enabled, content metadata reported by extractors that support it are cached by the identity of the file content (annex key or Git blob shasum), and only files with new content are processed on re-extraction'}),
+        'type': EnsureBool(),
+        'default': True,
+    },
+    'datalad.metadata.extractor-jobs': {
+        'ui': ('question', {
+               'title': 'Number of processes for content metadata extraction',
+               'text': 'Extractors that support it process files in batches across this number of worker processes'}),
+        'type': EnsureInt(),
+        'default': 1,
+    },
+    'datalad.metadata.extractor-batch-size': {
+        'ui': ('question', {
+               'title': 'Batch size for content metadata extraction',
+               'text': 'Number of files passed to a worker process at once, when content metadata extraction is performed with multiple processes'}),
+        'type': EnsureInt(),
+        'default': 100,
+    },
+    'datalad.metadata.extractor-timeout': {
+        'ui': ('question', {
+               'title': 'Per-file timeout for content metadata extraction',
+               'text': 'Time in seconds after which metadata extraction from a single file in a worker process is aborted, and the file skipped'}),
+        'type': EnsureInt() | EnsureNone(),
+        'default': None,
+    },
     'datalad.metadata.store-aggregate-content': {
         'ui': ('question', {
                'title': 'Aggregated content metadata storage',
@@ -361,6 +400,13 @@ definitions = {
         'type': EnsureInt(),
         'default': 1,
     },
+    'datalad.runtime.profile-memory': {
+        'ui': ('question', {
+               'title': 'Report the memory use of commands',
+               'text': "If set to 'rss', the resident set size of the process is sampled while a DataLad command is executed, and its peak, overall and per dataset, is written to stderr at the end of the command. 'tracemalloc' additionally traces memory allocations and reports the largest ones, which slows down the execution considerably"}),
+        'type': EnsureChoice('rss', 'tracemalloc'),
+        'default': None,
+    },
     'datalad.runtime.raiseonerror': {
         'ui': ('question', {
                'title': 'Error behavior',
@@ -368,6 +414,20 @@ definitions = {
         'type': EnsureBool(),
         'default': False,
     },
+    'datalad.runtime.memoize-git-calls': {
+        'ui': ('yesno', {
+               'title': 'Reuse the output of read-only git calls',
+               'text': 'If enabled, the output of identical read-only git calls in the same repository is reused for the duration of a DataLad command, until any other external command is executed. Modifications that are made without executing an external command are not detected, hence this is an experimental feature'}),
+        'type': EnsureBool(),
+        'default': False,
+    },
+    'datalad.runtime.report-git-calls': {
+        'ui': ('yesno', {
+               'title': 'Report repeated git calls',
+               'text': 'If enabled, a report of identical git and git-annex calls that were made repeatedly during the execution of a DataLad command is written to stderr'}),
+        'type': EnsureBool(),
+        'default': False,
+    },
     'datalad.runtime.report-status': {
         'ui': ('question', {
                'title': 'Command line result reporting behavior',
@@ -405,6 +465,17 @@ definitions = {
         'default': 'auto',
         'type': EnsureChoice('on', 'off', 'auto'),
     },
+    'datalad.ui.json-encoder': {
+        'ui': ('question', {
+            'title': 'Encoder of JSON results',
+            'text': "Module that serializes results for the 'json' and "
+                    "'json_pp' output formats. 'orjson' is faster, if it is "
+                    "installed, but its output has no spaces after "
+                    "separators, contains non-ASCII characters unescaped, "
+                    "and reports NaN as null."}),
+        'default': 'json',
+        'type': EnsureChoice('json', 'orjson'),
+    },
     'datalad.save.no-message': {
         'ui': ('question', {
             'title': 'Commit message handling',
@@ -427,4 +498,89 @@ definitions = {
         'default': True,
         'type': EnsureBool(),
     },
+    'datalad.addurls.max-rows-in-memory': {
+        'ui': ('question', {
+            'title': 'Maximum number of addurls rows held in memory',
+            'text': "Addurls reads and adds the rows of its input in chunks "
+                    "of at most this many rows, and keeps the list of files "
+                    "to save on disk if there is more than one chunk. File "
+                    "name collisions within the first chunk are reported "
+                    "before any file is added, later ones stop the run "
+                    "after the files of the previous chunks were added. "
+                    "Zero reads the whole input at once."}),
+        'default': 10000,
+        'type': EnsureInt(),
+    },
+    'datalad.addurls.batch-window': {
+        'ui': ('question', {
+            'title': 'Number of outstanding addurl requests',
+            'text': "Maximum number of URLs that addurls hands to a "
+                    "dataset's batched 'git annex addurl' process before "
+                    "waiting for the result of the oldest one. "
+                    "A value below 2 sends one URL at a time."}),
+        'default': 20,
+        'type': EnsureInt(),
+    },
+    'datalad.addurls.annex-jobs': {
+        'ui': ('question', {
+            'title': 'Number of parallel git-annex addurl jobs',
+            'text': "Number of parallel jobs (--jobs) of each batched "
+                    "'git annex addurl' process started by addurls. "
+                    "Only effective with a 'datalad.addurls.batch-window' "
+                    "of 2 or more."}),
+        'default': 1,
+        'type': EnsureInt(),
+    },
+    'datalad.addurls.save-interval': {
+        'ui': ('question', {
+            'title': 'Number of files after which addurls saves',
+            'text': "If set to a positive number, addurls saves each "
+                    "dataset after adding this many files to it, and "
+                    "records the save in its journal, rather than saving "
+                    "all files only at the end. "
+                    "Zero disables intermediate saves."}),
+        'default': 0,
+        'type': EnsureInt(),
+    },
+    'datalad.s3.listing-cache-ttl': {
+        'ui': ('question', {
+            'title': 'Lifetime of S3 bucket listing snapshots',
+            'text': "If positive, recursive listings of S3 buckets by 'ls' "
+                    "are recorded in the cache directory, and for this many "
+                    "seconds afterwards, status, size, and version queries "
+                    "for keys covered by such a listing are answered from "
+                    "it instead of requesting each key from S3. "
+                    "Zero disables these snapshots."}),
+        'default': 0,
+        'type': EnsureInt(),
+    },
+    'datalad.s3.download-jobs': {
+        'ui': ('question', {
+            'title': 'Number of parallel connections per S3 download',
+            'text': "If greater than 1, S3 objects larger than "
+                    "'datalad.s3.download-part-size' are downloaded in "
+                    "parts via this many parallel connections."}),
+        'default': 1,
+        'type': EnsureInt(),
+    },
+    'datalad.s3.download-part-size': {
+        'ui': ('question', {
+            'title': 'Size of parts of parallel S3 downloads',
+            'text': "Size in MiB of the parts of S3 objects downloaded in "
+                    "parallel (see 'datalad.s3.download-jobs')."}),
+        'default': 64,
+        'type': EnsureInt(),
+    },
+    'datalad.addurls.key-jobs': {
+        'ui': ('question', {
+            'title': 'Number of threads registering keys in addurls',
+            'text': "Number of threads per dataset that addurls uses to "
+                    "create files from user-supplied keys (--key). Each "
+                    "thread examines keys with its own batched "
+                    "git-annex process and writes pointer files, whereas "
+                    "URLs are registered and files are staged by a single "
+                    "process."}),
+        'default': 1,
+        'type': EnsureInt(),
+    },
 }
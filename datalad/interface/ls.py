@@ -12,6 +12,10 @@ __docformat__ = 'restructuredtext'
 
 import humanize
 import sys
+from itertools import (
+    chain,
+    islice,
+)
 import string
 import time
 
@@ -599,78 +603,95 @@ def _ls_s3(loc, fast=False, recursive=False, all_=False, long_=False,
         bucket.list
     ]
 
-    prefix_all_versions = None
+    # A recursive listing is complete, record it for later queries
+    from ..support.s3listing import get_bucket_snapshot
+    snapshot = get_bucket_snapshot(bucket_name) if recursive else None
+
+    entries = None
     got_versioned_list = False
     for acc in ACCESS_METHODS:
         try:
-            prefix_all_versions = list(acc(prefix, **kwargs))
+            entries = acc(prefix, **kwargs)
+            if snapshot:
+                entries = snapshot.record(
+                    entries, prefix or '',
+                    versioned=acc is bucket.list_versions)
+            entries = iter(entries)
+            # listings are fetched lazily, access problems surface with
+            # the first page
+            first = next(entries, None)
             got_versioned_list = acc is bucket.list_versions
             break
         except Exception as exc:
+            entries = None
             lgr.debug("Failed to access via %s: %s", acc, exc_str(exc))
 
-    if not prefix_all_versions:
-        ui.error("No output was provided for prefix %r" % prefix)
-    else:
-        max_length = max((len(e.name) for e in prefix_all_versions))
-        max_size_length = max((len(str(getattr(e, 'size', 0))) for e in prefix_all_versions))
-
     results = []
-    for e in prefix_all_versions:
-        results.append(e)
-        if isinstance(e, Prefix):
-            ui.message("%s" % (e.name, ),)
-            continue
-
-        base_msg = ("%%-%ds %%s" % max_length) % (e.name, e.last_modified)
-        if isinstance(e, Key):
-            if got_versioned_list and not (e.is_latest or all_):
-                lgr.debug(
-                    "Skipping Key since not all versions requested: %s", e)
-                # Skip this one
+    if entries is None or first is None:
+        ui.error("No output was provided for prefix %r" % prefix)
+        return results
+
+    # Entries are reported as they are listed, aligned within pages of the
+    # size S3 delivers them in.
+    entries = chain([first], entries)
+    for page in iter(lambda: list(islice(entries, 1000)), []):
+        max_length = max((len(e.name) for e in page))
+        max_size_length = max((len(str(getattr(e, 'size', 0))) for e in page))
+        for e in page:
+            results.append(e)
+            if isinstance(e, Prefix):
+                ui.message("%s" % (e.name, ),)
                 continue
-            ui.message(base_msg + " %%%dd" % max_size_length % e.size, cr=' ')
-            # OPT: delayed import
-            from ..support.s3 import get_key_url
-            url = get_key_url(e, schema='http')
-            try:
-                _ = urlopen(Request(url))
-                urlok = "OK"
-            except HTTPError as err:
-                urlok = "E: %s" % err.code
 
-            try:
-                acl = e.get_acl()
-            except S3ResponseError as exc:
-                acl = exc.code if exc.code in ('AccessDenied',) else str(exc)
+            base_msg = ("%%-%ds %%s" % max_length) % (e.name, e.last_modified)
+            if isinstance(e, Key):
+                if got_versioned_list and not (e.is_latest or all_):
+                    lgr.debug(
+                        "Skipping Key since not all versions requested: %s", e)
+                    # Skip this one
+                    continue
+                ui.message(base_msg + " %%%dd" % max_size_length % e.size, cr=' ')
+                # OPT: delayed import
+                from ..support.s3 import get_key_url
+                url = get_key_url(e, schema='http')
+                try:
+                    _ = urlopen(Request(url))
+                    urlok = "OK"
+                except HTTPError as err:
+                    urlok = "E: %s" % err.code
 
-            content = ""
-            if list_content:
-                # IO intensive, make an option finally!
                 try:
-                    # _ = e.next()[:5]  if we are able to fetch the content
-                    kwargs = dict(version_id=e.version_id)
-                    if list_content in {'full', 'first10'}:
-                        if list_content in 'first10':
-                            kwargs['headers'] = {'Range': 'bytes=0-9'}
-                        content = repr(e.get_contents_as_string(**kwargs))
-                    elif list_content == 'md5':
-                        digest = md5()
-                        digest.update(e.get_contents_as_string(**kwargs))
-                        content = digest.hexdigest()
-                    else:
-                        raise ValueError(list_content)
-                    # content = "[S3: OK]"
-                except S3ResponseError as err:
-                    content = str(err)
-                finally:
-                    content = " " + content
-            ui.message(
-                "ver:%-32s  acl:%s  %s [%s]%s"
-                % (getattr(e, 'version_id', None),
-                   acl, url, urlok, content)
-                if long_ else ''
-            )
-        else:
-            ui.message(base_msg + " " + str(type(e)).split('.')[-1].rstrip("\"'>"))
+                    acl = e.get_acl()
+                except S3ResponseError as exc:
+                    acl = exc.code if exc.code in ('AccessDenied',) else str(exc)
+
+                content = ""
+                if list_content:
+                    # IO intensive, make an option finally!
+                    try:
+                        # _ = e.next()[:5]  if we are able to fetch the content
+                        kwargs = dict(version_id=e.version_id)
+                        if list_content in {'full', 'first10'}:
+                            if list_content in 'first10':
+                                kwargs['headers'] = {'Range': 'bytes=0-9'}
+                            content = repr(e.get_contents_as_string(**kwargs))
+                        elif list_content == 'md5':
+                            digest = md5()
+                            digest.update(e.get_contents_as_string(**kwargs))
+                            content = digest.hexdigest()
+                        else:
+                            raise ValueError(list_content)
+                        # content = "[S3: OK]"
+                    except S3ResponseError as err:
+                        content = str(err)
+                    finally:
+                        content = " " + content
+                ui.message(
+                    "ver:%-32s  acl:%s  %s [%s]%s"
+                    % (getattr(e, 'version_id', None),
+                       acl, url, urlok, content)
+                    if long_ else ''
+                )
+            else:
+                ui.message(base_msg + " " + str(type(e)).split('.')[-1].rstrip("\"'>"))
     return results
@@ -14,6 +14,7 @@ __docformat__ = 'restructuredtext'
 
 import logging
 
+from collections import Counter
 from os.path import (
     isabs,
     isdir,
@@ -181,6 +182,46 @@ class YieldField(ResultXFM):
             lgr.debug('rejected by return value configuration: %s', res)
 
 
+class ResultSummary(object):
+    """Incremental summary of the results of a command execution
+
+    Commands that provide a `custom_result_summary_renderer` can declare a
+    (subclass of) ResultSummary as their `custom_result_summary_aggregator`.
+    An instance of it is then updated with every result, and passed to the
+    renderer instead of a list of all results. Memory use is bounded
+    regardless of the number of results. Subclasses extend `update()` to
+    aggregate whatever command-specific properties their renderer needs.
+
+    Attributes
+    ----------
+    n_results : int
+      Number of results seen.
+    counts : Counter
+      Number of results by (action, status).
+    sample : list
+      The first `sample_size` results.
+    """
+    sample_size = 10
+
+    def __init__(self):
+        self.n_results = 0
+        self.counts = Counter()
+        self.sample = []
+
+    def update(self, res):
+        """Account for a result
+
+        Parameters
+        ----------
+        res : dict
+          Result record, before any result transformation.
+        """
+        self.n_results += 1
+        self.counts[(res.get('action', None), res.get('status', None))] += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(res)
+
+
 # a bunch of convenience labels for common result transformers
 # the API `result_xfm` argument understand any of these labels and
 # applied the corresponding callable
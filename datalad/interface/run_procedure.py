@@ -139,26 +139,33 @@ def _get_procedure_implementation(name='*', ds=None):
                 yield m, n, f, h
 
     # 3. check extensions for procedure
-    # delay heavy import until here
-    from pkg_resources import iter_entry_points
-    from pkg_resources import resource_isdir
-    from pkg_resources import resource_filename
+    from datalad.support.entrypoints import iter_entry_points
     for entry_point in iter_entry_points('datalad.extensions'):
-        # use of '/' here is OK wrt to platform compatibility
-        if resource_isdir(entry_point.module_name, 'resources/procedures'):
-            for m, n in _get_file_match(
-                    resource_filename(
-                        entry_point.module_name,
-                        'resources/procedures'),
-                    name):
+        procdir = _get_package_procedures_dir(entry_point.module_name)
+        if procdir:
+            for m, n in _get_file_match(procdir, name):
                 yield (m, n,) + _get_proc_config(n)
     # 4. at last check datalad itself for procedure
     for m, n in _get_file_match(
-            resource_filename('datalad', 'resources/procedures'),
+            _get_package_procedures_dir('datalad'),
             name):
         yield (m, n,) + _get_proc_config(n)
 
 
+def _get_package_procedures_dir(module_name):
+    """Return the 'resources/procedures' directory of a package, if any"""
+    from importlib.util import find_spec
+    try:
+        spec = find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    procdir = op.join(
+        list(spec.submodule_search_locations)[0], 'resources', 'procedures')
+    return procdir if op.isdir(procdir) else None
+
+
 def _guess_exec(script_file):
 
     state = None
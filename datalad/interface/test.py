@@ -60,7 +60,7 @@ class Test(Interface):
     @staticmethod
     def __call__(module=None, verbose=False, nocapture=False, pdb=False, stop=False):
         if not module:
-            from pkg_resources import iter_entry_points
+            from datalad.support.entrypoints import iter_entry_points
             module = ['datalad']
             module.extend(ep.module_name for ep in iter_entry_points('datalad.tests'))
         module = ensure_list(module)
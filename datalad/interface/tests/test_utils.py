@@ -11,8 +11,12 @@
 """
 
 from contextlib import contextmanager
+import inspect
+import json
 import logging
+import sys
 from time import sleep
+from unittest.mock import patch
 from os.path import (
     exists,
     join as opj,
@@ -27,6 +31,7 @@ from datalad.tests.utils import (
     assert_re_in,
     assert_repo_status,
     assert_true,
+    eq_,
     ok_,
     slow,
     with_tempfile,
@@ -39,19 +44,26 @@ from datalad.distribution.dataset import (
     datasetmethod,
     EnsureDataset,
 )
+from datalad.support.exceptions import IncompleteResultsError
 from datalad.support.param import Parameter
 from datalad.support.constraints import (
+    EnsureInt,
     EnsureKeyChoice,
     EnsureNone,
     EnsureStr,
 )
 from ..base import Interface
 from ..utils import (
+    JSONResultRenderer,
+    _get_json_encoder,
     discover_dataset_trace_to_targets,
     eval_results,
     handle_dirty_dataset,
 )
-from ..results import get_status_dict
+from ..results import (
+    ResultSummary,
+    get_status_dict,
+)
 from datalad.interface.base import build_doc
 
 
@@ -510,3 +522,157 @@ def test_incorrect_msg_interpolation():
 
     # there should be no exception if reported in the record path contains %
     TestUtils2().__call__("%eatthis")
+
+
+class _CountingSummary(ResultSummary):
+    sample_size = 2
+
+    def __init__(self):
+        super().__init__()
+        self.somekey_sum = 0
+
+    def update(self, res):
+        super().update(res)
+        self.somekey_sum += res['somekey']
+
+
+class TestUtils3(Interface):
+    _params_ = dict(
+        number=Parameter(
+            args=("-n", "--number",),
+            constraints=EnsureInt()),
+    )
+
+    custom_result_summary_aggregator = _CountingSummary
+    summaries = []
+
+    @staticmethod
+    @eval_results
+    def __call__(number):
+        for i in range(number):
+            yield {'path': 'some', 'status': 'ok', 'somekey': i,
+                   'action': 'off'}
+
+    @staticmethod
+    def custom_result_summary_renderer(summary):
+        TestUtils3.summaries.append(summary)
+
+
+def test_result_summary_aggregator():
+    summaries = TestUtils3.summaries
+    tu = TestUtils3()
+    # no summary without a suitable renderer
+    list(tu(3, return_type='generator'))
+    eq_(summaries, [])
+
+    # generator mode
+    res = tu(10, return_type='generator', result_renderer='tailored')
+    ok_(inspect.isgenerator(res))
+    eq_(len(list(res)), 10)
+    summary = summaries.pop()
+    eq_(summaries, [])
+    eq_(summary.n_results, 10)
+    eq_(summary.somekey_sum, 45)
+    eq_(summary.counts, {('off', 'ok'): 10})
+    # only a bounded sample of records is kept
+    eq_([r['somekey'] for r in summary.sample], [0, 1])
+
+    # list mode renders a single summary, and the aggregator sees the results
+    # before any transformation and after filtering
+    eq_(tu(4, result_renderer='default', result_xfm='paths',
+           result_filter=lambda r: r['somekey'] > 1),
+        ['some', 'some'])
+    summary = summaries.pop()
+    eq_(summaries, [])
+    eq_(summary.n_results, 2)
+    eq_(summary.somekey_sum, 5)
+
+
+def test_json_result_renderer():
+    from pathlib import Path
+    res = dict(action='off', status='ok', path=Path('/some'), message='msg',
+               logger=lgr, number=1)
+    with swallow_outputs() as cmo:
+        renderer = JSONResultRenderer(batch_size=3)
+        renderer(res)
+        renderer(dict(res, number=2))
+        # buffered
+        eq_(cmo.out, '')
+        renderer(dict(res, number=3))
+        renderer(dict(res, number=4))
+        eq_(len(cmo.out.splitlines()), 3)
+        renderer.flush()
+        records = [json.loads(l) for l in cmo.out.splitlines()]
+        eq_([r['number'] for r in records], [1, 2, 3, 4])
+        eq_(records[0], dict(action='off', status='ok', path='/some',
+                             number=1))
+        # input was not modified
+        assert_in('logger', res)
+
+    # buffered records are written with a result that comes a while after
+    # the first of them, and only by the rendering thread
+    with swallow_outputs() as cmo:
+        renderer = JSONResultRenderer(batch_size=3, max_delay=0.01)
+        renderer(res)
+        sleep(0.05)
+        eq_(cmo.out, '')
+        renderer(dict(res, number=2))
+        eq_([json.loads(l)['number'] for l in cmo.out.splitlines()], [1, 2])
+        renderer(dict(res, number=3))
+        eq_(len(cmo.out.splitlines()), 2)
+        renderer.flush()
+        eq_(len(cmo.out.splitlines()), 3)
+
+    with swallow_outputs() as cmo:
+        renderer = JSONResultRenderer(pretty=True)
+        renderer(res)
+        eq_(json.loads(cmo.out)['path'], '/some')
+        assert_in('\n  "action": "off",\n', cmo.out)
+
+    # the json module is used by default, also if orjson is installed
+    with swallow_outputs() as cmo:
+        renderer = JSONResultRenderer()
+        renderer(dict(res, path='/s\u00fcme'))
+        eq_(cmo.out, '{"action": "off", "number": 1, "path": "/s\\u00fcme", '
+                     '"status": "ok"}\n')
+
+    # or if orjson is requested, but not installed
+    with swallow_outputs() as cmo, patch.dict(sys.modules, {'orjson': None}):
+        renderer = JSONResultRenderer(encoder='orjson')
+        renderer(res)
+        eq_(cmo.out, '{"action": "off", "number": 1, "path": "/some", '
+                     '"status": "ok"}\n')
+
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    if orjson is not None:
+        from datetime import datetime
+        rec = dict(res, path='/s\u00fcme', date=datetime(2020, 1, 1, 1, 2, 3))
+        with swallow_outputs() as cmo:
+            renderer = JSONResultRenderer(encoder='orjson')
+            renderer(rec)
+            # compact and not ASCII-escaped
+            eq_(cmo.out, '{"action":"off","date":"2020-01-01 01:02:03",'
+                         '"number":1,"path":"/s\u00fcme","status":"ok"}\n')
+            # numbers that orjson cannot represent
+            renderer(dict(res, number=2 ** 70))
+            eq_(json.loads(cmo.out.splitlines()[1])['number'], 2 ** 70)
+        with swallow_outputs() as cmo:
+            JSONResultRenderer()(rec)
+            # the same values with the json module
+            eq_(json.loads(cmo.out), json.loads(
+                _get_json_encoder(encoder='orjson')(
+                    {k: v for k, v in rec.items()
+                     if k not in ('message', 'logger')})))
+
+    # results are flushed when a command fails
+    with swallow_outputs() as cmo:
+        assert_raises(
+            IncompleteResultsError,
+            TestUtils().__call__, 2, result_renderer='json',
+            result_fn=lambda n: [dict(action='off', status='error', path=p)
+                                 for p in ('a', 'b')])
+        eq_([json.loads(l)['path'] for l in cmo.out.splitlines()],
+            ['a', 'b'])
@@ -47,6 +47,9 @@ from datalad.dochelpers import (
     exc_str,
     single_or_plural,
 )
+from datalad.support.callaccounting import account_generator_function
+from datalad.support.memprofile import profile_results
+from datalad.support.tracing import trace_generator_function
 
 from datalad.ui import ui
 import datalad.support.ansi_colors as ac
@@ -57,8 +60,7 @@ from datalad.interface.common_opts import eval_params
 from datalad.interface.common_opts import eval_defaults
 from .results import known_result_xfms
 from datalad.core.local.resulthooks import (
-    get_jsonhooks_from_config,
-    match_jsonhook2result,
+    get_jsonhook_matcher,
     run_jsonhook,
 )
 
@@ -300,6 +302,13 @@ def eval_results(func):
     'tailored' custom output formatting provided by each command
     class (if any).
 
+    In 'default' and 'tailored' mode, a command class can provide a
+    `custom_result_summary_renderer` that is called after all results were
+    reported. It is given an instance of the class'
+    `custom_result_summary_aggregator` (see
+    `datalad.interface.results.ResultSummary`) that was updated with every
+    result, or, if no aggregator is declared, a list of all results.
+
     Error detection works by inspecting the `status` item of all result
     dictionaries. Any occurrence of a status other than 'ok' or 'notneeded'
     will cause an IncompleteResultsError exception to be raised that carries
@@ -368,7 +377,7 @@ def eval_results(func):
         ds = dataset_arg if isinstance(dataset_arg, Dataset) \
             else Dataset(dataset_arg) if dataset_arg else None
         # look for hooks
-        hooks = get_jsonhooks_from_config(ds.config if ds else dlcfg)
+        match_hooks = get_jsonhook_matcher(ds.config if ds else dlcfg)
 
         # this internal helper function actually drives the command
         # generator-style, it may generate an exception if desired,
@@ -379,16 +388,20 @@ def eval_results(func):
             # track what actions were performed how many times
             action_summary = {}
 
-            # if a custom summary is to be provided, collect the results
+            # if a custom summary is to be provided, aggregate the results
             # of the command execution
-            results = []
             do_custom_result_summary = result_renderer in ('tailored', 'default') \
                 and hasattr(wrapped_class, 'custom_result_summary_renderer')
+            if do_custom_result_summary:
+                summary, update_summary = _get_result_summary(wrapped_class)
 
             # process main results
             for r in _process_results(
-                    # execution
-                    wrapped(*_args, **_kwargs),
+                    # execution, with memory profiling if enabled
+                    profile_results(
+                        wrapped(*_args, **_kwargs),
+                        wrapped_class.__name__,
+                        dlcfg),
                     wrapped_class,
                     common_params['on_failure'],
                     # bookkeeping
@@ -398,31 +411,37 @@ def eval_results(func):
                     result_renderer,
                     result_log_level,
                     # let renderers get to see how a command was called
-                    allkwargs):
-                for hook, spec in hooks.items():
-                    # run the hooks before we yield the result
-                    # this ensures that they are executed before
-                    # a potentially wrapper command gets to act
-                    # on them
-                    if match_jsonhook2result(hook, r, spec['match']):
-                        lgr.debug('Result %s matches hook %s', r, hook)
-                        # a hook is also a command that yields results
-                        # so yield them outside too
-                        # users need to pay attention to void infinite
-                        # loops, i.e. when a hook yields a result that
-                        # triggers that same hook again
-                        for hr in run_jsonhook(hook, spec, r, dataset_arg):
-                            # apply same logic as for main results, otherwise
-                            # any filters would only tackle the primary results
-                            # and a mixture of return values could happen
-                            if not keep_result(hr, result_filter, **allkwargs):
-                                continue
-                            hr = xfm_result(hr, result_xfm)
-                            # rationale for conditional is a few lines down
-                            if hr:
-                                yield hr
-                if not keep_result(r, result_filter, **allkwargs):
+                    allkwargs,
+                    # hooks might produce output, do not let it overtake
+                    # rendered results
+                    batch_output=match_hooks is None):
+                # run the hooks before we yield the result
+                # this ensures that they are executed before
+                # a potentially wrapper command gets to act
+                # on them
+                for hook, spec in (match_hooks(r) if match_hooks else ()):
+                    lgr.debug('Result %s matches hook %s', r, hook)
+                    # a hook is also a command that yields results
+                    # so yield them outside too
+                    # users need to pay attention to void infinite
+                    # loops, i.e. when a hook yields a result that
+                    # triggers that same hook again
+                    for hr in run_jsonhook(hook, spec, r, dataset_arg):
+                        # apply same logic as for main results, otherwise
+                        # any filters would only tackle the primary results
+                        # and a mixture of return values could happen
+                        if not keep_result(hr, result_filter, **allkwargs):
+                            continue
+                        hr = xfm_result(hr, result_xfm)
+                        # rationale for conditional is a few lines down
+                        if hr:
+                            yield hr
+                if result_filter and \
+                        not keep_result(r, result_filter, **allkwargs):
                     continue
+                # summarize if desired, renderers need the full result record
+                if do_custom_result_summary:
+                    update_summary(r)
                 r = xfm_result(r, result_xfm)
                 # in case the result_xfm decided to not give us anything
                 # exclude it from the results. There is no particular reason
@@ -432,14 +451,10 @@ def eval_results(func):
                 if r:
                     yield r
 
-                # collect if summary is desired
-                if do_custom_result_summary:
-                    results.append(r)
-
             # result summary before a potential exception
             # custom first
             if do_custom_result_summary:
-                wrapped_class.custom_result_summary_renderer(results)
+                wrapped_class.custom_result_summary_renderer(summary)
             elif result_renderer == 'default' and action_summary and \
                     sum(sum(s.values()) for s in action_summary.values()) > 1:
                 # give a summary in default mode, when there was more than one
@@ -456,6 +471,15 @@ def eval_results(func):
                     failed=incomplete_results,
                     msg="Command did not complete successfully")
 
+        # account for git calls, if enabled
+        generator_func = account_generator_function(
+            generator_func, wrapped_class.__name__, dlcfg)
+
+        # record the command execution, if tracing is enabled
+        generator_func = trace_generator_function(
+            generator_func, wrapped_class.__name__, 'command',
+            **{k: v for k, v in allkwargs.items() if v is not None})
+
         if return_type == 'generator':
             # hand over the generator
             lgr.log(2, "Returning generator_func from eval_func for %s", wrapped_class)
@@ -468,11 +492,7 @@ def eval_results(func):
                     # unwind generator if there is one, this actually runs
                     # any processing
                     results = list(results)
-                # render summaries
-                if not result_xfm and result_renderer in ('tailored', 'default'):
-                    # cannot render transformed results
-                    if hasattr(wrapped_class, 'custom_result_summary_renderer'):
-                        wrapped_class.custom_result_summary_renderer(results)
+                # any summary was already rendered by generator_func
                 if return_type == 'item-or-list' and \
                         len(results) < 2:
                     return results[0] if results else None
@@ -484,6 +504,26 @@ def eval_results(func):
     return eval_func(func)
 
 
+def _get_result_summary(wrapped_class):
+    """Return a container for results to render a custom summary of
+
+    Returns
+    -------
+    (summary, callable)
+      The summary to pass to the command's `custom_result_summary_renderer`,
+      and a function to update it with a result. Unless the command declares
+      a `custom_result_summary_aggregator`, the summary is a list of all
+      results.
+    """
+    aggregator = getattr(
+        wrapped_class, 'custom_result_summary_aggregator', None)
+    if aggregator is None:
+        summary = []
+        return summary, summary.append
+    summary = aggregator()
+    return summary, summary.update
+
+
 def default_result_renderer(res):
     if res.get('status', None) != 'notneeded':
         path = res.get('path', None)
@@ -510,6 +550,97 @@ def default_result_renderer(res):
             if res.get('message', None) else ''))
 
 
+def _get_json_encoder(pretty=False, encoder='json'):
+    """Return a function to serialize a result record as a JSON string
+
+    Parameters
+    ----------
+    pretty : bool, optional
+      Whether to indent the records.
+    encoder : {'json', 'orjson'}, optional
+      With 'orjson', the `orjson` module is used if it is installed. It is
+      several times faster than Python's own `json` module, but its output
+      differs, see 'datalad.ui.json-encoder'.
+    """
+    # objects without a JSON representation (e.g. paths) are reported as
+    # strings
+    std_encode = json.JSONEncoder(
+        sort_keys=True,
+        indent=2 if pretty else None,
+        default=str).encode
+    if encoder != 'orjson':
+        return std_encode
+    try:
+        import orjson
+    except ImportError:
+        lgr.debug("orjson is not installed, using the json module")
+        return std_encode
+
+    # like the json module, report datetimes via str()
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS \
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    dumps = orjson.dumps
+
+    def encode(res):
+        try:
+            return dumps(res, default=str, option=option).decode('utf-8')
+        except TypeError:
+            # e.g. integers beyond 64bit
+            return std_encode(res)
+    return encode
+
+
+class JSONResultRenderer(object):
+    """Render results as JSON, one record per line (or multiple, if pretty)
+
+    Parameters
+    ----------
+    pretty : bool, optional
+      Whether to indent the records.
+    batch_size : int, optional
+      Number of records to write at once. Records are buffered until
+      this number is reached, `flush()` is called, or a record is rendered
+      `max_delay` seconds after the first buffered one.
+    max_delay : float, optional
+      Maximum number of seconds a record is buffered while further records
+      are rendered, such that a slowly progressing command still reports
+      its results in a timely manner.
+    encoder : {'json', 'orjson'}, optional
+      Passed to `_get_json_encoder()`.
+    """
+    def __init__(self, pretty=False, batch_size=1, max_delay=0.1,
+                 encoder='json'):
+        self._encode = _get_json_encoder(pretty, encoder)
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._buffer = []
+        # time the first buffered record was rendered
+        self._buffer_ts = None
+
+    def __call__(self, res):
+        if 'message' in res or 'logger' in res:
+            res = {k: v for k, v in res.items()
+                   if k not in ('message', 'logger')}
+        self._buffer.append(self._encode(res))
+        if len(self._buffer) < self._batch_size:
+            # records are only written from the thread that renders them,
+            # to not interleave with other output of the command
+            ts = time()
+            if self._buffer_ts is None:
+                self._buffer_ts = ts
+            if ts - self._buffer_ts < self._max_delay:
+                return
+        self.flush()
+
+    def flush(self):
+        if self._buffer:
+            ui.message('\n'.join(self._buffer))
+            self._buffer = []
+        self._buffer_ts = None
+
+
 def _display_suppressed_message(nsimilar, ndisplayed, last_ts, final=False):
     # +1 because there was the original result + nsimilar displayed.
     n_suppressed = nsimilar - ndisplayed + 1
@@ -538,7 +669,8 @@ def _process_results(
         incomplete_results,
         result_renderer,
         result_log_level,
-        allkwargs):
+        allkwargs,
+        batch_output=True):
     # private helper pf @eval_results
     # loop over results generated from some source and handle each
     # of them according to the requested behavior (logging, rendering, ...)
@@ -554,114 +686,122 @@ def _process_results(
     # how many repetitions to show, before suppression kicks in
     render_n_repetitions = 10 if sys.stdout.isatty() else float("inf")
 
-    for res in results:
-        if not res or 'action' not in res:
-            # XXX Yarik has to no clue on how to track the origin of the
-            # record to figure out WTF, so he just skips it
-            # but MIH thinks leaving a trace of that would be good
-            lgr.debug('Drop result record without "action": %s', res)
-            continue
+    json_renderer = JSONResultRenderer(
+        pretty=result_renderer == 'json_pp',
+        # writing lines one by one is costly with many results, a batch is
+        # written once a result comes 0.1s after its first record, such that
+        # consumers of non-interactive output do not wait long for results
+        # of slow commands
+        batch_size=100 if batch_output and not sys.stdout.isatty() else 1,
+        encoder=dlcfg.obtain('datalad.ui.json-encoder'),
+    ) if result_renderer in ('json', 'json_pp') else None
+    try:
+        for res in results:
+            if not res or 'action' not in res:
+                # XXX Yarik has to no clue on how to track the origin of the
+                # record to figure out WTF, so he just skips it
+                # but MIH thinks leaving a trace of that would be good
+                lgr.debug('Drop result record without "action": %s', res)
+                continue
 
-        actsum = action_summary.get(res['action'], {})
-        if res['status']:
-            actsum[res['status']] = actsum.get(res['status'], 0) + 1
-            action_summary[res['action']] = actsum
-        ## log message, if there is one and a logger was given
-        msg = res.get('message', None)
-        # remove logger instance from results, as it is no longer useful
-        # after logging was done, it isn't serializable, and generally
-        # pollutes the output
-        res_lgr = res.pop('logger', None)
-        if msg and res_lgr:
-            if isinstance(res_lgr, logging.Logger):
-                # didn't get a particular log function, go with default
-                res_lgr = getattr(
-                    res_lgr,
-                    default_logchannels[res['status']]
-                    if result_log_level is None
-                    else result_log_level)
-            msg = res['message']
-            msgargs = None
-            if isinstance(msg, tuple):
-                msgargs = msg[1:]
-                msg = msg[0]
-            if 'path' in res:
-                # result path could be a path instance
-                path = str(res['path'])
+            actsum = action_summary.get(res['action'], {})
+            if res['status']:
+                actsum[res['status']] = actsum.get(res['status'], 0) + 1
+                action_summary[res['action']] = actsum
+            ## log message, if there is one and a logger was given
+            msg = res.get('message', None)
+            # remove logger instance from results, as it is no longer useful
+            # after logging was done, it isn't serializable, and generally
+            # pollutes the output
+            res_lgr = res.pop('logger', None)
+            if msg and res_lgr:
+                if isinstance(res_lgr, logging.Logger):
+                    # didn't get a particular log function, go with default
+                    res_lgr = getattr(
+                        res_lgr,
+                        default_logchannels[res['status']]
+                        if result_log_level is None
+                        else result_log_level)
+                msg = res['message']
+                msgargs = None
+                if isinstance(msg, tuple):
+                    msgargs = msg[1:]
+                    msg = msg[0]
+                if 'path' in res:
+                    # result path could be a path instance
+                    path = str(res['path'])
+                    if msgargs:
+                        # we will pass the msg for %-polation, so % should be doubled
+                        path = path.replace('%', '%%')
+                    msg = '{} [{}({})]'.format(
+                        msg, res['action'], path)
                 if msgargs:
-                    # we will pass the msg for %-polation, so % should be doubled
-                    path = path.replace('%', '%%')
-                msg = '{} [{}({})]'.format(
-                    msg, res['action'], path)
-            if msgargs:
-                # support string expansion of logging to avoid runtime cost
-                try:
-                    res_lgr(msg, *msgargs)
-                except TypeError as exc:
-                    raise TypeError(
-                        "Failed to render %r with %r from %r: %s"
-                        % (msg, msgargs, res, exc_str(exc))
-                    )
-            else:
-                res_lgr(msg)
-
-        ## output rendering
-        # TODO RF this in a simple callable that gets passed into this function
-        if result_renderer is None or result_renderer == 'disabled':
-            pass
-        elif result_renderer == 'default':
-            trimmed_result = {k: v for k, v in res.items() if k in repetition_keys}
-            if res.get('status', None) != 'notneeded' \
-                    and trimmed_result == last_result:
-                # this is a similar report, suppress if too many, but count it
-                result_repetitions += 1
-                if result_repetitions < render_n_repetitions:
-                    default_result_renderer(res)
+                    # support string expansion of logging to avoid runtime cost
+                    try:
+                        res_lgr(msg, *msgargs)
+                    except TypeError as exc:
+                        raise TypeError(
+                            "Failed to render %r with %r from %r: %s"
+                            % (msg, msgargs, res, exc_str(exc))
+                        )
+                else:
+                    res_lgr(msg)
+
+            ## output rendering
+            # TODO RF this in a simple callable that gets passed into this function
+            if result_renderer is None or result_renderer == 'disabled':
+                pass
+            elif result_renderer == 'default':
+                trimmed_result = {k: v for k, v in res.items() if k in repetition_keys}
+                if res.get('status', None) != 'notneeded' \
+                        and trimmed_result == last_result:
+                    # this is a similar report, suppress if too many, but count it
+                    result_repetitions += 1
+                    if result_repetitions < render_n_repetitions:
+                        default_result_renderer(res)
+                    else:
+                        last_result_ts = _display_suppressed_message(
+                            result_repetitions, render_n_repetitions, last_result_ts)
                 else:
+                    # this one is new, first report on any prev. suppressed results
+                    # by number, and then render this fresh one
                     last_result_ts = _display_suppressed_message(
-                        result_repetitions, render_n_repetitions, last_result_ts)
+                        result_repetitions, render_n_repetitions, last_result_ts,
+                        final=True)
+                    default_result_renderer(res)
+                    result_repetitions = 0
+                last_result = trimmed_result
+            elif json_renderer is not None:
+                json_renderer(res)
+            elif result_renderer in ('tailored', 'default'):
+                if hasattr(cmd_class, 'custom_result_renderer'):
+                    cmd_class.custom_result_renderer(res, **allkwargs)
+            elif hasattr(result_renderer, '__call__'):
+                try:
+                    result_renderer(res, **allkwargs)
+                except Exception as e:
+                    lgr.warning('Result rendering failed for: %s [%s]',
+                                res, exc_str(e))
             else:
-                # this one is new, first report on any prev. suppressed results
-                # by number, and then render this fresh one
-                last_result_ts = _display_suppressed_message(
-                    result_repetitions, render_n_repetitions, last_result_ts,
-                    final=True)
-                default_result_renderer(res)
-                result_repetitions = 0
-            last_result = trimmed_result
-        elif result_renderer in ('json', 'json_pp'):
-            ui.message(json.dumps(
-                {k: v for k, v in res.items()
-                 if k not in ('message', 'logger')},
-                sort_keys=True,
-                indent=2 if result_renderer.endswith('_pp') else None,
-                default=lambda x: str(x)))
-        elif result_renderer in ('tailored', 'default'):
-            if hasattr(cmd_class, 'custom_result_renderer'):
-                cmd_class.custom_result_renderer(res, **allkwargs)
-        elif hasattr(result_renderer, '__call__'):
-            try:
-                result_renderer(res, **allkwargs)
-            except Exception as e:
-                lgr.warning('Result rendering failed for: %s [%s]',
-                            res, exc_str(e))
-        else:
-            raise ValueError('unknown result renderer "{}"'.format(result_renderer))
-
-        ## error handling
-        # looks for error status, and report at the end via
-        # an exception
-        if on_failure in ('continue', 'stop') \
-                and res['status'] in ('impossible', 'error'):
-            incomplete_results.append(res)
-            if on_failure == 'stop':
-                # first fail -> that's it
-                # raise will happen after the loop
-                break
-        yield res
-    # make sure to report on any issues that we had suppressed
-    _display_suppressed_message(
-        result_repetitions, render_n_repetitions, last_result_ts, final=True)
+                raise ValueError('unknown result renderer "{}"'.format(result_renderer))
+
+            ## error handling
+            # looks for error status, and report at the end via
+            # an exception
+            if on_failure in ('continue', 'stop') \
+                    and res['status'] in ('impossible', 'error'):
+                incomplete_results.append(res)
+                if on_failure == 'stop':
+                    # first fail -> that's it
+                    # raise will happen after the loop
+                    break
+            yield res
+        # make sure to report on any issues that we had suppressed
+        _display_suppressed_message(
+            result_repetitions, render_n_repetitions, last_result_ts, final=True)
+    finally:
+        if json_renderer is not None:
+            json_renderer.flush()
 
 
 def keep_result(res, rfilter, **kwargs):
@@ -13,6 +13,7 @@ __docformat__ = 'restructuredtext'
 
 import logging
 import os
+import threading
 
 from os import makedirs
 from os import listdir
@@ -36,6 +37,7 @@ from datalad.interface.utils import (
 from datalad.core.local.save import Save
 from datalad.interface.base import build_doc
 from datalad.interface.common_opts import (
+    jobs_opt,
     recursion_limit,
     recursion_flag,
     nosave_opt,
@@ -69,6 +71,10 @@ from datalad.support.constraints import EnsureChoice
 from datalad.support.gitrepo import GitRepo
 from datalad.support.annexrepo import AnnexRepo
 from datalad.support import json_py
+from datalad.support.parallel import (
+    ProducerConsumer,
+    no_subds_in_futures,
+)
 from datalad.support.path import split_ext
 from datalad.utils import (
     path_is_subpath,
@@ -78,6 +84,10 @@ from datalad.utils import (
 
 lgr = logging.getLogger('datalad.metadata.aggregate')
 
+# serializes modifications of the worktree of the dataset that receives
+# metadata objects, when extraction runs for multiple datasets in parallel
+_agginto_lock = threading.Lock()
+
 
 def _get_dsinfo_from_aggmetadata(ds_path, path, recursive, db):
     """Grab info on aggregated metadata for a path from a given dataset.
@@ -411,19 +421,20 @@ def _dump_extracted_metadata(agginto_ds, aggfrom_ds, db, to_save, force_extracti
         for objrelpath in objrelpaths.values():
             objpath = op.join(agginto_ds.path, objrelpath)
             objdir = op.dirname(objpath)
-            if not op.exists(objdir):
-                makedirs(objdir)
-            if op.lexists(objpath):
-                os.unlink(objpath)  # remove previous version first
-                # was a wild thought as a workaround for 
-                # http://git-annex.branchable.com/bugs/cannot_commit___34__annex_add__34__ed_modified_file_which_switched_its_largefile_status_to_be_committed_to_git_now/#comment-bf70dd0071de1bfdae9fd4f736fd1ec1
-                # agginto_ds.repo.remove(objpath)
-            # XXX TODO once we have a command that can copy/move files
-            # from one dataset to another including file availability
-            # info, this should be used here
-            shutil.copyfile(
-                op.join(aggfrom_ds.path, objrelpath),
-                objpath)
+            with _agginto_lock:
+                if not op.exists(objdir):
+                    makedirs(objdir)
+                if op.lexists(objpath):
+                    os.unlink(objpath)  # remove previous version first
+                    # was a wild thought as a workaround for
+                    # http://git-annex.branchable.com/bugs/cannot_commit___34__annex_add__34__ed_modified_file_which_switched_its_largefile_status_to_be_committed_to_git_now/#comment-bf70dd0071de1bfdae9fd4f736fd1ec1
+                    # agginto_ds.repo.remove(objpath)
+                # XXX TODO once we have a command that can copy/move files
+                # from one dataset to another including file availability
+                # info, this should be used here
+                shutil.copyfile(
+                    op.join(aggfrom_ds.path, objrelpath),
+                    objpath)
             # mark for saving
             to_save.append(dict(
                 path=objpath,
@@ -484,12 +495,13 @@ def _extract_metadata(agginto_ds, aggfrom_ds, db, to_save, objid, metasources,
         objpath = op.join(dest.path, agg_base_path, objrelpath)
 
         # write obj files
-        if op.exists(objpath):
-            dest.unlock(objpath)
-        elif op.lexists(objpath):
-            # if it gets here, we have a symlink that is pointing nowhere
-            # kill it, to be replaced with the newly aggregated content
-            dest.repo.remove(objpath)
+        with _agginto_lock:
+            if op.exists(objpath):
+                dest.unlock(objpath)
+            elif op.lexists(objpath):
+                # if it gets here, we have a symlink that is pointing nowhere
+                # kill it, to be replaced with the newly aggregated content
+                dest.repo.remove(objpath)
         # TODO actually dump a compressed file when annexing is possible
         # to speed up on-demand access
         props['dumper'](meta[label], objpath)
@@ -895,6 +907,7 @@ class AggregateMetaData(Interface):
             whether change detection indicates that metadata has already been
             extracted for a given dataset state."""),
         save=nosave_opt,
+        jobs=jobs_opt,
     )
 
     @staticmethod
@@ -908,7 +921,8 @@ class AggregateMetaData(Interface):
             update_mode='target',
             incremental=False,
             force_extraction=False,
-            save=True):
+            save=True,
+            jobs=None):
         refds_path = Interface.get_refds_path(dataset)
 
         # it really doesn't work without a dataset
@@ -929,6 +943,8 @@ class AggregateMetaData(Interface):
 
         to_save = []
         to_aggregate = set()
+        # present datasets to extract metadata from
+        to_extract = set()
         for ap in AnnotatePaths.__call__(
                 dataset=refds_path,
                 path=path,
@@ -992,24 +1008,40 @@ class AggregateMetaData(Interface):
                 # cue for aggregation
                 to_aggregate.update(res)
             else:
-                # actually aggregate metadata for this dataset, immediately place
-                # generated objects into the aggregated or reference dataset,
-                # and put info into DB to get the distributed to all datasets
-                # that need to be updated
-                errored = _dump_extracted_metadata(
-                    ds,
-                    Dataset(aggsrc),
-                    agginfo_db,
-                    to_save,
-                    force_extraction,
-                    agg_base_path)
-                if errored:
-                    yield get_status_dict(
-                        status='error',
-                        message='Metadata extraction failed (see previous error message, set datalad.runtime.raiseonerror=yes to fail immediately)',
-                        action='aggregate_metadata',
-                        path=aggsrc,
-                        logger=lgr)
+                # actually aggregate metadata for this dataset, once we know
+                # all datasets (see below)
+                to_extract.add(aggsrc)
+
+        def _extract(aggsrc):
+            # immediately place generated objects into the aggregated or
+            # reference dataset, and put info into DB to get the distributed
+            # to all datasets that need to be updated
+            return aggsrc, _dump_extracted_metadata(
+                ds,
+                Dataset(aggsrc),
+                agginfo_db,
+                to_save,
+                force_extraction,
+                agg_base_path)
+
+        # extraction is independent across datasets, hence can run in
+        # parallel. Still go bottom-up, and only start with a dataset once
+        # all of its subdatasets are done
+        for aggsrc, errored in ProducerConsumer(
+                sorted(to_extract, reverse=True),
+                _extract,
+                safe_to_consume=no_subds_in_futures,
+                jobs=jobs):
+            if errored:
+                yield get_status_dict(
+                    status='error',
+                    message='Metadata extraction failed (see previous error message, set datalad.runtime.raiseonerror=yes to fail immediately)',
+                    action='aggregate_metadata',
+                    path=aggsrc,
+                    logger=lgr)
+        # extractions finish in arbitrary order, make the save
+        # request independent of it
+        to_save.sort(key=lambda r: r['path'])
 
         # at this point we have dumped all aggregated metadata into object files
         # somewhere, we know what needs saving, but having saved anything, and
@@ -35,11 +35,30 @@ vocab_map = {
 
 class MetadataExtractor(BaseMetadataExtractor):
 
+    CONTENT_CACHE_VERSION = '1'
+
     _unique_exclude = {'bitrate'}
 
     def get_metadata(self, dataset, content):
         if not content:
             return {}, []
+        return {
+            '@context': {
+                'music': {
+                    '@id': 'http://purl.org/ontology/mo/',
+                    'description': 'Music Ontology with main concepts and properties for describing music',
+                    'type': vocabulary_id,
+                },
+                'duration(s)': {
+                    "@id": 'time:Duration',
+                    "unit": "uo:0000010",
+                    'unit_label': 'second',
+                },
+            },
+        }, \
+            self._get_content_metadata()
+
+    def _get_content_metadata(self):
         log_progress(
             lgr.info,
             'extractoraudio',
@@ -48,49 +67,38 @@ class MetadataExtractor(BaseMetadataExtractor):
             label='audio metadata extraction',
             unit=' Files',
         )
-        contentmeta = []
-        for f in self.paths:
-            absfp = opj(self.ds.path, f)
+        for f, meta in self._iter_file_metadata(self.paths):
             log_progress(
                 lgr.info,
                 'extractoraudio',
-                'Extract audio metadata from %s', absfp,
+                'Extracted audio metadata from %s', opj(self.ds.path, f),
                 update=1,
                 increment=True)
-            info = audiofile(absfp, easy=True)
-            if info is None:
+            if meta is None:
                 continue
-            meta = {vocab_map.get(k, k): info[k][0]
-                    if isinstance(info[k], list) and len(info[k]) == 1 else info[k]
-                    for k in info}
-            if hasattr(info, 'mime') and len(info.mime):
-                meta['format'] = 'mime:{}'.format(info.mime[0])
-            for k in ('length', 'channels', 'bitrate', 'sample_rate'):
-                if hasattr(info.info, k):
-                    val = getattr(info.info, k)
-                    if k == 'length':
-                        # duration comes in seconds, cap at millisecond level
-                        val = round(val, 3)
-                    meta[vocab_map.get(k, k)] = val
-            contentmeta.append((f, meta))
+            yield f, meta
 
         log_progress(
             lgr.info,
             'extractoraudio',
             'Finished audio metadata extraction from %s', self.ds
         )
-        return {
-            '@context': {
-                'music': {
-                    '@id': 'http://purl.org/ontology/mo/',
-                    'description': 'Music Ontology with main concepts and properties for describing music',
-                    'type': vocabulary_id,
-                },
-                'duration(s)': {
-                    "@id": 'time:Duration',
-                    "unit": "uo:0000010",
-                    'unit_label': 'second',
-                },
-            },
-        }, \
-            contentmeta
+
+    @staticmethod
+    def _get_file_metadata(path):
+        info = audiofile(path, easy=True)
+        if info is None:
+            return None
+        meta = {vocab_map.get(k, k): info[k][0]
+                if isinstance(info[k], list) and len(info[k]) == 1 else info[k]
+                for k in info}
+        if hasattr(info, 'mime') and len(info.mime):
+            meta['format'] = 'mime:{}'.format(info.mime[0])
+        for k in ('length', 'channels', 'bitrate', 'sample_rate'):
+            if hasattr(info.info, k):
+                val = getattr(info.info, k)
+                if k == 'length':
+                    # duration comes in seconds, cap at millisecond level
+                    val = round(val, 3)
+                meta[vocab_map.get(k, k)] = val
+        return meta
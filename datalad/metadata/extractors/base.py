@@ -8,10 +8,77 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Metadata extractor base class"""
 
+import logging
+import os.path as op
+import signal
+from collections import deque
+
+from datalad.support.constraints import EnsureInt
+
+lgr = logging.getLogger('datalad.metadata.extractors.base')
+
+
+class FileExtractionError(Exception):
+    """Raised by `_get_file_metadata()` if extraction from a file failed
+
+    Unlike a file without metadata, such a file is skipped without
+    recording that it has no metadata (e.g. in the content metadata cache),
+    such that extraction is attempted again next time.
+    """
+    pass
+
+
+class _FileTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _FileTimeout()
+
+
+def _get_batch_metadata(get_file_metadata, dspath, paths, timeout=None):
+    """Run a per-file metadata extractor on a batch of paths
+
+    This is executed in a worker process.
+
+    Returns
+    -------
+    list, list
+      (path, metadata) tuples, and paths for which extraction failed or
+      timed out. The latter are not reported in the first list.
+    """
+    # SIGALRM is not available on all platforms, no timeouts then
+    with_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if with_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+    results = []
+    failed = []
+    for p in paths:
+        try:
+            if with_alarm:
+                signal.alarm(timeout)
+            results.append((p, get_file_metadata(op.join(dspath, p))))
+        except _FileTimeout:
+            lgr.warning(
+                'Metadata extraction from %s did not finish within %is, skipped',
+                p, timeout)
+            failed.append(p)
+        except FileExtractionError as e:
+            lgr.debug('Metadata extraction from %s failed: %s', p, e)
+            failed.append(p)
+        finally:
+            if with_alarm:
+                signal.alarm(0)
+    return results, failed
+
 
 class BaseMetadataExtractor(object):
 
     NEEDS_CONTENT = True   # majority of the extractors need data content
+    # if not None, content metadata of a file is a function of the file
+    # content only, and can be cached. Any change to the reported metadata
+    # must come with a new version
+    CONTENT_CACHE_VERSION = None
 
     def __init__(self, ds, paths):
         """
@@ -25,6 +92,8 @@ class BaseMetadataExtractor(object):
 
         self.ds = ds
         self.paths = paths
+        # paths for which `_iter_file_metadata()` could not extract metadata
+        self.failed_paths = set()
 
     def get_metadata(self, dataset=True, content=True):
         """
@@ -53,8 +122,112 @@ class BaseMetadataExtractor(object):
 
         Possibly limited to the paths given to the extractor.
 
+        The default implementation reports the metadata of
+        `_get_file_metadata()` for all paths that have any.
+
         Returns
         -------
         generator((location, metadata_dict))
         """
+        for loc, meta in self._iter_file_metadata(self.paths):
+            if meta:
+                yield loc, meta
+
+    @staticmethod
+    def _get_file_metadata(path):
+        """Get metadata for a single file
+
+        Implementations must not depend on the state of an extractor
+        instance, as they may run in a separate worker process.
+
+        Parameters
+        ----------
+        path : str
+          Absolute path of the file.
+
+        Returns
+        -------
+        dict or None
+
+        Raises
+        ------
+        FileExtractionError
+          If extraction failed for a reason other than the file not
+          having any metadata.
+        """
         raise NotImplementedError
+
+    def _iter_file_metadata(self, paths):
+        """Run `_get_file_metadata()` on paths, possibly in worker processes
+
+        With 'datalad.metadata.extractor-jobs' set to more than one, paths
+        are split into batches of 'datalad.metadata.extractor-batch-size'
+        paths that are processed by a pool of worker processes. Only a
+        limited number of batches is in flight at any time, and results
+        are reported in the order of `paths`. In worker processes,
+        extraction from any file that takes longer than
+        'datalad.metadata.extractor-timeout' seconds is aborted. Such
+        files, and files for which `_get_file_metadata()` raised a
+        `FileExtractionError`, are reported without metadata, and are
+        added to `failed_paths`.
+
+        Parameters
+        ----------
+        paths : list
+          Paths relative to the dataset root.
+
+        Returns
+        -------
+        generator((path, metadata_dict or None))
+        """
+        get_file_metadata = type(self)._get_file_metadata
+        jobs = self.ds.config.obtain(
+            'datalad.metadata.extractor-jobs',
+            default=1,
+            valtype=EnsureInt())
+        batch_size = self.ds.config.obtain(
+            'datalad.metadata.extractor-batch-size',
+            default=100,
+            valtype=EnsureInt())
+        if jobs < 2 or len(paths) <= batch_size:
+            # no timeouts in the main process, we cannot interrupt
+            # the extractor safely there
+            for p in paths:
+                try:
+                    meta = get_file_metadata(op.join(self.ds.path, p))
+                except FileExtractionError as e:
+                    lgr.debug('Metadata extraction from %s failed: %s', p, e)
+                    self.failed_paths.add(p)
+                    meta = None
+                yield p, meta
+            return
+
+        timeout = self.ds.config.get(
+            'datalad.metadata.extractor-timeout', None)
+        timeout = int(timeout) if timeout else None
+        lgr.debug('Extracting metadata from %i files with %i processes',
+                  len(paths), jobs)
+        # delayed import, only needed with multiple jobs
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(jobs) as executor:
+            pending = deque()
+            for i in range(0, len(paths), batch_size):
+                pending.append(executor.submit(
+                    _get_batch_metadata,
+                    get_file_metadata,
+                    self.ds.path,
+                    paths[i:i + batch_size],
+                    timeout))
+                # keep the number of in-flight results (and their memory
+                # footprint) bounded
+                if len(pending) >= 2 * jobs:
+                    yield from self._report_batch(pending.popleft().result())
+            while pending:
+                yield from self._report_batch(pending.popleft().result())
+
+    def _report_batch(self, batch):
+        results, failed = batch
+        self.failed_paths.update(failed)
+        yield from results
+        for p in failed:
+            yield p, None
@@ -32,9 +32,24 @@ def _return_as_appropriate_dtype(val):
 
 
 class MetadataExtractor(BaseMetadataExtractor):
+
+    CONTENT_CACHE_VERSION = '1'
+
     def get_metadata(self, dataset, content):
         if not content:
             return {}, []
+        return {
+            '@context': {
+                'exif': {
+                    '@id': 'http://www.w3.org/2003/12/exif/ns/',
+                    'description': 'Vocabulary to describe an Exif format picture data',
+                    'type': vocabulary_id,
+                },
+            },
+        }, \
+            self._get_content_metadata()
+
+    def _get_content_metadata(self):
         log_progress(
             lgr.info,
             'extractorexif',
@@ -43,37 +58,31 @@ class MetadataExtractor(BaseMetadataExtractor):
             label='EXIF metadata extraction',
             unit=' Files',
         )
-        contentmeta = []
-        for f in self.paths:
-            absfp = opj(self.ds.path, f)
+        for f, meta in self._iter_file_metadata(self.paths):
             log_progress(
                 lgr.info,
                 'extractorexif',
-                'Extract EXIF metadata from %s', absfp,
+                'Extracted EXIF metadata from %s', opj(self.ds.path, f),
                 update=1,
                 increment=True)
-            # TODO we might want to do some more elaborate extraction in the future
-            # but for now plain EXIF, no maker extensions, no thumbnails
-            info = process_file(open(opj(self.ds.path, f), 'rb'), details=False)
-            if not info:
+            if not meta:
                 # got nothing, likely nothing there
                 continue
-            meta = {k.split()[-1]: _return_as_appropriate_dtype(info[k].printable)
-                    for k in info}
-            contentmeta.append((f, meta))
+            yield f, meta
 
         log_progress(
             lgr.info,
             'extractorexif',
             'Finished EXIF metadata extraction from %s', self.ds
         )
-        return {
-            '@context': {
-                'exif': {
-                    '@id': 'http://www.w3.org/2003/12/exif/ns/',
-                    'description': 'Vocabulary to describe an Exif format picture data',
-                    'type': vocabulary_id,
-                },
-            },
-        }, \
-            contentmeta
+
+    @staticmethod
+    def _get_file_metadata(path):
+        # TODO we might want to do some more elaborate extraction in the future
+        # but for now plain EXIF, no maker extensions, no thumbnails
+        with open(path, 'rb') as f:
+            info = process_file(f, details=False)
+        if not info:
+            return None
+        return {k.split()[-1]: _return_as_appropriate_dtype(info[k].printable)
+                for k in info}
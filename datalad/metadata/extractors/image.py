@@ -13,8 +13,14 @@ import logging
 lgr = logging.getLogger('datalad.metadata.extractors.image')
 from datalad.log import log_progress
 
-from PIL import Image
-from datalad.metadata.extractors.base import BaseMetadataExtractor
+from PIL import (
+    Image,
+    UnidentifiedImageError,
+)
+from datalad.metadata.extractors.base import (
+    BaseMetadataExtractor,
+    FileExtractionError,
+)
 from datalad.dochelpers import exc_str
 
 
@@ -47,6 +53,8 @@ mode_map = {
 
 class MetadataExtractor(BaseMetadataExtractor):
 
+    CONTENT_CACHE_VERSION = '1'
+
     _extractors = {
         'format': lambda x: x.format_description,
         'dcterms:SizeOrDuration': lambda x: x.size,
@@ -57,7 +65,12 @@ class MetadataExtractor(BaseMetadataExtractor):
     def get_metadata(self, dataset, content):
         if not content:
             return {}, []
-        contentmeta = []
+        return {
+            '@context': vocabulary,
+        }, \
+            self._get_content_metadata()
+
+    def _get_content_metadata(self):
         log_progress(
             lgr.info,
             'extractorimage',
@@ -66,37 +79,40 @@ class MetadataExtractor(BaseMetadataExtractor):
             label='image metadata extraction',
             unit=' Files',
         )
-        for f in self.paths:
-            absfp = opj(self.ds.path, f)
+        for f, meta in self._iter_file_metadata(self.paths):
             log_progress(
                 lgr.info,
                 'extractorimage',
-                'Extract image metadata from %s', absfp,
+                'Extracted image metadata from %s', opj(self.ds.path, f),
                 update=1,
                 increment=True)
-            try:
-                img = Image.open(absfp)
-            except Exception as e:
-                lgr.debug("Image metadata extractor failed to load %s: %s",
-                          absfp, exc_str(e))
+            if meta is None:
                 continue
-            meta = {
-                'type': 'dctype:Image',
-            }
-
-            # run all extractors
-            meta.update({k: v(img) for k, v in self._extractors.items()})
-            # filter useless fields (empty strings and NaNs)
-            meta = {k: v for k, v in meta.items()
-                    if not (hasattr(v, '__len__') and not len(v))}
-            contentmeta.append((f, meta))
+            yield f, meta
 
         log_progress(
             lgr.info,
             'extractorimage',
             'Finished image metadata extraction from %s', self.ds
         )
-        return {
-            '@context': vocabulary,
-        }, \
-            contentmeta
+
+    @staticmethod
+    def _get_file_metadata(path):
+        try:
+            img = Image.open(path)
+        except UnidentifiedImageError as e:
+            # not an image, there is nothing to extract
+            lgr.debug("Image metadata extractor failed to load %s: %s",
+                      path, exc_str(e))
+            return None
+        except Exception as e:
+            raise FileExtractionError(exc_str(e))
+        meta = {
+            'type': 'dctype:Image',
+        }
+
+        # run all extractors
+        meta.update({k: v(img) for k, v in MetadataExtractor._extractors.items()})
+        # filter useless fields (empty strings and NaNs)
+        return {k: v for k, v in meta.items()
+                if not (hasattr(v, '__len__') and not len(v))}
@@ -8,9 +8,14 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Test all extractors at a basic level"""
 
-from pkg_resources import iter_entry_points
+import time
 from inspect import isgenerator
 from datalad.api import Dataset
+from datalad.metadata.extractors.base import (
+    BaseMetadataExtractor,
+    FileExtractionError,
+)
+from datalad.support.entrypoints import iter_entry_points
 from datalad.tests.utils import (
     assert_equal,
     assert_repo_status,
@@ -82,3 +87,67 @@ def test_api_git():
 @known_failure_githubci_win
 def test_api_annex():
     yield check_api, True
+
+
+class _SizeExtractor(BaseMetadataExtractor):
+    @staticmethod
+    def _get_file_metadata(path):
+        with open(path) as f:
+            content = f.read()
+        if content == 'slow':
+            time.sleep(5)
+        return {'content': content} if content else None
+
+
+@with_tree(tree={'f{}'.format(i): str(i) for i in range(7)})
+def test_iter_file_metadata(path):
+    ds = Dataset(path).create(force=True)
+    paths = sorted('f{}'.format(i) for i in range(7))
+    target = [(p, {'content': p[1:]}) for p in paths]
+    # serial
+    assert_equal(list(_SizeExtractor(ds, paths)._get_content_metadata()),
+                 target)
+    # worker processes, results come in order nevertheless
+    ds.config.set('datalad.metadata.extractor-jobs', '2', where='local')
+    ds.config.set('datalad.metadata.extractor-batch-size', '2', where='local')
+    assert_equal(list(_SizeExtractor(ds, paths)._get_content_metadata()),
+                 target)
+
+
+@with_tree(tree={'a': 'slow', 'b': 'fast', 'c': ''})
+def test_iter_file_metadata_timeout(path):
+    ds = Dataset(path).create(force=True)
+    ds.config.set('datalad.metadata.extractor-jobs', '2', where='local')
+    ds.config.set('datalad.metadata.extractor-batch-size', '1', where='local')
+    ds.config.set('datalad.metadata.extractor-timeout', '1', where='local')
+    extractor = _SizeExtractor(ds, ['a', 'b', 'c'])
+    # timed out files are reported without metadata
+    assert_equal(
+        list(extractor._iter_file_metadata(extractor.paths)),
+        [('a', None), ('b', {'content': 'fast'}), ('c', None)])
+    assert_equal(extractor.failed_paths, {'a'})
+
+
+class _FailingExtractor(BaseMetadataExtractor):
+    @staticmethod
+    def _get_file_metadata(path):
+        with open(path) as f:
+            content = f.read()
+        if content == 'broken':
+            raise FileExtractionError('cannot parse')
+        return {'content': content}
+
+
+@with_tree(tree={'a': 'broken', 'b': 'fine'})
+def test_iter_file_metadata_failed(path):
+    ds = Dataset(path).create(force=True)
+    target = [('a', None), ('b', {'content': 'fine'})]
+    extractor = _FailingExtractor(ds, ['a', 'b'])
+    assert_equal(list(extractor._iter_file_metadata(extractor.paths)), target)
+    assert_equal(extractor.failed_paths, {'a'})
+    # same in worker processes
+    ds.config.set('datalad.metadata.extractor-jobs', '2', where='local')
+    ds.config.set('datalad.metadata.extractor-batch-size', '1', where='local')
+    extractor = _FailingExtractor(ds, ['a', 'b'])
+    assert_equal(list(extractor._iter_file_metadata(extractor.paths)), target)
+    assert_equal(extractor.failed_paths, {'a'})
@@ -8,12 +8,15 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Test image extractor"""
 
+from unittest.mock import patch
+
 from datalad.tests.utils import (
     assert_in,
     assert_repo_status,
     assert_result_count,
     assert_status,
     eq_,
+    patch_config,
     SkipTest,
     with_tempfile,
 )
@@ -61,3 +64,35 @@ def test_image(path):
         eq_(meta[k], v)
 
     assert_in('@context', meta)
+
+
+@with_tempfile(mkdir=True)
+@with_tempfile(mkdir=True)
+def test_image_cached(path, cachedir):
+    ds = Dataset(path).create()
+    ds.config.add('datalad.metadata.nativetype', 'image', where='dataset')
+    copy(
+        opj(dirname(dirname(dirname(__file__))), 'tests', 'data', 'exif.jpg'),
+        path)
+    ds.save()
+    with patch_config({'datalad.locations.cache': cachedir}):
+        # a file that could not be read is not cached
+        with patch('PIL.Image.open', side_effect=OSError):
+            res = ds.extract_metadata(types=['image'], files=['exif.jpg'])
+        assert_result_count(res, 0, type='file')
+        res = ds.extract_metadata(types=['image'], files=['exif.jpg'])
+        assert_result_count(res, 1, type='file')
+        eq_(res[1]['metadata']['image']['color_mode'], target['color_mode'])
+        # same content, no need to look at the file again
+        with patch('PIL.Image.open', side_effect=RuntimeError):
+            res = ds.extract_metadata(types=['image'], files=['exif.jpg'])
+        assert_result_count(res, 1, type='file')
+        meta = res[1]['metadata']['image']
+        for k, v in target.items():
+            eq_(meta[k], v)
+        # unless caching is disabled
+        ds.config.set('datalad.metadata.extractor-cache', 'no',
+                      where='local')
+        with patch('PIL.Image.open', side_effect=RuntimeError):
+            res = ds.extract_metadata(types=['image'], files=['exif.jpg'])
+        assert_result_count(res, 0, type='file')
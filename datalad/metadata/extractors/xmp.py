@@ -12,7 +12,6 @@ https://en.wikipedia.org/wiki/Extensible_Metadata_Platform
 """
 
 import re
-from os.path import join as opj
 import logging
 lgr = logging.getLogger('datalad.metadata.extractors.xmp')
 from datalad.log import log_progress
@@ -39,72 +38,34 @@ class MetadataExtractor(BaseMetadataExtractor):
             '.*(jpg|jpeg|pdf|gif|tiff|tif|ps|eps|png|mp3|mp4|avi|wav)$')
         fname_match_regex = re.compile(fname_match_regex)
 
+        # run basic file name filter for performance reasons
+        # it is OK to let false-positives through
+        paths = [f for f in self.paths
+                 if fname_match_regex.match(f, re.IGNORECASE) is not None]
+
         log_progress(
             lgr.info,
             'extractorxmp',
             'Start XMP metadata extraction from %s', self.ds,
-            total=len(self.paths),
+            total=len(paths),
             label='XMP metadata extraction',
             unit=' Files',
         )
-        for f in self.paths:
+        # the context is built from all files, hence the full content
+        # metadata needs to be known before we can report
+        for f, res in self._iter_file_metadata(paths):
             log_progress(
                 lgr.info,
                 'extractorxmp',
-                'Extract XMP metadata from %s', f,
+                'Extracted XMP metadata from %s', f,
                 update=1,
                 increment=True)
-            # run basic file name filter for performance reasons
-            # it is OK to let false-positives through
-            if fname_match_regex.match(f, re.IGNORECASE) is None:
-                continue
-            absfp = opj(self.ds.path, f)
-            info = file_to_dict(absfp)
-            if not info:
-                # got nothing, likely nothing there
-                # TODO check if this is an XMP sidecar file, parse that, and assign metadata
-                # to the base file
+            if res is None:
                 continue
-            # update vocabulary
-            vocab = {info[ns][0][0].split(':')[0]: {'@id': ns, 'type': vocabulary_id} for ns in info}
+            vocab, meta = res
             # TODO this is dirty and assumed that XMP is internally consistent with the
             # definitions across all files -- which it likely isn't
             context.update(vocab)
-            # now pull out actual metadata
-            # cannot do simple dict comprehension, because we need to beautify things a little
-
-            meta = {}
-            for ns in info:
-                for key, val, props in info[ns]:
-                    if not val:
-                        # skip everything empty
-                        continue
-                    if key.count('[') > 1:
-                        # this is a nested array
-                        # MIH: I do not think it is worth going here
-                        continue
-                    if props['VALUE_IS_ARRAY']:
-                        # we'll catch the actuall array values later
-                        continue
-                    # normalize value
-                    val = ensure_unicode(val)
-                    # non-breaking space
-                    val = val.replace(u"\xa0", ' ')
-
-                    field, idx, qual = xmp_field_re.match(key).groups()
-                    normkey = u'{}{}'.format(field, qual)
-                    if '/' in key:
-                        normkey = u'{0}<{1}>'.format(*normkey.split('/'))
-                    if idx:
-                        # array
-                        arr = meta.get(normkey, [])
-                        arr.append(val)
-                        meta[normkey] = arr
-                    else:
-                        meta[normkey] = val
-            # compact
-            meta = {k: v[0] if isinstance(v, list) and len(v) == 1 else v for k, v in meta.items()}
-
             contentmeta.append((f, meta))
 
         log_progress(
@@ -116,3 +77,50 @@ class MetadataExtractor(BaseMetadataExtractor):
             '@context': context,
         }, \
             contentmeta
+
+    @staticmethod
+    def _get_file_metadata(path):
+        """Returns a vocabulary and metadata tuple, or None"""
+        info = file_to_dict(path)
+        if not info:
+            # got nothing, likely nothing there
+            # TODO check if this is an XMP sidecar file, parse that, and assign metadata
+            # to the base file
+            return None
+        # vocabulary
+        vocab = {info[ns][0][0].split(':')[0]: {'@id': ns, 'type': vocabulary_id} for ns in info}
+        # now pull out actual metadata
+        # cannot do simple dict comprehension, because we need to beautify things a little
+
+        meta = {}
+        for ns in info:
+            for key, val, props in info[ns]:
+                if not val:
+                    # skip everything empty
+                    continue
+                if key.count('[') > 1:
+                    # this is a nested array
+                    # MIH: I do not think it is worth going here
+                    continue
+                if props['VALUE_IS_ARRAY']:
+                    # we'll catch the actuall array values later
+                    continue
+                # normalize value
+                val = ensure_unicode(val)
+                # non-breaking space
+                val = val.replace(u"\xa0", ' ')
+
+                field, idx, qual = xmp_field_re.match(key).groups()
+                normkey = u'{}{}'.format(field, qual)
+                if '/' in key:
+                    normkey = u'{0}<{1}>'.format(*normkey.split('/'))
+                if idx:
+                    # array
+                    arr = meta.get(normkey, [])
+                    arr.append(val)
+                    meta[normkey] = arr
+                else:
+                    meta[normkey] = val
+        # compact
+        meta = {k: v[0] if isinstance(v, list) and len(v) == 1 else v for k, v in meta.items()}
+        return vocab, meta
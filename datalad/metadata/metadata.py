@@ -16,9 +16,13 @@ import logging
 import re
 import os
 import os.path as op
+import tempfile
+from bisect import bisect_left
 from collections import (
     OrderedDict,
 )
+from functools import lru_cache
+from hashlib import md5
 
 from datalad import cfg
 from datalad.interface.annotate_paths import AnnotatePaths
@@ -38,6 +42,8 @@ from datalad.support.annexrepo import AnnexRepo
 from datalad.support.param import Parameter
 import datalad.support.ansi_colors as ac
 from datalad.support.json_py import (
+    dump2fileobj,
+    json_dump_kwargs,
     load as jsonload,
     load_xzstream,
 )
@@ -56,6 +62,7 @@ from datalad.utils import (
     path_is_subpath,
     path_startswith,
     as_unicode,
+    PurePosixPath,
 )
 from datalad.ui import ui
 from datalad.dochelpers import (
@@ -155,19 +162,68 @@ def _get_containingds_from_agginfo(info, rpath):
       info dict).
     """
     if rpath in info:
-        dspath = rpath
-    else:
-        # not a direct hit, hence we find the closest
-        # containing subdataset (if there is any)
-        containing_ds = sorted(
-            [subds for subds in sorted(info)
-             if path_is_subpath(rpath, subds)],
-            # TODO os.sep might not be OK on windows,
-            # depending on where it was aggregated, ensure uniform UNIX
-            # storage
-            key=lambda x: x.count(os.sep), reverse=True)
-        dspath = containing_ds[0] if len(containing_ds) else None
-    return dspath
+        return rpath
+    if info and op.isabs(rpath) != op.isabs(next(iter(info))):
+        raise ValueError("Both paths must either be absolute or relative. "
+                         "Got %r and %r" % (rpath, next(iter(info))))
+    # not a direct hit, hence we find the closest containing subdataset
+    # (if there is any) by walking up the query path, rather than
+    # inspecting all known datasets
+    # TODO os.sep might not be OK on windows,
+    # depending on where it was aggregated, ensure uniform UNIX
+    # storage
+    path = op.normpath(rpath)
+    parent = op.dirname(path)
+    while parent and parent != path:
+        if parent in info:
+            return parent
+        path, parent = parent, op.dirname(parent)
+    return None
+
+
+class _PathIndex(object):
+    """Sorted index of paths for fast subtree queries
+
+    Paths are sorted by their components, which places all paths underneath
+    any given path in a contiguous range right after it. A subtree is
+    located by bisection, instead of testing each path for a common prefix.
+    """
+    def __init__(self, paths):
+        self._entries = sorted(
+            (tuple(op.normpath(p).split(op.sep)), p) for p in paths)
+        self._keys = [e[0] for e in self._entries]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def iter_subpaths(self, path, include_self=False):
+        """Yield all indexed paths underneath `path` in sorted order
+
+        Parameters
+        ----------
+        path : str
+          Query path, must follow the convention (absolute or relative) of
+          the indexed paths. `op.curdir` matches all relative paths.
+        include_self : bool
+          Whether to report an indexed path that matches `path` itself.
+        """
+        if not self._entries:
+            return
+        if op.isabs(path) != op.isabs(self._entries[0][1]):
+            raise ValueError("Both paths must either be absolute or relative. "
+                             "Got %r and %r" % (path, self._entries[0][1]))
+        key = tuple(op.normpath(path).split(op.sep))
+        if key == (op.curdir,):
+            for k, p in self._entries:
+                if include_self or k != key:
+                    yield p
+            return
+        n = len(key)
+        for k, p in self._entries[bisect_left(self._keys, key):]:
+            if k[:n] != key:
+                break
+            if include_self or len(k) > n:
+                yield p
 
 
 def query_aggregated_metadata(reporton, ds, aps, recursive=False,
@@ -204,6 +260,8 @@ def query_aggregated_metadata(reporton, ds, aps, recursive=False,
     from datalad.coreapi import get
     # look for and load the aggregation info for the base dataset
     agginfos, agg_base_path = load_ds_aggregate_db(ds)
+    # for subtree queries
+    agginfo_index = _PathIndex(agginfos)
 
     # cache once loaded metadata objects for additional lookups
     # TODO possibly supply this cache from outside, if objects could
@@ -211,6 +269,8 @@ def query_aggregated_metadata(reporton, ds, aps, recursive=False,
     # if done, cache under relpath, not abspath key
     cache = {
         'objcache': {},
+        # path indices of content metadata objects
+        'pathindex': {},
         'subds_relpaths': None,
     }
     reported = set()
@@ -245,11 +305,9 @@ def query_aggregated_metadata(reporton, ds, aps, recursive=False,
         if recursive:
             # in case of recursion this is also anything in any dataset underneath
             # the query path
+            # (we already have the base dataset)
             matching_subds = [{'metaprovider': sub, 'rpath': sub, 'type': 'dataset'}
-                              for sub in sorted(agginfos)
-                              # we already have the base dataset
-                              if (rpath == op.curdir and sub != op.curdir) or
-                              path_is_subpath(sub, rpath)]
+                              for sub in agginfo_index.iter_subpaths(rpath)]
             to_query.extend(matching_subds)
 
         to_query_available = []
@@ -357,10 +415,11 @@ def _query_aggregated_metadata_singlepath(
     contentmeta = _load_xz_json_stream(
         op.join(agg_base_path, contentinfo_objloc),
         cache=cache['objcache']) if contentinfo_objloc else {}
+    if contentinfo_objloc not in cache['pathindex']:
+        cache['pathindex'][contentinfo_objloc] = _PathIndex(contentmeta)
 
-    for fpath in [f for f in contentmeta.keys()
-                  if rparentpath == op.curdir or
-                  path_startswith(f, rparentpath)]:
+    for fpath in cache['pathindex'][contentinfo_objloc].iter_subpaths(
+            rparentpath, include_self=True):
         # we might be onto something here, prepare result
         metadata = contentmeta.get(fpath, {})
 
@@ -427,6 +486,195 @@ def _ok_metadata(meta, mtype, ds, loc):
     return False
 
 
+@lru_cache()
+def _get_extractor_registry():
+    """Return the available metadata extractors
+
+    Discovery only inspects entry point declarations, no extractor module
+    is imported. Some extractors depend on heavy modules, which should only
+    be imported when such an extractor is actually used (see
+    `_load_extractor()`).
+
+    Returns
+    -------
+    ReadOnlyDict
+      Extractor names mapped to their entry points.
+    """
+    from datalad.support.entrypoints import iter_entry_points
+    return ReadOnlyDict(
+        {ep.name: ep
+         for ep in iter_entry_points('datalad.metadata.extractors')})
+
+
+def _get_extractors(types):
+    """Return the extractor registry, rediscovered if any type is missing
+
+    The registry is memoized for the lifetime of the process, but an
+    extension providing the missing extractors could have been installed
+    since it was built.
+
+    Parameters
+    ----------
+    types : list
+      Names of the extractors that are needed.
+    """
+    extractors = _get_extractor_registry()
+    if any(t not in extractors for t in types):
+        from datalad.support.entrypoints import rediscover_entry_points
+        rediscover_entry_points()
+        _get_extractor_registry.cache_clear()
+        _load_extractor.cache_clear()
+        extractors = _get_extractor_registry()
+    return extractors
+
+
+@lru_cache()
+def _load_extractor(name):
+    """Import and return the class of a metadata extractor
+
+    Parameters
+    ----------
+    name : str
+      Name of an extractor in the registry.
+    """
+    ep = _get_extractor_registry()[name]
+    lgr.debug('Loading metadata extractor %s from %s', name, ep.module_name)
+    return ep.load()
+
+
+def _get_content_ids(ds, paths):
+    """Map relative file paths to the identity of their content
+
+    The identity is the annex key for annex'ed files, and the Git blob
+    shasum otherwise. Only files among `paths` that are unmodified with
+    respect to the last commit are reported, as for any other file the
+    recorded identity need not match the content in the worktree.
+    """
+    repo = ds.repo
+    status = repo.status(
+        paths=[PurePosixPath(p) for p in paths],
+        untracked='no',
+        eval_submodule_state='no')
+    info = OrderedDict(
+        (p, props) for p, props in status.items()
+        if props.get('state') == 'clean' and props.get('type') != 'dataset')
+    if info and isinstance(repo, AnnexRepo):
+        info = repo.get_content_annexinfo(
+            paths=[p.relative_to(repo.pathobj) for p in info],
+            init=info)
+    return {
+        p.relative_to(repo.pathobj).as_posix(): props.get('key') or props['gitshasum']
+        for p, props in info.items()
+        if props.get('key') or props.get('gitshasum')
+    }
+
+
+def _get_content_cache_dir(ds, mtype, extractor_cls):
+    """Return the location of the content metadata cache of an extractor
+
+    None is returned, if the extractor does not support caching, or caching
+    is disabled.
+    """
+    # extractors of extensions need not be derived from BaseMetadataExtractor
+    version = getattr(extractor_cls, 'CONTENT_CACHE_VERSION', None)
+    if version is None or not ds.config.obtain(
+            'datalad.metadata.extractor-cache',
+            default=True,
+            valtype=EnsureBool()):
+        return None
+    return op.join(
+        cfg.obtain('datalad.locations.cache'),
+        'metadata',
+        '{}-{}'.format(mtype, version))
+
+
+def _get_content_cache_fpath(cache_dir, content_id):
+    # annex keys can be long and contain any character
+    content_id = md5(content_id.encode()).hexdigest()
+    return op.join(cache_dir, content_id[:2], content_id)
+
+
+def _split_cached_content_metadata(cache_dir, paths, content_ids):
+    """Split paths into those that need extraction and those with cached metadata
+
+    Returns
+    -------
+    list, dict
+      Paths without a cache record, and a mapping of path to cached
+      metadata (None, if the extractor reported no metadata for a file).
+    """
+    uncached = []
+    cached = {}
+    for p in paths:
+        cid = content_ids.get(p, None)
+        fpath = _get_content_cache_fpath(cache_dir, cid) if cid else None
+        if fpath is None or not op.exists(fpath):
+            uncached.append(p)
+            continue
+        try:
+            cached[p] = jsonload(fpath)['metadata']
+        except Exception as e:
+            # incomplete write, or otherwise broken record, simply extract again
+            lgr.debug('Ignoring cached metadata record %s: %s',
+                      fpath, exc_str(e))
+            uncached.append(p)
+    lgr.debug('Found cached content metadata for %i out of %i paths in %s',
+              len(cached), len(paths), cache_dir)
+    return uncached, cached
+
+
+def _write_content_cache_record(cache_dir, content_id, meta):
+    """Atomically (re)place the cache record of a content
+
+    Failures are logged and otherwise ignored, the cache is merely an
+    optimization.
+    """
+    fpath = _get_content_cache_fpath(cache_dir, content_id)
+    tmp = None
+    try:
+        # extractors of different datasets could create it concurrently
+        os.makedirs(op.dirname(fpath), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            prefix='.', suffix='.tmp', dir=op.dirname(fpath))
+        with os.fdopen(fd, 'wb') as f:
+            dump2fileobj({'metadata': meta}, f, **json_dump_kwargs)
+        # readers never see a partial record
+        os.replace(tmp, fpath)
+    except Exception as e:
+        lgr.debug('Could not cache content metadata in %s: %s',
+                  fpath, exc_str(e))
+        if tmp is not None and op.lexists(tmp):
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def _cache_content_metadata(contentmeta, cache_dir, paths, content_ids, cached,
+                            failed=()):
+    """Pass on extracted content metadata, and cache it on the way
+
+    Any path without extracted metadata gets a cache record too, so that
+    it is not processed again, unless it is in `failed` (a container that
+    the extractor may still populate while `contentmeta` is consumed).
+    Cached metadata is reported last.
+    """
+    noreport = set(paths)
+    for loc, meta in contentmeta:
+        noreport.discard(loc)
+        cid = content_ids.get(loc, None)
+        if cid and loc not in failed:
+            _write_content_cache_record(cache_dir, cid, meta)
+        yield loc, meta
+    for p in noreport:
+        cid = content_ids.get(p, None)
+        if cid and p not in failed:
+            _write_content_cache_record(cache_dir, cid, None)
+    for loc, meta in cached.items():
+        if meta is not None:
+            yield loc, meta
+
+
 def _get_metadata(ds, types, global_meta=None, content_meta=None, paths=None):
     """Make a direct query of a dataset to extract its metadata.
 
@@ -470,9 +718,7 @@ def _get_metadata(ds, types, global_meta=None, content_meta=None, paths=None):
         default=[]))]
     # enforce size limits
     max_fieldsize = ds.config.obtain('datalad.metadata.maxfieldsize')
-    # keep local, who knows what some extractors might pull in
-    from pkg_resources import iter_entry_points  # delayed heavy import
-    extractors = {ep.name: ep for ep in iter_entry_points('datalad.metadata.extractors')}
+    extractors = _get_extractors(types)
 
     # we said that we want to fail, rather then just moan about less metadata
     # Do an early check if all extractors are available so not to wait hours
@@ -486,6 +732,10 @@ def _get_metadata(ds, types, global_meta=None, content_meta=None, paths=None):
              single_or_plural(" is", "s are", len(absent_extractors)),
              ', '.join(absent_extractors)))
 
+    # identity of file content, determined once when needed for the
+    # content metadata cache
+    content_ids = None
+
     log_progress(
         lgr.info,
         'metadataextractors',
@@ -502,11 +752,25 @@ def _get_metadata(ds, types, global_meta=None, content_meta=None, paths=None):
             'Engage %s metadata extractor', mtype_key,
             update=1,
             increment=True)
+        want_content = content_meta if content_meta is not None else ds.config.obtain(
+            'datalad.metadata.aggregate-content-{}'.format(mtype.replace('_', '-')),
+            default=True,
+            valtype=EnsureBool())
         try:
-            extractor_cls = extractors[mtype_key].load()
+            extractor_cls = _load_extractor(mtype_key)
+            extractor_paths = paths if extractor_cls.NEEDS_CONTENT else fullpathlist
+            cache_dir = _get_content_cache_dir(ds, mtype, extractor_cls) \
+                if want_content and extractor_paths else None
+            if cache_dir:
+                if content_ids is None:
+                    content_ids = _get_content_ids(ds, fullpathlist)
+                # only extract from files whose content is not yet known
+                extractor_paths, cached_contentmeta = \
+                    _split_cached_content_metadata(
+                        cache_dir, extractor_paths, content_ids)
             extractor = extractor_cls(
                 ds,
-                paths=paths if extractor_cls.NEEDS_CONTENT else fullpathlist)
+                paths=extractor_paths)
         except Exception as e:
             log_progress(
                 lgr.error,
@@ -523,10 +787,7 @@ def _get_metadata(ds, types, global_meta=None, content_meta=None, paths=None):
                     'datalad.metadata.aggregate-dataset-{}'.format(mtype.replace('_', '-')),
                     default=True,
                     valtype=EnsureBool()),
-                content=content_meta if content_meta is not None else ds.config.obtain(
-                    'datalad.metadata.aggregate-content-{}'.format(mtype.replace('_', '-')),
-                    default=True,
-                    valtype=EnsureBool()))
+                content=want_content)
         except Exception as e:
             lgr.error('Failed to get dataset metadata ({}): {}'.format(
                 mtype, exc_str(e)))
@@ -541,6 +802,16 @@ def _get_metadata(ds, types, global_meta=None, content_meta=None, paths=None):
             # if we dont get global metadata we do not want content metadata
             continue
 
+        if cache_dir and contentmeta_t is not None:
+            contentmeta_t = _cache_content_metadata(
+                contentmeta_t,
+                cache_dir,
+                extractor_paths,
+                content_ids,
+                cached_contentmeta,
+                # extraction timed out or failed, try again next time
+                failed=getattr(extractor, 'failed_paths', ()))
+
         if dsmeta_t:
             if _ok_metadata(dsmeta_t, mtype, ds, None):
                 dsmeta_t = _filter_metadata_fields(
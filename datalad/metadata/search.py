@@ -174,7 +174,10 @@ def _meta2autofield_dict(meta, val2str=True, schema=None, consider_ucn=True):
                 yield key, v
 
     def get_indexer(metadata_format_name: str) -> callable:
-        from pkg_resources import EntryPoint, iter_entry_points
+        from datalad.support.entrypoints import (
+            EntryPoint,
+            iter_entry_points,
+        )
 
         all_indexers = tuple(iter_entry_points('datalad.metadata.indexers', metadata_format_name))
         if all_indexers:
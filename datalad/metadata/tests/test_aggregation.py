@@ -100,6 +100,34 @@ def test_basic_aggregate(path):
         assert_dict_equal(d, a)
 
 
+@slow
+@known_failure_githubci_win
+@with_tree(tree=_dataset_hierarchy_template)
+def test_aggregate_parallel(path):
+    base = Dataset(opj(path, 'origin')).create(force=True)
+    base.create('sub', force=True)
+    base.create(opj('sub', 'subsub'), force=True)
+    base.save(recursive=True)
+    assert_repo_status(base.path)
+    agginfo_path = opj(base.path, '.datalad', 'metadata', 'aggregate_v1.json')
+    base.aggregate_metadata(recursive=True, jobs=0)
+    assert_repo_status(base.path)
+    with open(agginfo_path) as f:
+        serial_agginfo = f.read()
+    serial_meta = base.metadata(recursive=True, return_type='list')
+    # no change detection, all datasets are processed again, concurrently
+    res = base.aggregate_metadata(
+        recursive=True, force_extraction=True, jobs=3)
+    assert_status(('ok', 'notneeded'), res)
+    assert_repo_status(base.path)
+    with open(agginfo_path) as f:
+        eq_(serial_agginfo, f.read())
+    parallel_meta = base.metadata(recursive=True, return_type='list')
+    eq_(len(serial_meta), len(parallel_meta))
+    for s, p in zip(serial_meta, parallel_meta):
+        assert_dict_equal(s, p)
+
+
 # tree puts aggregate metadata structures on two levels inside a dataset
 @known_failure_githubci_win
 @with_tree(tree={
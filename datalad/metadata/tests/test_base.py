@@ -10,6 +10,9 @@
 """Test metadata """
 
 import logging
+import os
+import sys
+from unittest.mock import patch
 
 from os.path import (
     join as opj,
@@ -24,10 +27,21 @@ from datalad.api import (
     metadata,
 )
 from datalad.metadata.metadata import (
+    _cache_content_metadata,
     _get_containingds_from_agginfo,
+    _get_content_ids,
+    _get_extractor_registry,
+    _get_extractors,
+    _load_extractor,
+    _PathIndex,
+    _split_cached_content_metadata,
     get_metadata_type,
     query_aggregated_metadata,
 )
+from datalad.cmd import (
+    StdOutErrCapture,
+    WitlessRunner,
+)
 from datalad.utils import (
     chpwd,
     ensure_unicode,
@@ -54,6 +68,7 @@ from datalad.support.exceptions import (
     InsufficientArgumentsError,
     NoDatasetFound,
 )
+from datalad.support.entrypoints import EntryPoint
 from datalad.support.gitrepo import GitRepo
 from datalad.support.annexrepo import AnnexRepo
 
@@ -283,3 +298,118 @@ def test_get_containingds_from_agginfo():
     # will not tollerate mix'n'match
     assert_raises(ValueError, _get_containingds_from_agginfo, {'match': {}}, op.abspath(down))
     assert_raises(ValueError, _get_containingds_from_agginfo, {op.abspath('match'): {}}, down)
+
+
+def test_extractor_registry():
+    registry = _get_extractor_registry()
+    assert_in('datalad_core', registry)
+    # memoized
+    assert_true(registry is _get_extractor_registry())
+    assert_true(_get_extractors(['datalad_core']) is registry)
+    from datalad.metadata.extractors.datalad_core import MetadataExtractor
+    assert_true(_load_extractor('datalad_core') is MetadataExtractor)
+
+    # an extractor that was installed after the discovery is found
+    ep = EntryPoint(
+        'fake', 'datalad.metadata.extractors',
+        'datalad.metadata.extractors.datalad_core:MetadataExtractor')
+    try:
+        with patch('datalad.support.entrypoints.iter_entry_points',
+                   return_value=[ep]):
+            eq_(list(_get_extractors(['fake'])), ['fake'])
+            assert_true(_load_extractor('fake') is MetadataExtractor)
+    finally:
+        _get_extractor_registry.cache_clear()
+        _load_extractor.cache_clear()
+    assert_in('datalad_core', _get_extractor_registry())
+
+
+def test_extractor_registry_no_imports():
+    # discovering extractors must not import any of them, and hence none
+    # of their dependencies
+    runner = WitlessRunner()
+    out = runner.run(
+        [sys.executable,
+         '-c',
+         'import sys; '
+         'from datalad.metadata.metadata import _get_extractor_registry; '
+         'assert "image" in _get_extractor_registry(); '
+         'print([k for k in sys.modules '
+         'if k.startswith(("datalad.metadata.extractors.", "PIL"))])'],
+        protocol=StdOutErrCapture)
+    eq_(out['stdout'].strip(), '[]')
+
+
+def test_pathindex():
+    eq_([], list(_PathIndex([]).iter_subpaths('any')))
+    down = op.join('match', 'down')
+    down_under = op.join(down, 'under')
+    idx = _PathIndex(
+        [op.curdir, 'match', down_under, 'match-other', down, 'other'])
+    eq_(len(idx), 6)
+    eq_([down, down_under], list(idx.iter_subpaths('match')))
+    eq_(['match', down, down_under],
+        list(idx.iter_subpaths('match', include_self=True)))
+    # no partial name matches
+    eq_([], list(idx.iter_subpaths('matc')))
+    eq_([], list(idx.iter_subpaths(down_under)))
+    eq_([down_under], list(idx.iter_subpaths(down_under, include_self=True)))
+    # everything underneath the root
+    eq_(['match', down, down_under, 'match-other', 'other'],
+        list(idx.iter_subpaths(op.curdir)))
+    eq_(6, len(list(idx.iter_subpaths(op.curdir, include_self=True))))
+    # will not tollerate mix'n'match
+    assert_raises(ValueError, list, idx.iter_subpaths(op.abspath('match')))
+
+
+@with_tempfile(mkdir=True)
+def test_cache_content_metadata(cache_dir):
+    content_ids = {'a': 'KEY-a', 'b': 'KEY-b', 'c': 'KEY-c', 'd': 'KEY-d'}
+    paths = sorted(content_ids)
+    extracted = [('a', {'some': 'meta'}), ('c', None)]
+    # a failed extraction is reported, but not cached
+    eq_(list(_cache_content_metadata(
+        extracted, cache_dir, paths, content_ids, {}, failed={'c', 'd'})),
+        extracted)
+    uncached, cached = _split_cached_content_metadata(
+        cache_dir, paths, content_ids)
+    eq_(uncached, ['c', 'd'])
+    eq_(cached, {'a': {'some': 'meta'}, 'b': None})
+
+    # failure to write the cache does not affect the results,
+    # and leaves no partial records behind
+    with patch('datalad.metadata.metadata.os.replace',
+               side_effect=OSError('No space left on device')):
+        eq_(list(_cache_content_metadata(
+            extracted, cache_dir, paths, content_ids, {})),
+            extracted)
+    eq_(_split_cached_content_metadata(cache_dir, paths, content_ids),
+        (uncached, cached))
+    eq_([f for _, _, files in os.walk(cache_dir)
+         for f in files if f.endswith('.tmp')],
+        [])
+
+
+@with_tree({'clean': 'clean', 'modified': 'modified', 'other': 'other',
+            'ingit': 'ingit'})
+def test_get_content_ids(path):
+    ds = Dataset(path).create(force=True)
+    ds.save(['ingit'], to_git=True)
+    ds.save()
+    repo = ds.repo
+    ids = _get_content_ids(ds, ['clean', 'modified', 'ingit'])
+    # only the requested files are reported
+    eq_(sorted(ids), ['clean', 'ingit', 'modified'])
+    eq_(ids['clean'], repo.get_file_key('clean'))
+    eq_(ids['ingit'],
+        repo.get_content_info(paths=['ingit'])[repo.pathobj / 'ingit']
+        ['gitshasum'])
+
+    # a modified file has no identity, whether or not the
+    # modification is staged
+    repo.unlock(['modified'])
+    (repo.pathobj / 'modified').write_text('changed')
+    (repo.pathobj / 'ingit').write_text('changed')
+    repo.add(['ingit'], git=True)
+    eq_(_get_content_ids(ds, ['clean', 'modified', 'ingit']),
+        {'clean': ids['clean']})
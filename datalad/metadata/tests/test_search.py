@@ -19,7 +19,7 @@ from os.path import (
     join as opj,
 )
 
-from pkg_resources import EntryPoint
+from datalad.support.entrypoints import EntryPoint
 
 from datalad.api import Dataset
 from datalad.utils import (
@@ -387,7 +387,7 @@ def test_external_indexer():
     def _mocked_iter_entry_points(group, metadata):
         yield MockedEntryPoint()
 
-    with patch('pkg_resources.iter_entry_points',
+    with patch('datalad.support.entrypoints.iter_entry_points',
                MagicMock(side_effect=_mocked_iter_entry_points)):
         index = _meta2autofield_dict({
             'datalad_unique_content_properties': {
@@ -422,7 +422,7 @@ def test_faulty_external_indexer():
     def _mocked_iter_entry_points(group, metadata):
         yield MockedEntryPoint()
 
-    with patch('pkg_resources.iter_entry_points',
+    with patch('datalad.support.entrypoints.iter_entry_points',
                MagicMock(side_effect=_mocked_iter_entry_points)):
 
         index = _meta2autofield_dict({
@@ -458,7 +458,7 @@ def test_multiple_entry_points():
         yield MockedEntryPoint()
         yield MockedEntryPoint()
 
-    with patch('pkg_resources.iter_entry_points',
+    with patch('datalad.support.entrypoints.iter_entry_points',
                MagicMock(side_effect=_mocked_iter_entry_points)):
 
         index = _meta2autofield_dict({
@@ -9,13 +9,19 @@
 """Create and update a dataset from a list of URLs.
 """
 
+from collections import deque
 from collections.abc import Mapping
 
+import itertools
 import logging
 import os
+import pickle
+import queue
 import re
 import string
 import sys
+import tempfile
+import threading
 
 from functools import partial
 from urllib.parse import urlparse
@@ -40,10 +46,11 @@ from datalad.support.parallel import (
     ProducerConsumerProgressLog,
     no_parentds_in_futures,
 )
-from datalad.support.s3 import get_versioned_url
+from datalad.support.s3 import get_versioned_urls
 from datalad.utils import (
     ensure_list,
     get_suggestions_msg,
+    get_tempfile_kwargs,
     Path,
     unlink,
 )
@@ -60,6 +67,9 @@ class Formatter(string.Formatter):
     mapping whose keys are exposed as placeholders (e.g.,
     "{key1}.py").
 
+    Format strings are compiled once (see `compile`) and reused for all
+    subsequent calls that pass only a mapping.
+
     Parameters
     ----------
     idx_to_name : dict
@@ -73,12 +83,73 @@ class Formatter(string.Formatter):
     def __init__(self, idx_to_name=None, missing_value=None):
         self.idx_to_name = idx_to_name or {}
         self.missing = missing_value
+        self._compiled = {}
 
     def format(self, format_string, *args, **kwargs):
         if not isinstance(args[0], Mapping):
             raise ValueError("First positional argument should be mapping")
+        if len(args) == 1 and not kwargs:
+            try:
+                format_row = self._compiled[format_string]
+            except KeyError:
+                format_row = self._compiled[format_string] = \
+                    self.compile(format_string)
+            return format_row(args[0])
         return super(Formatter, self).format(format_string, *args, **kwargs)
 
+    def compile(self, format_string):
+        """Compile `format_string` into a function that formats a mapping.
+
+        The format string is parsed once, and "{N}" placeholders are mapped
+        to their names upfront, so that formatting a row boils down to a
+        lookup per placeholder. Format strings that need the full
+        `string.Formatter` machinery (automatic numbering, attribute or
+        index access, nested fields, unknown indices) are compiled into a
+        plain `format` call.
+
+        Returns
+        -------
+        A function that takes a mapping and returns the formatted string.
+        """
+        plan = []
+        for literal, name, spec, conversion in self.parse(format_string):
+            if name is None:
+                plan.append((literal, None, None, None))
+                continue
+            if not name or "." in name or "[" in name or "{" in spec:
+                return partial(self._format_slow, format_string)
+            try:
+                key_int = int(name)
+            except ValueError:
+                pass
+            else:
+                if key_int not in self.idx_to_name:
+                    return partial(self._format_slow, format_string)
+                name = self.idx_to_name[key_int]
+            plan.append((literal, name, conversion, spec))
+
+        missing = self.missing
+        convert_field = self.convert_field
+
+        def format_row(row):
+            parts = []
+            for literal, name, conversion, spec in plan:
+                if literal:
+                    parts.append(literal)
+                if name is None:
+                    continue
+                value = row[name]
+                if missing is not None and isinstance(value, str):
+                    value = value or missing
+                if conversion:
+                    value = convert_field(value, conversion)
+                parts.append(format(value, spec))
+            return "".join(parts)
+        return format_row
+
+    def _format_slow(self, format_string, row):
+        return super(Formatter, self).format(format_string, row)
+
     def get_value(self, key, args, kwargs):
         """Look for key's value in `args[0]` mapping first.
         """
@@ -119,13 +190,20 @@ class RepFormatter(Formatter):
         self.repeats = {}
         self.repindex = 0
 
+    def _format_with_repindex(self, format_string, *args, **kwargs):
+        # Compiled format strings don't go through get_value().
+        if isinstance(args[0], Mapping):
+            args[0]["_repindex"] = self.repindex
+        return super(RepFormatter, self).format(
+            format_string, *args, **kwargs)
+
     def format(self, *args, **kwargs):
         self.repindex = 0
-        result = super(RepFormatter, self).format(*args, **kwargs)
+        result = self._format_with_repindex(*args, **kwargs)
         if result in self.repeats:
             self.repindex = self.repeats[result] + 1
             self.repeats[result] = self.repindex
-            result = super(RepFormatter, self).format(*args, **kwargs)
+            result = self._format_with_repindex(*args, **kwargs)
         else:
             self.repeats[result] = 0
         return result
@@ -364,10 +442,41 @@ def fmt_to_name(format_string, num_to_name):
         return name
 
 
-INPUT_TYPES = ["ext", "csv", "tsv", "json"]
+INPUT_TYPES = ["ext", "csv", "tsv", "json", "jsonl"]
+
+# Number of URLs to version at once with --version-urls
+VERSION_BATCH_SIZE = 1000
+
+# Number of URLs to probe for _url_size and _url_mtime at once
+STATUS_BATCH_SIZE = 1000
+
+
+def _read_jsonl(stream, first):
+    import json
+    yield first
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.decoder.JSONDecodeError as e:
+            raise ValueError(
+                "Failed to read JSON lines from stream {}: {}"
+                .format(stream, exc_str(e)))
 
 
 def _read(stream, input_type):
+    """Read rows from `stream`.
+
+    Except for "json" input, which is loaded as a whole, rows are parsed
+    lazily, while the returned iterable is consumed.
+
+    Returns
+    -------
+    A tuple where the first item is an iterable of dicts (one per row) and
+    the second item a mapping from a position index to a column name.
+    """
     if input_type in ["csv", "tsv"]:
         import csv
         csvrows = csv.reader(stream,
@@ -380,7 +489,7 @@ def _read(stream, input_type):
         lgr.debug("Taking %s fields from first line as headers: %s",
                   len(headers), headers)
         idx_map = dict(enumerate(headers))
-        rows = [dict(zip(headers, r)) for r in csvrows]
+        rows = (dict(zip(headers, r)) for r in csvrows)
     elif input_type == "json":
         import json
         try:
@@ -392,6 +501,20 @@ def _read(stream, input_type):
         # For json input, we do not support indexing by position,
         # only names.
         idx_map = {}
+    elif input_type == "jsonl":
+        import json
+        # Like for CSV headers, require a valid first record up front.
+        first = next((line for line in stream if line.strip()), None)
+        try:
+            if first is None:
+                raise ValueError("no records")
+            first = json.loads(first)
+        except ValueError as e:
+            raise ValueError(
+                "Failed to read JSON lines from stream {}: {}"
+                .format(stream, exc_str(e)))
+        rows = _read_jsonl(stream, first)
+        idx_map = {}
     else:
         raise ValueError(
             "input_type {} is invalid. Known values: {}"
@@ -408,6 +531,8 @@ def _read_from_file(fname, input_type):
             extension = os.path.splitext(fname)[1]
             if extension == ".json":
                 input_type = "json"
+            elif extension == ".jsonl":
+                input_type = "jsonl"
             elif extension == ".tsv":
                 input_type = "tsv"
             else:
@@ -416,12 +541,23 @@ def _read_from_file(fname, input_type):
     fd = sys.stdin if from_stdin else open(fname)
     try:
         records, colidx_to_name = _read(fd, input_type)
-        if not records:
-            lgr.warning("No rows found in %s", fd)
-    finally:
+    except Exception:
         if fd is not sys.stdin:
             fd.close()
-    return records, colidx_to_name
+        raise
+
+    def iter_records():
+        nrecords = 0
+        try:
+            for nrecords, record in enumerate(records, 1):
+                yield record
+        finally:
+            if fd is not sys.stdin:
+                fd.close()
+        if not nrecords:
+            lgr.warning("No rows found in %s", fd)
+
+    return iter_records(), colidx_to_name
 
 
 def _get_placeholder_exception(exc, msg_prefix, known):
@@ -439,19 +575,22 @@ def _get_placeholder_exception(exc, msg_prefix, known):
                       .format(msg_prefix, exc, ". " if sugmsg else "", sugmsg))
 
 
-def _format_filenames(format_fn, rows, row_infos):
-    subpaths = set()
-    for row, info in zip(rows, row_infos):
-        try:
-            filename = format_fn(row)
-        except KeyError as exc:
-            raise _get_placeholder_exception(
-                exc, "Unknown placeholder in file name", row)
-        filename, spaths = get_subpaths(filename)
-        subpaths |= set(spaths)
-        info["filename"] = filename
-        info["subpath"] = spaths[-1] if spaths else None
-    return subpaths
+def _format_filename(format_fn, row, info):
+    """Format the file name for `row` and record it in `info`.
+
+    Returns
+    -------
+    A list of the subdataset paths that lead to the file.
+    """
+    try:
+        filename = format_fn(row)
+    except KeyError as exc:
+        raise _get_placeholder_exception(
+            exc, "Unknown placeholder in file name", row)
+    filename, spaths = get_subpaths(filename)
+    info["filename"] = filename
+    info["subpath"] = spaths[-1] if spaths else None
+    return spaths
 
 
 def get_file_parts(filename, prefix="name"):
@@ -478,12 +617,18 @@ def get_file_parts(filename, prefix="name"):
             prefix + "_ext_py": ext_py}
 
 
-def get_url_parts(url):
+def get_url_parts(url, path=True, basename_parts=True):
     """Assign a name to various parts of the URL.
 
     Parameters
     ----------
     url : str
+    path : bool, optional
+        Whether to include the parts of the path.  If false, only
+        `_url_hostname` is reported.
+    basename_parts : bool, optional
+        Whether to include the parts of `_url_basename` as reported by
+        `get_file_parts`.
 
     Returns
     -------
@@ -497,55 +642,88 @@ def get_url_parts(url):
 
     names = {"_url_hostname": parsed.netloc}
 
-    path = parsed.path.strip("/")
-    if not path:
+    path_str = parsed.path.strip("/") if path else None
+    if not path_str:
         return names
 
-    url_parts = path.split("/")
+    url_parts = path_str.split("/")
     for pidx, part in enumerate(url_parts):
         names["_url{}".format(pidx)] = part
     basename = url_parts[-1]
     names["_url_basename"] = basename
-    names.update(get_file_parts(basename, prefix="_url_basename"))
+    if basename_parts:
+        names.update(get_file_parts(basename, prefix="_url_basename"))
     return names
 
 
-def add_extra_filename_values(filename_format, rows, urls, dry_run):
-    """Extend `rows` with values for special formatting fields.
+def add_extra_filename_values(filename_format, rows_infos, dry_run,
+                              total=None):
+    """Extend rows with values for special formatting fields.
+
+    Parameters
+    ----------
+    filename_format : str
+    rows_infos : iterable of (dict, dict)
+        Pairs of a row and its extracted information, which includes the
+        formatted URL.
+    dry_run : bool
+    total : int, optional
+        Number of pairs, if known, for progress reporting.
+
+    Returns
+    -------
+    Generator of the pairs in `rows_infos`, with each row extended before it
+    is yielded.
     """
     file_fields = list(get_fmt_names(filename_format))
-    if any(i.startswith("_url") for i in file_fields):
-        for row, url in zip(rows, urls):
-            row.update(get_url_parts(url))
-
-    if any(i.startswith("_url_filename") for i in file_fields):
-        if dry_run:  # Don't waste time making requests.
-            dummy = get_file_parts("BASE.EXT", "_url_filename")
-            for idx, row in enumerate(rows):
-                row.update(
-                    {k: v + str(idx) for k, v in dummy.items()})
-        else:
-            num_urls = len(urls)
-            log_progress(lgr.info, "addurls_requestnames",
-                         "Requesting file names for %d URLs", num_urls,
-                         label="Requesting names", total=num_urls,
-                         unit=" Files")
-            for row, url in zip(rows, urls):
-                # If we run into any issues here, we're just going to raise an
-                # exception and then abort inside dlplugin.  It'd be good to
-                # disentangle this from `extract` so that we could yield an
-                # individual error, drop the row, and keep going.
-                filename = get_url_filename(url)
-                if filename:
-                    row.update(get_file_parts(filename, "_url_filename"))
-                else:
-                    raise ValueError(
-                        "{} does not contain a filename".format(url))
-                log_progress(lgr.info, "addurls_requestnames",
-                             "%s returned for %s", url, filename,
-                             update=1, increment=True)
+    with_url_filename = any(i.startswith("_url_filename") for i in file_fields)
+    # Only compute the URL parts that are referenced.
+    url_fields = [i for i in file_fields
+                  if i.startswith("_url")
+                  and not i.startswith("_url_filename")
+                  and i not in ["_url_size", "_url_mtime"]]
+    with_url_parts = bool(url_fields)
+    url_parts_kwargs = dict(
+        path=any(i != "_url_hostname" for i in url_fields),
+        basename_parts=any(i.startswith("_url_basename_")
+                           for i in url_fields))
+    if not (with_url_parts or with_url_filename):
+        yield from rows_infos
+        return
+
+    request_names = with_url_filename and not dry_run
+    if request_names:
+        log_progress(lgr.info, "addurls_requestnames",
+                     "Requesting file names for %s URLs",
+                     "all" if total is None else total,
+                     label="Requesting names", total=total,
+                     unit=" Files")
+    # Don't waste time making requests in dry-run mode.
+    dummy = get_file_parts("BASE.EXT", "_url_filename")
+    for idx, (row, info) in enumerate(rows_infos):
+        url = info["url"]
+        if with_url_parts:
+            row.update(get_url_parts(url, **url_parts_kwargs))
+        if with_url_filename and dry_run:
+            row.update({k: v + str(idx) for k, v in dummy.items()})
+        elif request_names:
+            # If we run into any issues here, we're just going to raise an
+            # exception and then abort inside dlplugin.  It'd be good to
+            # disentangle this from `extract` so that we could yield an
+            # individual error, drop the row, and keep going.
+            filename = get_url_filename(url)
+            if filename:
+                row.update(get_file_parts(filename, "_url_filename"))
+            else:
+                raise ValueError(
+                    "{} does not contain a filename".format(url))
             log_progress(lgr.info, "addurls_requestnames",
-                         "Finished requesting file names")
+                         "%s returned for %s", url, filename,
+                         update=1, increment=True)
+        yield row, info
+    if request_names:
+        log_progress(lgr.info, "addurls_requestnames",
+                     "Finished requesting file names")
 
 
 def sort_paths(paths):
@@ -565,39 +743,89 @@ def sort_paths(paths):
     yield from sorted(paths, key=level_and_name)
 
 
-def extract(rows, colidx_to_name=None,
-            url_format="{0}", filename_format="{1}",
-            exclude_autometa=None, meta=None, key=None,
-            dry_run=False, missing_value=None):
-    """Extract and format information from `rows`.
+def add_url_status_values(rows_urls, jobs=None):
+    """Extend rows with the size and modification time of their URL.
+
+    URLs are probed concurrently, in batches of STATUS_BATCH_SIZE.
+
+    Parameters
+    ----------
+    rows_urls : iterable of (dict, str)
+        Pairs of a row and its formatted URL.
+    jobs : int or None or "auto", optional
+        Number of concurrent requests.
+
+    Returns
+    -------
+    Generator of the pairs in `rows_urls`, with "_url_size" and "_url_mtime"
+    added to each row. Their values are empty if the status of a URL could
+    not be determined.
+    """
+    from datalad.downloaders.providers import Providers
+    providers = Providers.from_config_files()
+    rows_urls = iter(rows_urls)
+    for batch in iter(
+            lambda: list(itertools.islice(rows_urls, STATUS_BATCH_SIZE)), []):
+        statuses = dict(providers.get_status_many(
+            (url for _, url in batch), jobs=jobs))
+        for row, url in batch:
+            status = statuses[url]
+            if status is None or isinstance(status, Exception):
+                lgr.warning("Could not determine size of %s: %s", url,
+                            exc_str(status) if status else "no status")
+                status = None
+            for name, attr in (("_url_size", "size"),
+                               ("_url_mtime", "mtime")):
+                value = getattr(status, attr, None)
+                row[name] = "" if value is None else str(int(value))
+            yield row, url
+
+
+def iter_extract(rows, subpaths, colidx_to_name=None,
+                 url_format="{0}", filename_format="{1}",
+                 exclude_autometa=None, meta=None, key=None,
+                 dry_run=False, missing_value=None, jobs=None):
+    """Extract and format information from `rows`, one row at a time.
 
     Parameters
     ----------
-    rows : list of dict
+    rows : iterable of dict
+        Rows are consumed lazily.
+    subpaths : set
+        Subdataset paths are added to this set while rows are processed.
     colidx_to_name : dict, optional
         Mapping from a position index to a column name.
+    jobs : int or None or "auto", optional
+        Number of concurrent requests for the status of URLs, if their
+        "_url_size" or "_url_mtime" is referenced.
 
     All other parameters match those described in `AddUrls`.
 
     Returns
     -------
-    A tuple where the first item is a list with a dict of extracted information
-    for each row in `stream` and the second item a list subdataset paths,
-    sorted breadth-first.
+    Generator with a dict of extracted information for each row in `rows`
+    that has a URL.
     """
     meta = ensure_list(meta)
     colidx_to_name = colidx_to_name or {}
+    total = len(rows) if hasattr(rows, "__len__") else None
+
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        return
+    rows = itertools.chain([first_row], rows)
 
     # Formatter for everything but file names
     fmt = Formatter(colidx_to_name, missing_value)
-    format_url = partial(fmt.format, url_format)
+    format_url = fmt.compile(url_format)
 
     auto_meta_args = []
     if exclude_autometa not in ["*", ""]:
         urlcol = fmt_to_name(url_format, colidx_to_name)
         # TODO: Try to normalize invalid fields, checking for any
         # collisions.
-        metacols = (c for c in sorted(rows[0].keys()) if c != urlcol)
+        metacols = (c for c in sorted(first_row.keys()) if c != urlcol)
         if exclude_autometa:
             metacols = (c for c in metacols
                         if not re.search(exclude_autometa, c))
@@ -606,7 +834,7 @@ def extract(rows, colidx_to_name=None,
 
     # Unlike `filename_format` and `url_format`, `meta` is a list
     # because meta may be given multiple times on the command line.
-    formats_meta = [partial(fmt.format, m) for m in meta + auto_meta_args]
+    formats_meta = [fmt.compile(m) for m in meta + auto_meta_args]
 
     info_fns = []
     if formats_meta:
@@ -621,40 +849,235 @@ def extract(rows, colidx_to_name=None,
             info["key"] = key_parser.parse(row)
         info_fns.append(set_key)
 
-    rows_with_url = []
-    infos = []
-    for row in rows:
-        try:
-            url = format_url(row)
-        except KeyError as exc:
-            raise _get_placeholder_exception(
-                exc, "Unknown placeholder in URL", row)
-        if not url or url == missing_value:
-            continue  # pragma: no cover, peephole optimization
-        rows_with_url.append(row)
-        info = {"url": url}
-        for fn in info_fns:
-            fn(info, row)
-        infos.append(info)
-
-    n_dropped = len(rows) - len(rows_with_url)
-    if n_dropped:
-        lgr.warning("Dropped %d row(s) that had an empty URL", n_dropped)
-
-    # Format the filename in a second pass so that we can provide
-    # information about the formatted URLs.
-    add_extra_filename_values(filename_format, rows_with_url,
-                              [i["url"] for i in infos],
-                              dry_run)
+    def iter_urls():
+        n_dropped = 0
+        for row in rows:
+            try:
+                url = format_url(row)
+            except KeyError as exc:
+                raise _get_placeholder_exception(
+                    exc, "Unknown placeholder in URL", row)
+            if not url or url == missing_value:
+                n_dropped += 1
+                continue  # pragma: no cover, peephole optimization
+            yield row, url
+        if n_dropped:
+            lgr.warning("Dropped %d row(s) that had an empty URL", n_dropped)
+
+    rows_urls = iter_urls()
+    if any(name in ("_url_size", "_url_mtime")
+           for fmt_string in [filename_format, key or ""] + meta
+           for name in get_fmt_names(fmt_string)):
+        rows_urls = add_url_status_values(rows_urls, jobs=jobs)
+
+    def iter_with_url():
+        for row, url in rows_urls:
+            info = {"url": url}
+            for fn in info_fns:
+                fn(info, row)
+            yield row, info
 
     # For the file name, we allow the _repindex special key.
     format_filename = partial(
         RepFormatter(colidx_to_name, missing_value).format,
         filename_format)
-    subpaths = _format_filenames(format_filename, rows_with_url, infos)
+    # The file name is formatted last so that we can provide information
+    # about the formatted URL.
+    for row, info in add_extra_filename_values(
+            filename_format, iter_with_url(), dry_run, total=total):
+        subpaths.update(_format_filename(format_filename, row, info))
+        yield info
+
+
+def extract(rows, colidx_to_name=None,
+            url_format="{0}", filename_format="{1}",
+            exclude_autometa=None, meta=None, key=None,
+            dry_run=False, missing_value=None, jobs=None):
+    """Extract and format information from `rows`.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+    colidx_to_name : dict, optional
+        Mapping from a position index to a column name.
+
+    All other parameters match those described in `AddUrls`.
+
+    Returns
+    -------
+    A tuple where the first item is a list with a dict of extracted information
+    for each row in `stream` and the second item a list subdataset paths,
+    sorted breadth-first.
+    """
+    subpaths = set()
+    infos = list(iter_extract(rows, subpaths, colidx_to_name,
+                              url_format, filename_format,
+                              exclude_autometa, meta, key,
+                              dry_run, missing_value, jobs))
     return infos, list(sort_paths(subpaths))
 
 
+class _SpilledItems(object):
+    """Items that are written to a file and read back when iterated over.
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self._nitems = 0
+        self._fd = open(fname, "wb")
+
+    def append(self, item):
+        pickle.dump(item, self._fd, protocol=pickle.HIGHEST_PROTOCOL)
+        self._nitems += 1
+
+    def close(self):
+        self._fd.close()
+
+    def __len__(self):
+        return self._nrows
+
+    def __iter__(self):
+        with open(self.fname, "rb") as fd:
+            while True:
+                try:
+                    yield pickle.load(fd)
+                except EOFError:
+                    return
+
+
+class _SizedIterable(object):
+    """Wrap an iterable whose length is known in advance.
+    """
+
+    def __init__(self, iterable, length):
+        self._iterable = iterable
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+
+_JOURNAL_SKIP_MSG = "added by an interrupted run"
+
+# Actions of the results that report the addition of a file, as opposed to,
+# e.g., setting its metadata or dropping its content. annexjson2result()
+# replaces "addurls" with the git-annex command.
+_ADD_ACTIONS = ("addurls", "addurl", "fromkey", "registerurl")
+
+
+class _Journal(object):
+    """Append-only record of the progress of an addurls run.
+
+    Each line is a JSON object {"file": FILENAME} for a row whose file was
+    added completely (including its metadata). Records are flushed as they
+    are written. A journal that is left behind by an interrupted run is
+    read to skip the rows that have already been added.
+
+    Parameters
+    ----------
+    path : Path
+        Location of the journal.
+    """
+
+    def __init__(self, path):
+        import json
+
+        self.path = path
+        self.done = set()
+        if path.exists():
+            with path.open() as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        # A record that was cut off by the interruption.
+                        continue
+                    if "file" in rec:
+                        self.done.add(rec["file"])
+        self._fh = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.done)
+
+    def is_done(self, row):
+        return row["filename"] in self.done
+
+    def _write(self, rec):
+        import json
+
+        with self._lock:
+            if self._fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = self.path.open("a")
+            self._fh.write(json.dumps(rec) + "\n")
+            # A record counts once it survives an interruption.
+            self._fh.flush()
+
+    def add(self, row):
+        """Record that the file of `row` was added.
+        """
+        self._write({"file": row["filename"]})
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def remove(self):
+        self.close()
+        if self.path.exists():
+            unlink(str(self.path))
+
+
+def _get_journal_path(ds, url_file, *args):
+    """Return the journal location of an addurls run on `url_file` with `args`.
+
+    The location depends on the content of `url_file`, so that a journal
+    is not used for a file that was modified since it was written.
+    """
+    import hashlib
+    import json
+
+    run_id = hashlib.md5(json.dumps((url_file,) + args).encode())
+    with open(url_file, "rb") as fh:
+        for chunk in iter(lambda: fh.read(65536), b""):
+            run_id.update(chunk)
+    return ds.repo.dot_git / "datalad" / "addurls" / \
+        (run_id.hexdigest() + ".jsonl")
+
+
+class _FilenameIndex(object):
+    """On-disk set of file names, to detect collisions across chunks of rows.
+    """
+
+    def __init__(self, fname):
+        import sqlite3
+
+        self._con = sqlite3.connect(fname)
+        self._con.execute("CREATE TABLE filenames (name TEXT PRIMARY KEY)")
+
+    def add(self, filenames):
+        """Add `filenames`.
+
+        Returns
+        -------
+        True if any of `filenames` was added before or repeats.
+        """
+        before = self._con.total_changes
+        self._con.executemany(
+            "INSERT OR IGNORE INTO filenames VALUES (?)",
+            ((f,) for f in filenames))
+        return self._con.total_changes - before != len(filenames)
+
+    def close(self):
+        self._con.close()
+
+
 def _add_url(row, ds, repo, options=None, drop_after=False):
     filename_abs = row["filename_abs"]
     filename = row["ds_filename"]
@@ -669,9 +1092,15 @@ def _add_url(row, ds, repo, options=None, drop_after=False):
                               message=exc_str(exc),
                               status="error")
         return
+    yield from _addurl_results(row, out_json, ds, repo, drop_after=drop_after)
+
 
+def _addurl_results(row, out_json, ds, repo, drop_after=False):
+    """Yield results for the annex reply `out_json` to adding `row`'s URL.
+    """
+    filename_abs = row["filename_abs"]
     # In the case of an error, the json object has file=None.
-    if out_json["file"] is None:
+    if out_json.get("file") is None:
         out_json["file"] = filename_abs
     res_addurls = annexjson2result(
         out_json, ds, action="addurls",
@@ -781,17 +1210,23 @@ class BatchedRegisterUrl(RegisterUrl):
     """Like `RegisterUrl`, but use batched commands underneath.
     """
 
-    def __init__(self, ds, repo=None):
+    def __init__(self, ds, repo=None, shard=None):
         super().__init__(ds, repo)
         self._batch_commands = {}
+        # Instances with a different shard use their own batch processes.
+        self._shard = shard
 
     def _batch(self, command, batch_input,
                output_proc=None, json=False, batch_options=None):
         bcmd = self._batch_commands.get(command)
         if not bcmd:
             repo = self.repo
+            codename = command
+            if self._shard is not None:
+                codename += ":shard%d" % self._shard
             bcmd = repo._batched.get(
-                command, path=repo.path, json=json, output_proc=output_proc,
+                codename, annex_cmd=command,
+                path=repo.path, json=json, output_proc=output_proc,
                 annex_options=batch_options)
             self._batch_commands[command] = bcmd
         return bcmd(batch_input)
@@ -819,34 +1254,253 @@ class BatchedRegisterUrl(RegisterUrl):
                     output_proc=self._ignore, json=False)
 
 
+class ShardedRegisterUrl(BatchedRegisterUrl):
+    """Like `BatchedRegisterUrl`, but process rows in multiple threads.
+
+    Keys are examined by one batched process per thread, and pointer files
+    are written concurrently. `registerurl` and `fromkey`, which modify the
+    repository, go through a single batched process each.
+    """
+
+    def __init__(self, ds, repo=None, jobs=2):
+        super().__init__(ds, repo)
+        self.jobs = jobs
+        self._lock = threading.Lock()
+        self._shards = queue.Queue()
+        for shard in range(jobs):
+            self._shards.put(BatchedRegisterUrl(ds, repo, shard=shard))
+        self._executor = None
+        self._pending = deque()
+
+    def examinekey(self, parsed_key, filename, migrate=False):
+        shard = self._shards.get()
+        try:
+            return shard.examinekey(parsed_key, filename, migrate=migrate)
+        finally:
+            self._shards.put(shard)
+
+    def fromkey(self, key, filename):
+        with self._lock:
+            return super().fromkey(key, filename)
+
+    def registerurl(self, key, url):
+        with self._lock:
+            super().registerurl(key, url)
+
+    def _process(self, row):
+        return row, list(self(row))
+
+    def submit(self, row):
+        """Schedule registering `row`.
+
+        Returns
+        -------
+        list of (row, list of dict)
+          Results of rows that have been processed, if too many rows were
+          pending.
+        """
+        if self._executor is None:
+            # delayed import, only needed with multiple jobs
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(self.jobs)
+        self._pending.append(self._executor.submit(self._process, row))
+        done = []
+        while len(self._pending) > 2 * self.jobs:
+            done.append(self._pending.popleft().result())
+        return done
+
+    def finish(self):
+        """Yield (row, results) for all pending rows.
+        """
+        while self._pending:
+            yield self._pending.popleft().result()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class PipelinedAddurl(object):
+    """Feed URLs to a batched `git annex addurl` without awaiting each reply.
+
+    Up to `window` requests are outstanding at any time, so that annex can
+    work on the next URL while the result of the previous one is processed,
+    or on multiple URLs at once if `jobs` is given. With multiple jobs,
+    replies may arrive out of order and are matched to their requests by
+    the input (or file) that annex reports.
+    """
+
+    def __init__(self, repo, options=None, jobs=None, window=20):
+        options = list(options or []) + ["--with-files"]
+        if jobs and jobs > 1:
+            options.append("--jobs=%d" % jobs)
+        self._bcmd = repo._batched.get(
+            "addurl_pipelined:%s" % " ".join(options),
+            annex_cmd="addurl",
+            annex_options=options,
+            path=repo.path,
+            json=True)
+        self.window = max(window, 1)
+        # (input line, filename, token) of requests without a reply yet
+        self._pending = []
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, url, filename, token):
+        """Send a request to add `url` to `filename`.
+
+        Parameters
+        ----------
+        url, filename : str
+        token
+          Any object identifying the request. It is reported along with
+          the reply.
+
+        Returns
+        -------
+        list of (token, dict)
+          Replies received, if the window was full.
+        """
+        line = " ".join((url, filename))
+        replies = []
+        if self._bcmd.send(line) and self._pending:
+            # The process was restarted, replies to the requests sent to the
+            # previous one will never arrive.
+            replies.extend(self._fail_pending())
+        self._pending.append((line, filename, token))
+        while len(self._pending) >= self.window:
+            replies.extend(self._receive())
+        return replies
+
+    def finish(self):
+        """Yield (token, dict) replies for all outstanding requests.
+        """
+        while self._pending:
+            yield from self._receive()
+
+    def _fail_pending(self):
+        """Report all outstanding requests with an empty reply.
+        """
+        lgr.debug("No reply to %d addurl requests, the process terminated",
+                  len(self._pending))
+        replies = [(token, {}) for _, _, token in self._pending]
+        self._pending = []
+        return replies
+
+    def _receive(self):
+        out_json = self._bcmd.receive()
+        if not out_json:
+            process = self._bcmd._process
+            if process is None or process.poll() is not None:
+                # The process terminated, none of the requests will be
+                # answered.
+                return self._fail_pending()
+            # An empty line. Each request gets one line, so it is the reply
+            # to one of them, and the oldest one will not be answered if
+            # annex replies in order.
+            lgr.debug("Empty reply to addurl request %s",
+                      self._pending[0][0])
+            _, _, token = self._pending.pop(0)
+            return [(token, {})]
+        reported = out_json.get("input")
+        reported = reported[0] if reported else None
+        for i, (line, filename, _) in enumerate(self._pending):
+            if (line == reported if reported is not None
+                    else filename == out_json.get("file")):
+                _, _, token = self._pending.pop(i)
+                return [(token, out_json)]
+        # Attributing the reply to another request could mix up the results
+        # of files. The reply still stands for one request, which is failed
+        # to not wait for a reply that does not come.
+        lgr.warning("Cannot match git-annex addurl reply to any of %d "
+                    "pending requests, failing the oldest one (%s): %r",
+                    len(self._pending), self._pending[0][0], out_json)
+        _, _, token = self._pending.pop(0)
+        return [(token, {})]
+
+
 def _log_filter_addurls(res):
     return res.get('type') == 'file' and res.get('action') in ["addurl", "addurls"]
 
 
 @with_result_progress("Adding URLs", log_filter=_log_filter_addurls)
 def _add_urls(rows, ds, repo, ifexists=None, options=None,
-              drop_after=False, by_key=False):
+              drop_after=False, by_key=False, journal=None):
     """Call `git annex addurl` using information in `rows`.
+
+    If a `_Journal` is given, rows that it reports as done are skipped, and
+    rows whose files were added completely are recorded in it.
     """
     add_url = partial(_add_url, ds=ds, repo=repo,
                       drop_after=drop_after, options=options)
     if by_key:
         # The by_key parameter isn't strictly needed, but it lets us avoid some
         # setup if --key wasn't specified.
+        key_jobs = repo.config.obtain("datalad.addurls.key-jobs")
         if repo.fake_dates_enabled:
             register_url = RegisterUrl(ds, repo)
+        elif key_jobs > 1:
+            register_url = ShardedRegisterUrl(ds, repo, jobs=key_jobs)
         else:
             register_url = BatchedRegisterUrl(ds, repo)
     else:
         def register_url(*args, **kwargs):
             raise RuntimeError("bug: this should be impossible")
 
+    window = repo.config.obtain("datalad.addurls.batch-window")
+    if window > 1 and not repo.fake_dates_enabled:
+        pipeline = PipelinedAddurl(
+            repo, options=options,
+            jobs=repo.config.obtain("datalad.addurls.annex-jobs"),
+            window=window)
+    else:
+        pipeline = None
+
     add_metadata = {}
+    # Rows with metadata by file name, to journal them once it is set
+    meta_rows = {}
+
+    def check_results(row, results):
+        all_ok = True
+        for res in results:
+            if res["status"] != "ok":
+                all_ok = False
+            yield res
+        if all_ok and row.get("meta_args"):
+            add_metadata[row["ds_filename"]] = row["meta_args"]
+            if journal is not None:
+                meta_rows[row["ds_filename"]] = row
+        elif all_ok and journal is not None:
+            journal.add(row)
+
+    def addurl_replies(replies):
+        for row, out_json in replies:
+            if not out_json.get("command"):
+                yield get_status_dict(
+                    action="addurls", ds=ds, type="file",
+                    path=row["filename_abs"], status="error",
+                    message=("Adding url %s to file %s failed",
+                             row["url"], row["ds_filename"]))
+                continue
+            yield from check_results(
+                row,
+                _addurl_results(row, out_json, ds, repo,
+                                drop_after=drop_after))
+
     for row in rows:
         filename_abs = row["filename_abs"]
         filename = row["ds_filename"]
         lgr.debug("Adding URLs to %s in %s", filename, ds.path)
 
+        if journal is not None and journal.is_done(row):
+            yield get_status_dict(action="addurls",
+                                  ds=ds,
+                                  type="file",
+                                  path=filename_abs,
+                                  status="notneeded",
+                                  message=_JOURNAL_SKIP_MSG)
+            continue
+
         if os.path.exists(filename_abs) or os.path.islink(filename_abs):
             if ifexists == "skip":
                 yield get_status_dict(action="addurls",
@@ -861,36 +1515,41 @@ def _add_urls(rows, ds, repo, ifexists=None, options=None,
             else:
                 lgr.debug("File %s already exists", filename_abs)
 
-        fn = register_url if row.get("key") else add_url
-        all_ok = True
-        for res in fn(row):
-            if res["status"] != "ok":
-                all_ok = False
-            yield res
-        if not all_ok:
-            continue
+        if row.get("key"):
+            if isinstance(register_url, ShardedRegisterUrl):
+                for done_row, results in register_url.submit(row):
+                    yield from check_results(done_row, results)
+            else:
+                yield from check_results(row, register_url(row))
+        elif pipeline is not None:
+            yield from addurl_replies(
+                pipeline.submit(row["url"], filename, row))
+        else:
+            yield from check_results(row, add_url(row))
 
-        if row.get("meta_args"):
-            add_metadata[filename] = row["meta_args"]
+    if pipeline is not None:
+        yield from addurl_replies(pipeline.finish())
+    if isinstance(register_url, ShardedRegisterUrl):
+        for done_row, results in register_url.finish():
+            yield from check_results(done_row, results)
 
     if not add_metadata:
         return
 
-    # For some reason interleaving batched addurl and regular metadata calls
-    # causes multiple commits, so we do need to have it separate.
-    # TODO: figure out with Joey either could be avoided
-    from unittest.mock import patch
-    with patch.object(repo, "always_commit", False):
-        for filename, meta in add_metadata.items():
-            lgr.debug("Adding metadata to %s in %s", filename, repo.path)
-            assert not repo.always_commit
-            for a in repo.set_metadata_(filename, add=meta):
-                res = annexjson2result(a, ds, type="file", logger=lgr)
-                if res["status"] == "ok":
-                    # Don't show all added metadata for the file because that
-                    # could quickly flood the output.
-                    del res["message"]
-                yield res
+    # Metadata is set only after all URLs were added, because the batched
+    # addurl process needs to be closed for the files to be known. All of it
+    # goes through a single batched metadata process.
+    lgr.debug("Adding metadata to %d files in %s",
+              len(add_metadata), repo.path)
+    for a in repo.set_metadata_batched(add_metadata.items(), add=True):
+        res = annexjson2result(a, ds, type="file", logger=lgr)
+        if res["status"] == "ok":
+            if a.get("file") in meta_rows:
+                journal.add(meta_rows[a["file"]])
+            # Don't show all added metadata for the file because that
+            # could quickly flood the output.
+            res.pop("message", None)
+        yield res
 
 
 @build_doc
@@ -941,6 +1600,25 @@ class Addurls(Interface):
         a server request.  This is useful if the file name is set in the
         Content-Disposition header.
 
+    The `FILENAME-FORMAT`, `--meta`, and `--key` arguments can also refer to
+
+      - _url_size, _url_mtime
+
+        The size and modification time (in seconds since the epoch) of the
+        URL's content, as reported by the server.  If any of these are used,
+        all URLs are requested before they are added, with `--jobs`
+        concurrent requests.  This can, for example, provide the size for a
+        `--key` if the input lacks it.
+
+    *Resuming*
+
+    While URLs from a file are added, the files that have been added
+    completely are recorded in a journal under ".git/datalad/addurls" of the
+    dataset.  If the command is interrupted, rerunning it with the same
+    `URL-FILE`, `URL-FORMAT`, `FILENAME-FORMAT`, and `--key` skips these
+    files.  The journal is removed once a run finishes.  To save the added
+    files periodically during a long run, set the
+    'datalad.addurls.save-interval' configuration.
 
     *Examples*
 
@@ -964,10 +1642,10 @@ class Addurls(Interface):
       $ datalad addurls --fast avatars.csv '{link}' 'avatars//{who}.{ext}'
 
     If the information is represented as JSON lines instead of comma separated
-    values or a JSON array, you can use a utility like jq to transform the JSON
-    lines into an array that addurls accepts::
+    values or a JSON array, it can be read directly, also from standard
+    input::
 
-      $ ... | jq --slurp . | datalad addurls - '{link}' '{who}.{ext}'
+      $ ... | datalad addurls -t jsonl - '{link}' '{who}.{ext}'
 
     .. note::
 
@@ -997,8 +1675,9 @@ class Addurls(Interface):
             doc="""A file that contains URLs or information that can be used to
             construct URLs.  Depending on the value of --input-type, this
             should be a comma- or tab-separated file (with a header as the
-            first row) or a JSON file (structured as a list of objects with
-            string values). If '-', read from standard input, taking the
+            first row), a JSON file (structured as a list of objects with
+            string values), or a JSON lines file (one such object per line).
+            If '-', read from standard input, taking the
             content as JSON when --input-type is at its default value of
             'ext'. [PY:  Alternatively, an iterable of dicts can be given.
             PY]"""),
@@ -1022,9 +1701,13 @@ class Addurls(Interface):
             args=("-t", "--input-type"),
             metavar="TYPE",
             doc="""Whether `URL-FILE` should be considered a CSV file, TSV
-            file, or JSON file. The default value, "ext", means to consider
-            `URL-FILE` as a JSON file if it ends with ".json" or a TSV file if
-            it ends with ".tsv". Otherwise, treat it as a CSV file.""",
+            file, JSON file, or JSON lines file. The default value, "ext",
+            means to consider `URL-FILE` as a JSON file if it ends with
+            ".json", a JSON lines file if it ends with ".jsonl", or a TSV file
+            if it ends with ".tsv". Otherwise, treat it as a CSV file. Except
+            for JSON files, rows are read in chunks while they are
+            processed, see the 'datalad.addurls.max-rows-in-memory'
+            configuration.""",
             constraints=EnsureChoice(*INPUT_TYPES)),
         exclude_autometa=Parameter(
             args=("-x", "--exclude_autometa"),
@@ -1173,45 +1856,51 @@ class Addurls(Interface):
             records = ensure_list(url_file)
             colidx_to_name = {}
 
-        rows = None
-        if records:
-            try:
-                rows, subpaths = extract(records, colidx_to_name,
-                                         url_format, filename_format,
-                                         exclude_autometa, meta, key,
-                                         dry_run,
-                                         missing_value)
-            except (ValueError, RequestException) as exc:
-                yield dict(st_dict, status="error", message=exc_str(exc))
-                return
+        # We need to group by dataset since otherwise we will initiate
+        # batched annex process per each subdataset, which might be infeasible
+        # in any use-case with a considerable number of subdatasets.
+        # Also groupping allows us for parallelization across datasets, and avoids
+        # proliferation of commit messages upon creation of each individual subdataset.
 
-        if not rows:
-            yield dict(st_dict, status="notneeded",
-                       message="No rows to process")
+        def keyfn(d):
+            # The top-level dataset has a subpath of None.
+            return d.get("subpath") or ""
+
+        # Rows are read and added in chunks of at most `max_rows`, so that
+        # memory use is bounded and URLs are added before the whole input is
+        # read.
+        max_rows = ds.config.obtain("datalad.addurls.max-rows-in-memory")
+        subpaths = set()
+        rows = iter_extract(records, subpaths, colidx_to_name,
+                            url_format, filename_format,
+                            exclude_autometa, meta, key,
+                            dry_run,
+                            missing_value,
+                            jobs)
+
+        def read_chunk():
+            return list(itertools.islice(rows, max_rows) if max_rows > 0
+                        else rows)
+
+        try:
+            chunk = read_chunk()
+        except (ValueError, RequestException) as exc:
+            yield dict(st_dict, status="error", message=exc_str(exc))
             return
 
-        if len(rows) != len(set(row["filename"] for row in rows)):
-            yield dict(st_dict, status="error",
-                       message=("There are file name collisions; "
-                                "consider using {_repindex}"))
+        if not chunk:
+            yield dict(st_dict, status="notneeded",
+                       message="No rows to process")
             return
 
-        if dry_run:
-            for subpath in subpaths:
-                lgr.info("Would create a subdataset at %s", subpath)
-            for row in rows:
-                lgr.info("Would %s %s to %s",
-                         "register" if row.get("key") else "download",
-                         row["url"],
-                         os.path.join(ds.path, row["filename"]))
-                if "meta_args" in row:
-                    lgr.info("Metadata: %s",
-                             sorted(u"{}={}".format(k, v)
-                                    for k, v in row["meta_args"].items()))
-            yield dict(st_dict, status="ok", message="dry-run finished")
+        collision_res = dict(st_dict, status="error",
+                             message=("There are file name collisions; "
+                                      "consider using {_repindex}"))
+        if len(chunk) != len(set(row["filename"] for row in chunk)):
+            yield collision_res
             return
 
-        if not repo:
+        if not (repo or dry_run):
             # Populate a new dataset with the URLs.
             yield from ds.create(
                 result_xfm=None,
@@ -1220,8 +1909,21 @@ class Addurls(Interface):
 
         annex_options = ["--fast"] if fast else []
 
-        # to be populated by addurls_to_ds
-        files_to_add = set()
+        # Only runs on a file can be resumed.
+        journal = None
+        if isinstance(url_file, str) and url_file != "-" and not dry_run:
+            journal = _Journal(_get_journal_path(
+                ds, url_file, url_format, filename_format, key))
+            if len(journal):
+                lgr.info("Resuming an interrupted run that added %d files",
+                         len(journal))
+        save_interval = ds.config.obtain("datalad.addurls.save-interval") \
+            if save else 0
+
+        # to be populated by addurls_to_ds, for the current chunk of rows
+        added_paths = set()
+        # number of added files by subpath
+        files_added = {}
         created_subds = []
 
         def addurls_to_ds(args):
@@ -1236,14 +1938,6 @@ class Addurls(Interface):
             else:
                 subds_path = ds_path
 
-            for row in rows:
-                # Add additional information that we'll need for various
-                # operations.
-                filename_abs = op.join(ds_path, row["filename"])
-                ds_filename = op.relpath(filename_abs, subds_path)
-                row.update({"filename_abs": filename_abs,
-                            "ds_filename": ds_filename})
-
             subds = Dataset(subds_path)
 
             if subds.is_installed():
@@ -1257,112 +1951,273 @@ class Addurls(Interface):
                 created_subds.append(subpath)
             repo = subds.repo  # "expensive" so we get it once
 
-            if version_urls:
-                num_urls = len(rows)
+            num_urls = len(rows)
+
+            def annotate(rows):
+                for row in rows:
+                    # Add additional information that we'll need for various
+                    # operations.
+                    filename_abs = op.join(ds_path, row["filename"])
+                    ds_filename = op.relpath(filename_abs, subds_path)
+                    row.update({"filename_abs": filename_abs,
+                                "ds_filename": ds_filename})
+                    yield row
+
+            def version(rows):
                 log_progress(lgr.info, "addurls_versionurls",
                              "Versioning %d URLs", num_urls,
                              label="Versioning URLs",
                              total=num_urls, unit=" URLs")
-                for row in rows:
-                    url = row["url"]
-                    try:
-                        # TODO: make get_versioned_url more efficient while going
-                        # through the same bucket(s)
-                        row["url"] = get_versioned_url(url)
-                    except (ValueError, NotImplementedError) as exc:
-                        # We don't expect this to happen because get_versioned_url
-                        # should return the original URL if it isn't an S3 bucket.
-                        # It only raises exceptions if it doesn't know how to
-                        # handle the scheme for what looks like an S3 bucket.
-                        lgr.warning("error getting version of %s: %s",
-                                    row["url"], exc_str(exc))
-                    log_progress(lgr.info, "addurls_versionurls",
-                                 "Versioned result for %s: %s", url, row["url"],
-                                 update=1, increment=True)
+                rows = iter(rows)
+                # Version URLs in batches, so that lookups within the same
+                # bucket(s) can be combined.
+                for batch in iter(
+                        lambda: list(itertools.islice(rows, VERSION_BATCH_SIZE)),
+                        []):
+                    versioned = get_versioned_urls(
+                        [row["url"] for row in batch
+                         if journal is None or not journal.is_done(row)],
+                        jobs=jobs)
+                    for row in batch:
+                        url = row["url"]
+                        if url not in versioned:
+                            # Added by an interrupted run.
+                            yield row
+                            continue
+                        versioned_url = versioned[url]
+                        if isinstance(versioned_url, Exception):
+                            # We don't expect this to happen because
+                            # get_versioned_urls should return the original
+                            # URL if it isn't an S3 bucket. It only reports
+                            # exceptions if it doesn't know how to handle the
+                            # scheme for what looks like an S3 bucket.
+                            lgr.warning("error getting version of %s: %s",
+                                        url, exc_str(versioned_url))
+                        else:
+                            row["url"] = versioned_url
+                        log_progress(lgr.info, "addurls_versionurls",
+                                     "Versioned result for %s: %s", url, row["url"],
+                                     update=1, increment=True)
+                        yield row
                 log_progress(lgr.info, "addurls_versionurls", "Finished versioning URLs")
 
+            rows = annotate(rows)
+            if version_urls:
+                rows = version(rows)
+            if save_interval > 0:
+                # Add and save the files in chunks.
+                rows = iter(rows)
+                chunks = iter(
+                    lambda: list(itertools.islice(rows, save_interval)), [])
+            else:
+                chunks = [_SizedIterable(rows, num_urls)]
+
             subds_files_to_add = set()
-            for r in _add_urls(rows, subds, repo,
-                               ifexists=ifexists, options=annex_options,
-                               drop_after=drop_after, by_key=key):
-                if r["status"] == "ok":
-                    subds_files_to_add.add(r["path"])
-                yield r
-
-            files_to_add.update(subds_files_to_add)
+            # files added by this run (not by an interrupted one)
+            added = set()
+            for chunk in chunks:
+                chunk_files_to_add = set()
+                for r in _add_urls(chunk, subds, repo,
+                                   ifexists=ifexists, options=annex_options,
+                                   drop_after=drop_after, by_key=key,
+                                   journal=journal):
+                    if r["status"] == "ok" or (
+                            r["status"] == "notneeded"
+                            and r.get("message") == _JOURNAL_SKIP_MSG):
+                        if r["status"] == "ok" and \
+                                r.get("action") in _ADD_ACTIONS:
+                            added.add(r["path"])
+                        chunk_files_to_add.add(r["path"])
+                    yield r
+                subds_files_to_add.update(chunk_files_to_add)
+                if save_interval > 0 and chunk_files_to_add:
+                    yield from subds.save(
+                        list(chunk_files_to_add),
+                        message="[DATALAD] add files from URLs "
+                                "(intermediate save)",
+                        return_type='generator')
+
+            added_paths.update(subds_files_to_add)
+            files_added[subpath] = files_added.get(subpath, 0) + len(added)
             pass  # end of addurls_to_ds
 
+        # Whether any result of this run reports a failure. The journal is
+        # kept then, to resume from it.
+        failed = False
 
-        # We need to group by dataset since otherwise we will initiate
-        # batched annex process per each subdataset, which might be infeasible
-        # in any use-case with a considerable number of subdatasets.
-        # Also groupping allows us for parallelization across datasets, and avoids
-        # proliferation of commit messages upon creation of each individual subdataset.
+        def track_failures(results):
+            nonlocal failed
+            for res in results:
+                if res.get("status") in ("impossible", "error"):
+                    failed = True
+                yield res
 
-        def keyfn(d):
-            # The top-level dataset has a subpath of None.
-            return d.get("subpath") or ""
+        # Paths of the files to save, kept in memory if the input fits into
+        # a single chunk, and written to disk otherwise.
+        files_to_add = []
+        spill = None
+        spilled_files = None
+        filenames = None
+        # subdatasets that are known from the chunks read so far
+        seen_subpaths = set()
+        # (sub)datasets with rows
+        row_subpaths = set()
+        try:
+            while chunk:
+                if max_rows > 0 and len(chunk) == max_rows and spill is None:
+                    # There might be more rows than fit into memory.
+                    spill = tempfile.TemporaryDirectory(
+                        **get_tempfile_kwargs(prefix="addurls"))
+                    filenames = _FilenameIndex(
+                        op.join(spill.name, "filenames.db"))
+                    spilled_files = _SpilledItems(
+                        op.join(spill.name, "files"))
+                if filenames is not None and filenames.add(
+                        [row["filename"] for row in chunk]):
+                    # Rows of earlier chunks are added and saved already.
+                    failed = True
+                    yield collision_res
+                    break
+
+                # We need to serialize itertools.groupby .
+                rows_by_ds = [(k, tuple(v))
+                              for k, v in groupby_sorted(chunk, key=keyfn)]
+                row_subpaths.update(r[0] for r in rows_by_ds)
+                new_subpaths = list(sort_paths(subpaths - seen_subpaths))
+                seen_subpaths.update(new_subpaths)
+
+                if dry_run:
+                    for subpath in new_subpaths:
+                        lgr.info("Would create a subdataset at %s", subpath)
+                    for row in chunk:
+                        lgr.info("Would %s %s to %s",
+                                 "register" if row.get("key") else "download",
+                                 row["url"],
+                                 os.path.join(ds.path, row["filename"]))
+                        if "meta_args" in row:
+                            lgr.info("Metadata: %s",
+                                     sorted(u"{}={}".format(k, v)
+                                            for k, v in row["meta_args"].items()))
+                else:
+                    # There could be "intermediate" subdatasets which have no
+                    # rows but would need their datasets created and saved, so
+                    # let's add them
+                    add_subpaths = set(new_subpaths).difference(
+                        r[0] for r in rows_by_ds)
+                    if add_subpaths:
+                        rows_by_ds.extend((p, tuple()) for p in add_subpaths)
+                        # and now resort them again since we added
+                        rows_by_ds = sorted(rows_by_ds, key=lambda r: r[0])
+
+                    nrows = len(chunk)
+
+                    # We want to provide progress overall files not just
+                    # datasets so our total will be just a len of rows
+                    def agg_files(*args, **kwargs):
+                        return nrows
+
+                    yield from track_failures(ProducerConsumerProgressLog(
+                        rows_by_ds,
+                        addurls_to_ds,
+                        agg=agg_files,
+                        # It is ok to start with subdatasets since top dataset already exists
+                        safe_to_consume=partial(no_parentds_in_futures, skip=("", None, ".")),
+                        # our producer provides not only dataset paths and also rows, take just path
+                        producer_future_key=lambda row_by_ds: row_by_ds[0],
+                        jobs=jobs,
+                        # Logging options
+                        # we will be yielding all kinds of records, but of interest for progress
+                        # reporting only addurls on files
+                        # note: annexjson2result overrides 'action' with 'command' content from
+                        # annex, so we end up with 'addurl' even if we provide 'action'='addurls'.
+                        # TODO: see if it is all ok, since we might be now yielding both
+                        # addurls and addurl records.
+                        log_filter=_log_filter_addurls,
+                        unit="files",
+                        lgr=lgr,
+                    ))
+                    if spilled_files is None:
+                        files_to_add.extend(added_paths)
+                    else:
+                        for path in added_paths:
+                            spilled_files.append(path)
+                    added_paths.clear()
+
+                try:
+                    chunk = read_chunk()
+                except (ValueError, RequestException) as exc:
+                    failed = True
+                    yield dict(st_dict, status="error", message=exc_str(exc))
+                    break
+
+            if dry_run:
+                yield dict(st_dict, status="ok", message="dry-run finished")
+                return
 
-        # We need to serialize itertools.groupby .
-        rows_by_ds = [(k, tuple(v)) for k, v in groupby_sorted(rows, key=keyfn)]
-
-        # There could be "intermediate" subdatasets which have no rows but would need
-        # their datasets created and saved, so let's add them
-        add_subpaths = set(subpaths).difference(r[0] for r in rows_by_ds)
-        nrows_by_ds_orig = len(rows_by_ds)
-        if add_subpaths:
-            for subpath in add_subpaths:
-                rows_by_ds.append((subpath, tuple()))
-            # and now resort them again since we added
-            rows_by_ds = sorted(rows_by_ds, key=lambda r: r[0])
-
-        # We want to provide progress overall files not just datasets
-        # so our total will be just a len of rows
-        def agg_files(*args, **kwargs):
-            return len(rows)
-
-        yield from ProducerConsumerProgressLog(
-            rows_by_ds,
-            addurls_to_ds,
-            agg=agg_files,
-            # It is ok to start with subdatasets since top dataset already exists
-            safe_to_consume=partial(no_parentds_in_futures, skip=("", None, ".")),
-            # our producer provides not only dataset paths and also rows, take just path
-            producer_future_key=lambda row_by_ds: row_by_ds[0],
-            jobs=jobs,
-            # Logging options
-            # we will be yielding all kinds of records, but of interest for progress
-            # reporting only addurls on files
-            # note: annexjson2result overrides 'action' with 'command' content from
-            # annex, so we end up with 'addurl' even if we provide 'action'='addurls'.
-            # TODO: see if it is all ok, since we might be now yielding both
-            # addurls and addurl records.
-            log_filter=_log_filter_addurls,
-            unit="files",
-            lgr=lgr,
-        )
-
-        if save:
-            extra_msgs = []
-            if created_subds:
-                extra_msgs.append(f"{len(created_subds)} subdatasets were created")
-            if extra_msgs:
-                extra_msgs.append('')
-            message_addurls = message or f"""\
-[DATALAD] add {len(files_to_add)} files to {nrows_by_ds_orig} (sub)datasets from URLs
+            if save:
+                extra_msgs = []
+                if created_subds:
+                    extra_msgs.append(f"{len(created_subds)} subdatasets were created")
+                if extra_msgs:
+                    extra_msgs.append('')
+                message_addurls = message or f"""\
+[DATALAD] add {sum(files_added.values())} files to {len(row_subpaths)} (sub)datasets from URLs
 
 {os.linesep.join(extra_msgs)}
 url_file={displayed_source}
 url_format='{url_format}'
 filename_format='{filenameformat}'"""
 
-            # save all in bulk
-            files_to_add.update([r[0] for r in rows_by_ds])
-            yield from ds.save(
-                list(files_to_add),
-                message=message_addurls,
-                jobs=jobs,
-                return_type='generator')
+                # Save the added files, and only those, in batches of at most
+                # `max_rows` paths. The last batch is saved together with the
+                # subdatasets and gets the full commit message.
+                if spilled_files is None:
+                    batches = iter([sorted(files_to_add)])
+                else:
+                    spilled_files.close()
+                    spilled = iter(spilled_files)
+                    batches = iter(
+                        lambda: list(itertools.islice(spilled, max_rows)), [])
+                batch = next(batches, [])
+                for next_batch in batches:
+                    yield from track_failures(ds.save(
+                        batch,
+                        message="[DATALAD] add files from URLs "
+                                "(intermediate save)",
+                        jobs=jobs,
+                        return_type='generator'))
+                    batch = next_batch
+                # A subdataset is saved along with the files in it. Giving its
+                # path as well would keep its new state from being recorded
+                # in the superdataset, hence only subdatasets without added
+                # files in this batch are given.
+                file_dirs = set()
+                for path in batch:
+                    d = op.dirname(op.relpath(path, ds.path))
+                    while d and d not in file_dirs:
+                        file_dirs.add(d)
+                        d = op.dirname(d)
+                batch.extend(p for p in sort_paths(subpaths)
+                             if p not in file_dirs)
+                if batch:
+                    yield from track_failures(ds.save(
+                        batch,
+                        message=message_addurls,
+                        jobs=jobs,
+                        return_type='generator'))
+
+            if journal is not None and not failed:
+                # Nothing to resume anymore.
+                journal.remove()
+        finally:
+            if journal is not None:
+                journal.close()
+            if filenames is not None:
+                filenames.close()
+            if spilled_files is not None:
+                spilled_files.close()
+            if spill is not None:
+                spill.cleanup()
 
 
 __datalad_plugin__ = Addurls
@@ -16,7 +16,10 @@ import os.path as op
 import shutil
 import tempfile
 
-from unittest.mock import patch
+from unittest.mock import (
+    MagicMock,
+    patch,
+)
 
 from io import StringIO
 
@@ -50,6 +53,7 @@ from datalad.tests.utils import (
     with_tempfile,
     with_tree,
     on_windows,
+    serve_path_via_http,
     DEFAULT_BRANCH,
 )
 from datalad.utils import get_tempfile_kwargs, rmtemp
@@ -115,6 +119,22 @@ def test_formatter_missing_arg():
         "ok,NA")
 
 
+def test_formatter_compile():
+    fmt = au.Formatter({0: "col0"}, "NA")
+    row = {"col0": "v0", "a": "x", "b": "", "n": 3, "l": ["y"]}
+    for format_string, expected in [
+            ("{0}", "v0"),
+            ("pre-{a}/{0}.{b}", "pre-x/v0.NA"),
+            ("{a!r}{a!l}{n:03d}", "'x'x003"),
+            ("{l[0]}", "y"),
+            ("{a:{n}}", "x  "),
+            ("no fields", "no fields")]:
+        eq_(fmt.compile(format_string)(row), expected)
+        eq_(fmt.format(format_string, row), expected)
+    assert_raises(KeyError, fmt.compile("{nothere}"), row)
+    assert_raises(KeyError, fmt.compile("{1}"), row)
+
+
 def test_repformatter():
     fmt = au.RepFormatter({})
 
@@ -234,6 +254,17 @@ def test_get_url_parts():
          "_url_basename_root": "git-users",
          "_url_basename_ext": ""})
 
+    assert_dict_equal(
+        au.get_url_parts("http://datalad.org/for/git-users", path=False),
+        {"_url_hostname": "datalad.org"})
+    assert_dict_equal(
+        au.get_url_parts("http://datalad.org/for/git-users",
+                         basename_parts=False),
+        {"_url_hostname": "datalad.org",
+         "_url0": "for",
+         "_url1": "git-users",
+         "_url_basename": "git-users"})
+
 
 ST_DATA = {"header": ["name", "debut_season", "age_group", "now_dead"],
            "rows": [{"name": "will", "debut_season": 1,
@@ -333,11 +364,104 @@ def check_extract_csv_json_equal(input_type):
     eq_(json_output, csv_output)
 
 
+@with_tree(tree={'a.txt': 'aaa'})
+@serve_path_via_http
+def test_add_url_status_values_duplicates(path, url):
+    rows_urls = [({'n': i}, url + ('a.txt' if i != 1 else 'nothere.txt'))
+                 for i in range(4)]
+    with swallow_logs(new_level=logging.WARNING):
+        out = list(au.add_url_status_values(rows_urls, jobs=2))
+    eq_([row['n'] for row, _ in out], [0, 1, 2, 3])
+    eq_([row['_url_size'] for row, _ in out], ['3', '', '3', '3'])
+
+
+class _FakeAddurlProcess(object):
+    """Stand-in for a batched `git annex addurl --json` process.
+    """
+
+    def __init__(self, replies, restart_at=None, alive=False):
+        self.replies = list(replies)
+        self.restart_at = restart_at
+        self.sent = []
+        # A process that is still running once all replies are read.
+        self._process = MagicMock()
+        self._process.poll.return_value = None if alive else 0
+
+    def send(self, line):
+        self.sent.append(line)
+        return len(self.sent) == self.restart_at
+
+    def receive(self):
+        return self.replies.pop(0) if self.replies else {}
+
+
+def _get_pipeline(bcmd, window):
+    repo = MagicMock()
+    repo._batched.get.return_value = bcmd
+    return au.PipelinedAddurl(repo, window=window)
+
+
+def test_pipelined_addurl():
+    def reply(name):
+        return {"input": ["url/{0} {0}".format(name)], "file": name}
+
+    # replies are matched to requests
+    pipeline = _get_pipeline(
+        _FakeAddurlProcess([reply("b"), reply("a"), reply("c")]), window=2)
+    eq_(pipeline.submit("url/a", "a", 1), [])
+    eq_(pipeline.submit("url/b", "b", 2), [(2, reply("b"))])
+    eq_(pipeline.submit("url/c", "c", 3), [(1, reply("a"))])
+    eq_(list(pipeline.finish()), [(3, reply("c"))])
+
+    # a terminated process fails all pending requests
+    pipeline = _get_pipeline(_FakeAddurlProcess([reply("a")]), window=2)
+    eq_(pipeline.submit("url/a", "a", 0), [])
+    eq_(pipeline.submit("url/b", "b", 1), [(0, reply("a"))])
+    eq_(pipeline.submit("url/c", "c", 2), [(1, {}), (2, {})])
+    eq_(list(pipeline.finish()), [])
+
+    # so does a restarted one
+    pipeline = _get_pipeline(
+        _FakeAddurlProcess([reply("c")], restart_at=3), window=3)
+    eq_(pipeline.submit("url/a", "a", 0), [])
+    eq_(pipeline.submit("url/b", "b", 1), [])
+    eq_(pipeline.submit("url/c", "c", 2), [(0, {}), (1, {})])
+    eq_(list(pipeline.finish()), [(2, reply("c"))])
+
+    # an empty line from a running process fails only the oldest request
+    pipeline = _get_pipeline(
+        _FakeAddurlProcess([{}, reply("b")], alive=True), window=2)
+    eq_(pipeline.submit("url/a", "a", 0), [])
+    eq_(pipeline.submit("url/b", "b", 1), [(0, {})])
+    eq_(list(pipeline.finish()), [(1, reply("b"))])
+
+    # an unexpected reply is not attributed to any request, but stands for
+    # the oldest one
+    pipeline = _get_pipeline(
+        _FakeAddurlProcess([reply("x"), reply("b")], alive=True), window=3)
+    pipeline.submit("url/a", "a", 0)
+    pipeline.submit("url/b", "b", 1)
+    with swallow_logs(new_level=logging.WARNING) as cml:
+        eq_(list(pipeline.finish()), [(0, {}), (1, reply("b"))])
+        assert_in("Cannot match git-annex addurl reply", cml.out)
+
+
 def test_extract_csv_tsv_json_equal():
     yield check_extract_csv_json_equal, "csv"
     yield check_extract_csv_json_equal, "tsv"
 
 
+def test_read_jsonl():
+    jsonl = "\n".join(json.dumps(r) for r in ST_DATA["rows"])
+    rows, idx_map = au._read(StringIO(jsonl + "\n\n"), "jsonl")
+    eq_(list(rows), ST_DATA["rows"])
+    eq_(idx_map, {})
+
+    assert_raises(ValueError, au._read, StringIO(""), "jsonl")
+    rows, _ = au._read(StringIO(jsonl + "\n{broken"), "jsonl")
+    assert_raises(ValueError, list, rows)
+
+
 def test_extract_wrong_input_type():
     assert_raises(ValueError,
                   au._read, None, "invalid_input_type")
@@ -473,6 +597,9 @@ class TestAddurls(object):
         ds.addurls(json_file, "{url}", "{name}",
                    exclude_autometa="(md5sum|size)")
         ok_startswith(ds.repo.format_commit('%b', DEFAULT_BRANCH), f"url_file='{json_file}'")
+        # metadata results are not counted as added files
+        eq_(ds.repo.format_commit('%s', DEFAULT_BRANCH),
+            "[DATALAD] add 3 files to 1 (sub)datasets from URLs")
 
         filenames = ["a", "b", "c"]
         for fname in filenames:
@@ -615,6 +742,65 @@ class TestAddurls(object):
         for fname in ["foo-0", "bar-0", "foo-1"]:
             ok_exists(op.join(ds.path, fname))
 
+    @with_tempfile(mkdir=True)
+    def test_addurls_spilled_rows(self, path):
+        ds = Dataset(path).create(force=True)
+        # add rows one by one, holding (almost) nothing in memory
+        ds.config.set("datalad.addurls.max-rows-in-memory", "1",
+                      where="local")
+        create_tree(ds.path, {"untracked": "x"})
+
+        # a collision is detected once the row is read
+        with assert_raises(IncompleteResultsError) as raised:
+            ds.addurls(self.json_file, "{url}", "c-{subdir}")
+        assert_in("There are file name collisions", str(raised.exception))
+        ok_exists(op.join(ds.path, "c-bar"))
+        assert_repo_status(ds.path, untracked=["untracked"])
+
+        ds.addurls(self.json_file, "{url}", "{subdir}//{name}")
+        for fname in [op.join("foo", "a"), op.join("bar", "b"),
+                      op.join("foo", "c")]:
+            ok_exists(op.join(ds.path, fname))
+        # only the added files are saved
+        assert_repo_status(ds.path, untracked=["untracked"])
+        eq_(set(subdatasets(dataset=ds, result_xfm="relpaths")),
+            {"foo", "bar"})
+        assert_in("add 3 files to 2 (sub)datasets",
+                  ds.repo.format_commit("%s"))
+
+    @with_tempfile(mkdir=True)
+    def test_addurls_batch_window(self, path):
+        ds = Dataset(path).create(force=True)
+        ds.config.set("datalad.addurls.batch-window", "2", where="local")
+        ds.config.set("datalad.addurls.annex-jobs", "2", where="local")
+        data = self.data + [dict(self.data[0],
+                                 url=self.url + "udir/nothere.dat",
+                                 name="nothere")]
+        json_file = op.join(path, "in.json")
+        with open(json_file, "w") as fh:
+            json.dump(data, fh)
+
+        res = ds.addurls(json_file, "{url}", "{name}",
+                         on_failure="ignore")
+        for fname in ["a", "b", "c"]:
+            ok_exists(op.join(ds.path, fname))
+            assert_in_results(res, action="addurl", status="ok",
+                              path=op.join(ds.path, fname))
+        # the failure is reported for the right file
+        assert_in_results(res, action="addurl", status="error",
+                          path=op.join(ds.path, "nothere"))
+        assert_false(op.lexists(op.join(ds.path, "nothere")))
+
+    @with_tempfile(mkdir=True)
+    def test_addurls_jsonl(self, path):
+        ds = Dataset(path).create(force=True)
+        jsonl_file = op.join(path, "in.jsonl")
+        with open(jsonl_file, "w") as fh:
+            fh.write("\n".join(json.dumps(r) for r in self.data))
+        ds.addurls(jsonl_file, "{url}", "{name}")
+        for fname in ["a", "b", "c"]:
+            ok_exists(op.join(ds.path, fname))
+
     @with_tempfile(mkdir=True)
     def test_addurls_url_parts(self, path):
         ds = Dataset(path).create(force=True)
@@ -630,6 +816,14 @@ class TestAddurls(object):
         for fname in ["a.dat", "b.dat", "c.dat"]:
             ok_exists(op.join(ds.path, "udir", fname))
 
+    @with_tempfile(mkdir=True)
+    def test_addurls_url_status(self, path):
+        ds = Dataset(path).create(force=True)
+        ds.addurls(self.json_file, "{url}", "{name}",
+                   meta=["urlsize={_url_size}"], exclude_autometa="*")
+        for fname, meta in ds.repo.get_metadata(["a", "b", "c"]):
+            eq_(meta["urlsize"], ["9"])
+
     @with_tempfile(mkdir=True)
     def test_addurls_url_filename_fail(self, path):
         ds = Dataset(path).create(force=True)
@@ -644,13 +838,15 @@ class TestAddurls(object):
         ds = Dataset(path).create(force=True)
 
         # Force failure by passing a non-existent file name to annex.
-        fn = ds.repo.set_metadata_
+        fn = ds.repo.set_metadata_batched
 
-        def set_meta(_, **kwargs):
-            for i in fn("wreaking-havoc-and-such", **kwargs):
+        def set_meta(records, **kwargs):
+            for i in fn((("wreaking-havoc-and-such", meta)
+                         for _, meta in records),
+                        **kwargs):
                 yield i
 
-        with patch.object(ds.repo, 'set_metadata_', set_meta):
+        with patch.object(ds.repo, 'set_metadata_batched', set_meta):
             with assert_raises(IncompleteResultsError):
                 ds.addurls(self.json_file, "{url}", "{name}")
 
@@ -666,12 +862,12 @@ class TestAddurls(object):
     def test_addurls_version(self, path):
         ds = Dataset(path).create(force=True)
 
-        def version_fn(url):
-            if url.endswith("b.dat"):
-                raise ValueError("Scheme error")
-            return url + ".v1"
+        def version_fn(urls, **kwargs):
+            return {url: ValueError("Scheme error") if url.endswith("b.dat")
+                    else url + ".v1"
+                    for url in urls}
 
-        with patch("datalad.plugin.addurls.get_versioned_url", version_fn):
+        with patch("datalad.plugin.addurls.get_versioned_urls", version_fn):
             with swallow_logs(new_level=logging.WARNING) as cml:
                 ds.addurls(self.json_file, "{url}", "{name}",
                            version_urls=True)
@@ -777,6 +973,61 @@ class TestAddurls(object):
 
         assert_result_count(res, 3, action='addurl', status='ok')  # a, b, c  even if a goes to git
         assert_result_count(res, 2, action='drop', status='ok')  # b, c
+        eq_(ds.repo.format_commit('%s', DEFAULT_BRANCH),
+            "[DATALAD] add 3 files to 1 (sub)datasets from URLs")
+
+    @with_tempfile(mkdir=True)
+    def test_addurls_resume(self, path):
+        ds = Dataset(path).create(force=True)
+        ds.config.set("datalad.addurls.save-interval", "1", where="local")
+        journal_path = au._get_journal_path(
+            ds, self.json_file, "{url}", "{subdir}//{name}", None)
+        # An interrupted run that added 'a' and cut off its last record.
+        journal_path.parent.mkdir(parents=True)
+        journal_path.write_text(
+            json.dumps({"file": op.join("foo", "a")}) + '\n{"file": "fo')
+
+        res = ds.addurls(self.json_file, "{url}", "{subdir}//{name}")
+        assert_result_count(res, 1, action="addurls", status="notneeded",
+                            path=op.join(ds.path, "foo", "a"))
+        assert_false(op.lexists(op.join(ds.path, "foo", "a")))
+        for fname in [op.join("bar", "b"), op.join("foo", "c")]:
+            ok_exists(op.join(ds.path, fname))
+        assert_false(journal_path.exists())
+        assert_repo_status(ds.path)
+        # one intermediate save of each subdataset
+        assert_result_count(
+            res, 1, action="save", status="ok",
+            path=op.join(ds.path, "foo"), type="dataset",
+            refds=op.join(ds.path, "foo"))
+
+        # Records are on disk as soon as they are added.
+        journal = au._Journal(journal_path)
+        journal.add({"filename": "a"})
+        eq_(au._Journal(journal_path).done, {"a"})
+        journal.remove()
+
+        # A journal is not used for a modified URL file.
+        url_file = op.join(path, "in.json")
+        with open(url_file, "w") as fh:
+            json.dump(self.data, fh)
+        args = ("{url}", "{subdir}//{name}", None)
+        before = au._get_journal_path(ds, url_file, *args)
+        eq_(au._get_journal_path(ds, url_file, *args), before)
+        with open(url_file, "w") as fh:
+            json.dump(self.data[:2], fh)
+        assert_true(au._get_journal_path(ds, url_file, *args) != before)
+
+        # A run with failures keeps its journal.
+        with open(url_file, "w") as fh:
+            json.dump(self.data + [dict(self.data[0],
+                                        url=self.url + "udir/nothere.dat",
+                                        name="nothere")], fh)
+        journal_path = au._get_journal_path(
+            ds, url_file, "{url}", "x-{name}", None)
+        res = ds.addurls(url_file, "{url}", "x-{name}", on_failure="ignore")
+        assert_in_results(res, action="addurl", status="error")
+        eq_(au._Journal(journal_path).done, {"x-a", "x-b", "x-c"})
 
     @with_tempfile(mkdir=True)
     def test_addurls_from_key_invalid_format(self, path):
@@ -792,11 +1043,13 @@ class TestAddurls(object):
 
     @with_tempfile(mkdir=True)
     def check_addurls_from_key(self, key_arg, expected_backend, fake_dates,
-                               path):
+                               key_jobs, path):
         ds = Dataset(path).create(force=True, fake_dates=fake_dates)
         if OLD_EXAMINEKEY and ds.repo.is_managed_branch():
             raise SkipTest("Adjusted branch functionality requires "
                            "more recent `git annex examinekey`")
+        ds.config.set("datalad.addurls.key-jobs", str(key_jobs),
+                      where="local")
         ds.addurls(self.json_file, "{url}", "{name}", exclude_autometa="*",
                    key=key_arg)
         repo = ds.repo
@@ -819,8 +1072,9 @@ class TestAddurls(object):
                 (fn, "MD5E-s{size}--{md5sum}.dat", "MD5E"),
                 (skip_key_tests(fn), "et:MD5-s{size}--{md5sum}", "MD5E"),
                 (skip_key_tests(fn), "et:MD5E-s{size}--{md5sum}.dat", "MD5")]:
-            yield case + (False,)
-            yield case + (True,)
+            yield case + (False, 1)
+            yield case + (True, 1)
+            yield case + (False, 2)
 
     @with_tempfile(mkdir=True)
     def test_addurls_row_missing_key_fields(self, path):
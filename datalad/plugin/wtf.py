@@ -171,7 +171,7 @@ def _describe_configuration(cfg, sensitive):
 
 def _describe_extensions():
     infos = {}
-    from pkg_resources import iter_entry_points
+    from datalad.support.entrypoints import iter_entry_points
     from importlib import import_module
 
     for e in iter_entry_points('datalad.extensions'):
@@ -206,7 +206,7 @@ def _describe_extensions():
 
 def _describe_metadata_elements(group):
     infos = {}
-    from pkg_resources import iter_entry_points
+    from datalad.support.entrypoints import iter_entry_points
     from importlib import import_module
 
     for e in iter_entry_points(group):
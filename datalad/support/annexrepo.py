@@ -28,6 +28,7 @@ from os.path import (
     isdir,
     normpath
 )
+from functools import partial
 from multiprocessing import cpu_count
 from weakref import (
     finalize,
@@ -66,6 +67,7 @@ from datalad.cmd import (
 )
 
 # imports from same module:
+from .callaccounting import get_call_accounting
 from .repo import RepoInterface
 from .gitrepo import (
     GitRepo,
@@ -970,21 +972,33 @@ class AnnexRepo(GitRepo, RepoInterface):
         if self.fake_dates_enabled:
             env = self.add_fake_dates(runner.env)
 
+        if files:
+            run = partial(
+                runner.run_on_filelist_chunks,
+                cmd,
+                files,
+                protocol=protocol,
+                env=env,
+                **kwargs)
+        else:
+            run = partial(
+                runner.run,
+                cmd,
+                stdin=stdin,
+                protocol=protocol,
+                env=env,
+                **kwargs)
+        accounting = get_call_accounting()
         try:
-            if files:
-                return runner.run_on_filelist_chunks(
-                    cmd,
-                    files,
-                    protocol=protocol,
-                    env=env,
-                    **kwargs)
-            else:
-                return runner.run(
-                    cmd,
-                    stdin=stdin,
-                    protocol=protocol,
-                    env=env,
-                    **kwargs)
+            if accounting is None:
+                return run()
+            # git-annex calls are never considered read-only
+            return accounting.call(
+                self.path,
+                tuple(['git'] + (git_options or []) + ['annex']
+                      + [str(a) for a in args + list(files or [])]),
+                False,
+                run)
         except CommandError as e:
             # Note: A call might result in several 'failures', that can be or
             # cannot be handled here. Detection of something, we can deal with,
@@ -3103,6 +3117,55 @@ class AnnexRepo(GitRepo, RepoInterface):
                 files=files):
             yield jsn
 
+    def set_metadata_batched(self, records, add=False):
+        """Set git-annex file-metadata via a single `metadata --batch` process
+
+        Parameters
+        ----------
+        records : iterable
+          (file, dict) tuples, with a dict mapping metadata keys to a value
+          or a list of values. Files that are not annexed are skipped.
+          Records are consumed lazily.
+        add : bool, optional
+          If False, the given values replace any existing values of the
+          respective key (like `reset` of `set_metadata()`). If True, they
+          are added to existing values (like `add` of `set_metadata()`),
+          at the cost of an additional query per file. Keys not given are
+          left untouched in either case.
+
+        Returns
+        -------
+        generator
+          JSON obj per file
+        """
+        # Make sure that batch add/addurl operations are closed so that we can
+        # operate on files that were just added.
+        self.precommit()
+        batched = self._batched.get('metadata', json=True, path=self.path)
+        for f, meta in records:
+            fields = {k: [str(v) for v in ensure_list(vs)]
+                      for k, vs in meta.items()}
+            if add:
+                res = batched.proc1(json.dumps({'file': f}))
+                for k, vs in (res.get('fields') or {}).items():
+                    if k in fields:
+                        fields[k] = vs + [v for v in fields[k]
+                                          if v not in vs]
+            res = batched.proc1(json.dumps({'file': f, 'fields': fields}))
+            if not res:
+                # annex replies with an empty line, if it cannot handle
+                # the file
+                if lexists(opj(self.path, f)):
+                    # like without --batch, files not in the annex are
+                    # skipped silently
+                    lgr.debug("Not setting metadata of %s, not annexed", f)
+                    continue
+                res = {'command': 'metadata',
+                       'file': f,
+                       'success': False,
+                       'error-messages': ['File not found: %s' % f]}
+            yield res
+
     # TODO: RM DIRECT?  might remain useful to detect submods left in direct mode
     @staticmethod
     def _is_annex_work_tree_message(out):
@@ -0,0 +1,275 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Accounting of git and git-annex calls made during a DataLad command
+
+If `datalad.runtime.report-git-calls` is enabled, all calls made via
+`GitRepo._call_git()` and `AnnexRepo._call_annex()` during the execution of
+a (top-level) DataLad command are counted per repository and argument list,
+and a report of calls that were made repeatedly is written to stderr at the
+end of the command.
+
+If `datalad.runtime.memoize-git-calls` is enabled, the output of calls
+that are flagged as `read_only` is reused for identical calls in the same
+repository, for the lifetime of the command. Any other external command
+execution (including git calls that are not flagged as `read_only`, and
+requests to batched processes) invalidates all memoized output, as it could have modified any
+repository. Modifications of a worktree that do not involve an external
+command are not detected, hence memoization is an experimental feature.
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# CallAccounting of the command that is currently executing. It is only set
+# while a command's code runs, not while the consumer of its results does,
+# such that an unfinished command does not affect any other command.
+# ProducerConsumer propagates it into its threads.
+_accounting = ContextVar('datalad_call_accounting', default=None)
+# flags that a thread executes a call whose output can be memoized
+_local = threading.local()
+
+_NOT_CACHED = object()
+
+
+class CallAccounting(object):
+    """Counts calls per repository and argument list
+
+    Parameters
+    ----------
+    memoize : bool, optional
+      Whether to reuse the output of read-only calls.
+    """
+    def __init__(self, memoize=False):
+        self.memoize = memoize
+        # (path, argv) -> [number of calls, number of cache hits, seconds]
+        self.calls = {}
+        self._cache = {}
+        # incremented by any potential modification
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def call(self, path, argv, read_only, func):
+        """Execute and account for a call
+
+        Parameters
+        ----------
+        path : str
+          Path of the repository the call is made in.
+        argv : tuple
+          Arguments of the call, identifying it together with `path`.
+        read_only : bool
+          Whether the call leaves all repositories unmodified, and its
+          output only depends on their state.
+        func : callable
+          Executes the call, when called without arguments. The return
+          value must not be modified by callers, if memoization is
+          enabled.
+
+        Returns
+        -------
+        Return value of `func`, or the memoized return value of a
+        previous identical call.
+        """
+        key = (path, argv)
+        memoize = read_only and self.memoize
+        if memoize:
+            with self._lock:
+                value = self._cache.get(key, _NOT_CACHED)
+                generation = self._generation
+            if value is not _NOT_CACHED:
+                self._record(key, 0.0, cached=True)
+                return value
+        else:
+            self.invalidate()
+        _local.read_only = memoize
+        start = time.perf_counter()
+        try:
+            value = func()
+        finally:
+            _local.read_only = False
+            self._record(key, time.perf_counter() - start)
+        if memoize:
+            with self._lock:
+                # a modification while the call was running could have
+                # affected its output
+                if generation == self._generation:
+                    self._cache[key] = value
+        else:
+            # another call could have memoized the state during the
+            # modification
+            self.invalidate()
+        return value
+
+    def _record(self, key, duration, cached=False):
+        with self._lock:
+            stats = self.calls.get(key, None)
+            if stats is None:
+                stats = self.calls[key] = [0, 0, 0.0]
+            stats[0] += 1
+            stats[1] += cached
+            stats[2] += duration
+
+    def invalidate(self):
+        """Discard all memoized output"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def get_repeated_calls(self):
+        """Return all calls that were made more than once
+
+        Returns
+        -------
+        list
+          (path, argv, number of calls, number of cache hits, seconds)
+          tuples, sorted by decreasing number of calls.
+        """
+        with self._lock:
+            calls = [k + tuple(v) for k, v in self.calls.items() if v[0] > 1]
+        return sorted(calls, key=lambda c: (-c[2], -c[4]))
+
+    def write_report(self, out, title='', n=20):
+        """Write a summary of repeated calls
+
+        Parameters
+        ----------
+        out : file-like
+        title : str, optional
+          Label of what was accounted for, e.g. the name of a command.
+        n : int, optional
+          Maximum number of calls to list.
+        """
+        repeated = self.get_repeated_calls()
+        with self._lock:
+            ncalls = sum(v[0] for v in self.calls.values())
+            nhits = sum(v[1] for v in self.calls.values())
+        out.write(
+            "git calls{}: {} in total, {} repeated identical calls, "
+            "{} served from memory\n".format(
+                ' during {}'.format(title) if title else '',
+                ncalls,
+                sum(c[2] - 1 for c in repeated),
+                nhits))
+        if not repeated:
+            return
+        out.write("{:>6} {:>6} {:>9}  {}\n".format(
+            'calls', 'cached', 'time[ms]', 'call [repository]'))
+        for path, argv, count, hits, duration in repeated[:n]:
+            call = ' '.join(argv)
+            if len(call) > 100:
+                call = call[:97] + '...'
+            out.write("{:>6} {:>6} {:>9.1f}  {} [{}]\n".format(
+                count, hits, duration * 1000, call, path))
+        if len(repeated) > n:
+            out.write("... and {} more\n".format(len(repeated) - n))
+
+
+def get_call_accounting():
+    """Return the active CallAccounting, or None"""
+    return _accounting.get()
+
+
+def invalidate_memoized_calls():
+    """Signal that an external command is about to be executed
+
+    Discards all memoized output, unless the command is itself a memoizable
+    call.
+    """
+    accounting = _accounting.get()
+    if accounting is not None and accounting.memoize and \
+            not getattr(_local, 'read_only', False):
+        accounting.invalidate()
+
+
+@contextmanager
+def account_calls(memoize=False, report=None, title=''):
+    """Activate call accounting for the duration of the context
+
+    If accounting is already active, e.g. because a command is called by
+    another command, the active accounting is used and no report is written.
+    The context must not span a `yield`, use `account_generator_function()`
+    for generators.
+
+    Parameters
+    ----------
+    memoize : bool, optional
+      Whether to reuse the output of read-only calls.
+    report : file-like, optional
+      If given, a report of repeated calls is written to it at the end.
+    title : str, optional
+      Passed to `CallAccounting.write_report()`.
+
+    Yields
+    ------
+    CallAccounting
+    """
+    accounting = _accounting.get()
+    if accounting is not None:
+        yield accounting
+        return
+    accounting = CallAccounting(memoize=memoize)
+    token = _accounting.set(accounting)
+    try:
+        yield accounting
+    finally:
+        _accounting.reset(token)
+        if report is not None:
+            accounting.write_report(report, title=title)
+
+
+def account_generator_function(func, name, cfg):
+    """Wrap a generator function to account for the calls it makes
+
+    Accounting is only active while the generator executes. The report is
+    written when the generator is exhausted or closed.
+
+    Parameters
+    ----------
+    func : callable
+      Generator function.
+    name : str
+      Label of the generator in the report.
+    cfg : ConfigManager
+      Configuration to query whether reporting and memoization are enabled.
+
+    Returns
+    -------
+    callable
+      `func` itself if neither reporting nor memoization is enabled.
+    """
+    report = cfg.obtain('datalad.runtime.report-git-calls')
+    memoize = cfg.obtain('datalad.runtime.memoize-git-calls')
+    if not (report or memoize):
+        return func
+
+    def accounted(*_args, **_kwargs):
+        if _accounting.get() is not None:
+            # called by another command, share its accounting
+            yield from func(*_args, **_kwargs)
+            return
+        accounting = CallAccounting(memoize=memoize)
+        gen = func(*_args, **_kwargs)
+        try:
+            while True:
+                token = _accounting.set(accounting)
+                try:
+                    res = next(gen)
+                except StopIteration:
+                    return
+                finally:
+                    _accounting.reset(token)
+                yield res
+        finally:
+            gen.close()
+            if report:
+                accounting.write_report(sys.stderr, title=name)
+    return accounted
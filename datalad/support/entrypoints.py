@@ -0,0 +1,229 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Discovery of entry points declared by installed distributions
+
+`pkg_resources` scans and parses all distributions on `sys.path` when it is
+imported, which can take a substantial amount of time in environments with
+many packages. Entry points of DataLad's groups ('datalad.*') are instead
+discovered via `importlib.metadata` (with a fallback to `pkg_resources`
+for Python versions without it), once per process. Discovered entry points
+are also cached on disk, keyed by a fingerprint of the distributions on
+`sys.path`, so that subsequent processes do not need to inspect any
+distribution at all.
+"""
+
+import logging
+import os
+import os.path as op
+import sys
+import threading
+from functools import lru_cache
+from importlib import import_module
+
+lgr = logging.getLogger('datalad.support.entrypoints')
+
+# only entry points of these groups are discovered and cached
+_GROUP_PREFIX = 'datalad.'
+
+# incremented whenever the format of the cache changes
+_CACHE_VERSION = 1
+
+_lock = threading.Lock()
+
+
+class EntryPoint(object):
+    """Entry point declared by a distribution
+
+    Parameters
+    ----------
+    name : str
+    group : str
+    value : str
+      Object reference in the form 'module[:attr[.attr]]'.
+    dist : str, optional
+      Name and version of the declaring distribution.
+    """
+
+    def __init__(self, name, group, value, dist=None):
+        self.name = name
+        self.group = group
+        self.value = value
+        self.dist = dist
+
+    @property
+    def module_name(self):
+        return self.value.split(':')[0].strip()
+
+    def load(self):
+        """Import and return the object the entry point refers to"""
+        module_name, _, attrs = self.value.partition(':')
+        obj = import_module(module_name.strip())
+        # anything after whitespace are extras, which are not supported
+        attrs = attrs.split()[0] if attrs.strip() else ''
+        for attr in filter(None, attrs.split('.')):
+            obj = getattr(obj, attr)
+        return obj
+
+    def __repr__(self):
+        return '{}({!r}, {!r}, {!r})'.format(
+            self.__class__.__name__, self.name, self.group, self.value)
+
+
+def iter_entry_points(group, name=None):
+    """Yield entry points of a group
+
+    Parameters
+    ----------
+    group : str
+      Entry point group, e.g. 'datalad.extensions'.
+    name : str, optional
+      If given, only entry points with this name are reported.
+
+    Returns
+    -------
+    generator of EntryPoint
+    """
+    for ep in _get_entry_points().get(group, []):
+        if name is None or ep.name == name:
+            yield ep
+
+
+def rediscover_entry_points():
+    """Discard the entry points memoized in this process
+
+    The next query inspects the installed distributions again (or the
+    on-disk cache, if they did not change), e.g. to find entry points of
+    a distribution that was installed while the process is running.
+    """
+    _get_entry_points.cache_clear()
+
+
+def get_environment_fingerprint():
+    """Return a fingerprint of the distributions installed on `sys.path`
+
+    It considers the DataLad version, the interpreter, the metadata
+    directories of all distributions on `sys.path` (which include their
+    versions in their names), and the modification times of their entry
+    point declarations, but no metadata content.
+    """
+    from hashlib import md5
+    import datalad
+    items = [datalad.__version__, sys.executable, str(_CACHE_VERSION)]
+    for p in sys.path:
+        try:
+            entries = sorted(os.listdir(p or os.curdir))
+        except OSError:
+            continue
+        items.append(p)
+        for e in entries:
+            if e.endswith(('.dist-info', '.egg-info')):
+                try:
+                    mtime = os.stat(op.join(p, e, 'entry_points.txt')).st_mtime
+                except OSError:
+                    mtime = None
+                items.append('{}:{}'.format(e, mtime))
+            elif e.endswith(('.egg-link', '.pth', '.egg')):
+                items.append(e)
+    return md5('\n'.join(items).encode()).hexdigest()
+
+
+def _get_cache_path():
+    from datalad import cfg
+    return op.join(cfg.obtain('datalad.locations.cache'), 'entrypoints.json')
+
+
+@lru_cache()
+def _get_entry_points():
+    """Return a mapping of groups to their entry points (memoized)"""
+    import json
+    with _lock:
+        fingerprint = get_environment_fingerprint()
+        cache_path = _get_cache_path()
+        try:
+            with open(cache_path) as f:
+                cache = json.load(f)
+            if cache.get('fingerprint') == fingerprint:
+                return {
+                    group: [EntryPoint(**ep) for ep in eps]
+                    for group, eps in cache['entrypoints'].items()}
+        except (OSError, ValueError, TypeError) as e:
+            lgr.debug("Cannot use entry point cache at %s: %s",
+                      cache_path, e)
+
+        records = _discover()
+        try:
+            os.makedirs(op.dirname(cache_path), exist_ok=True)
+            # write to the side and move, concurrent processes might read it
+            tmp_path = '{}.{}'.format(cache_path, os.getpid())
+            with open(tmp_path, 'w') as f:
+                json.dump(dict(fingerprint=fingerprint, entrypoints=records),
+                          f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            lgr.debug("Failed to store entry point cache at %s: %s",
+                      cache_path, e)
+        return {
+            group: [EntryPoint(**ep) for ep in eps]
+            for group, eps in records.items()}
+
+
+def _discover():
+    """Discover entry points of all groups with the DataLad prefix
+
+    Returns
+    -------
+    dict
+      Mapping of groups to lists of dicts with 'name', 'group', 'value',
+      and 'dist' of an entry point.
+    """
+    try:
+        from importlib.metadata import distributions
+    except ImportError:
+        # Python < 3.8
+        return _discover_pkg_resources()
+
+    lgr.debug("Discovering entry points via importlib.metadata")
+    records = {}
+    seen = set()
+    for dist in distributions():
+        dist_name = dist.metadata['Name']
+        # like pkg_resources, only consider the first of multiple
+        # installations of a distribution on sys.path
+        if dist_name in seen:
+            continue
+        seen.add(dist_name)
+        for ep in dist.entry_points:
+            if not ep.group.startswith(_GROUP_PREFIX):
+                continue
+            records.setdefault(ep.group, []).append(dict(
+                name=ep.name,
+                group=ep.group,
+                value=ep.value,
+                dist='{} {}'.format(dist_name, dist.version)))
+    return records
+
+
+def _discover_pkg_resources():
+    import pkg_resources
+    lgr.debug("Discovering entry points via pkg_resources")
+    records = {}
+    for dist in pkg_resources.working_set:
+        for group, eps in dist.get_entry_map().items():
+            if not group.startswith(_GROUP_PREFIX):
+                continue
+            for ep in eps.values():
+                value = ep.module_name
+                if ep.attrs:
+                    value += ':' + '.'.join(ep.attrs)
+                records.setdefault(group, []).append(dict(
+                    name=ep.name,
+                    group=group,
+                    value=value,
+                    dist=str(dist)))
+    return records
@@ -34,7 +34,10 @@ from os.path import (
 
 import posixpath
 import threading
-from functools import wraps
+from functools import (
+    partial,
+    wraps,
+)
 from weakref import (
     finalize,
     WeakValueDictionary
@@ -89,6 +92,7 @@ from .network import (
     PathRI,
     is_ssh
 )
+from .callaccounting import get_call_accounting
 from .path import get_parent_paths
 from .repo import (
     PathBasedFlyweight,
@@ -2106,11 +2110,29 @@ class GitRepo(RepoInterface, metaclass=PathBasedFlyweight):
                   env=None, read_only=False):
         """Allows for calling arbitrary commands.
 
-        Internal helper to the call_git*() methods.
+        Internal helper to the call_git*() methods. Calls are accounted
+        for, and the output of read-only calls can be memoized, if enabled
+        (see `datalad.support.callaccounting`).
 
         The parameters, return value, and raised exceptions match those
         documented for `call_git`.
         """
+        accounting = get_call_accounting()
+        if accounting is None:
+            return self._run_git(args, files, expect_stderr=expect_stderr,
+                                 expect_fail=expect_fail, read_only=read_only)
+        files = list(files) if files else None
+        return accounting.call(
+            self.path,
+            tuple(['git'] + [str(a) for a in list(args) + (files or [])]),
+            read_only,
+            partial(self._run_git, args, files,
+                    expect_stderr=expect_stderr, expect_fail=expect_fail,
+                    read_only=read_only))
+
+    def _run_git(self, args, files=None, expect_stderr=False,
+                 expect_fail=False, read_only=False):
+        """Execute a git call for `_call_git()`"""
         runner = self._git_runner
         stderr_log_level = {True: 5, False: 11}[expect_stderr]
 
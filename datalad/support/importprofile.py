@@ -0,0 +1,193 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Profiling of module import times
+
+Enabled by setting the environment variable DATALAD_PROFILE_IMPORTS before
+datalad is imported. All modules imported afterwards, by datalad or any of
+its dependencies, are timed. When the process exits, a summary of the
+slowest imports is written to stderr, or, if the value of the variable is
+not a plain boolean flag but a file name, a table with the times of all
+imports is written to that file.
+
+Unlike Python's own `-X importtime`, this can be enabled for any process
+that imports datalad (e.g. the `datalad` command line tool) and also
+aggregates times by top-level package.
+"""
+
+import atexit
+import os
+import sys
+import threading
+from time import perf_counter
+
+# values of DATALAD_PROFILE_IMPORTS that request a summary on stderr
+_FLAG_VALUES = ('1', 'yes', 'on', 'true')
+
+_profiler = None
+
+
+class ImportProfiler(object):
+    """Meta path finder that times the execution of imported modules
+
+    The finder itself finds nothing. It lets the other finders find a
+    module's spec, and then times the loader's `exec_module()`.
+
+    Attributes
+    ----------
+    records : list
+      (module name, cumulative seconds, self seconds) tuples, in the order
+      in which imports finished. Cumulative times include the imports that
+      happened while a module was executed, self times do not.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._local = threading.local()
+        self._loader_classes = {}
+        self._lock = threading.Lock()
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                self._wrap_loader(spec.loader)
+                return spec
+        return None
+
+    def _wrap_loader(self, loader):
+        # Loaders of built-in and frozen modules are classes, and loaders
+        # without exec_module() use a legacy protocol. Such imports are not
+        # timed.
+        if loader is None or isinstance(loader, type) \
+                or not hasattr(loader, 'exec_module'):
+            return
+        cls = type(loader)
+        if cls in self._loader_classes.values():
+            # already wrapped
+            return
+        with self._lock:
+            timed_cls = self._loader_classes.get(cls)
+            if timed_cls is None:
+                timed_cls = self._loader_classes[cls] = \
+                    self._get_timed_loader_class(cls)
+        try:
+            # a subclass keeps any isinstance() checks on the loader working
+            loader.__class__ = timed_cls
+        except TypeError:
+            pass
+
+    def _get_timed_loader_class(self, cls):
+        profiler = self
+
+        def exec_module(self, module):
+            start = profiler._start()
+            try:
+                return cls.exec_module(self, module)
+            finally:
+                profiler._stop(module.__name__, start)
+
+        return type(cls.__name__, (cls,), {
+            'exec_module': exec_module,
+            '__module__': cls.__module__,
+        })
+
+    def _start(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        # time spent in nested imports
+        stack.append(0.0)
+        return perf_counter()
+
+    def _stop(self, name, start):
+        cumulative = perf_counter() - start
+        stack = self._local.stack
+        nested = stack.pop()
+        if stack:
+            stack[-1] += cumulative
+        self.records.append((name, cumulative, cumulative - nested))
+
+    def get_package_times(self):
+        """Return the self times of imports summed by top-level package
+
+        Returns
+        -------
+        list
+          (package, seconds, number of modules) tuples, slowest first.
+        """
+        packages = {}
+        for name, _, self_time in self.records:
+            pkg = name.split('.', 1)[0]
+            t, n = packages.get(pkg, (0.0, 0))
+            packages[pkg] = (t + self_time, n + 1)
+        return sorted(((p, t, n) for p, (t, n) in packages.items()),
+                      key=lambda x: -x[1])
+
+    def write_table(self, out):
+        """Write the times of all imports as tab-separated values"""
+        out.write('module\tcumulative_ms\tself_ms\n')
+        for name, cumulative, self_time in self.records:
+            out.write('{}\t{:.3f}\t{:.3f}\n'.format(
+                name, cumulative * 1000, self_time * 1000))
+
+    def write_summary(self, out, n=20):
+        """Write the slowest imports and packages in human-readable form"""
+        total = sum(r[2] for r in self.records)
+        out.write('Imported {} modules in {:.1f} ms\n'.format(
+            len(self.records), total * 1000))
+        out.write('Slowest modules (self ms, cumulative ms):\n')
+        for name, cumulative, self_time in sorted(
+                self.records, key=lambda r: -r[2])[:n]:
+            out.write('  {:8.1f} {:8.1f}  {}\n'.format(
+                self_time * 1000, cumulative * 1000, name))
+        out.write('Slowest packages (ms, modules):\n')
+        for pkg, t, nmods in self.get_package_times()[:n]:
+            out.write('  {:8.1f} {:5d}  {}\n'.format(t * 1000, nmods, pkg))
+
+
+def get_import_profiler():
+    """Return the active ImportProfiler, or None if profiling is disabled"""
+    return _profiler
+
+
+def enable_import_profiling(report=None):
+    """Start timing imports, and report the timings on exit
+
+    Parameters
+    ----------
+    report : str, optional
+      If a file name, a table of all imports is written to it. Otherwise
+      a summary is written to stderr.
+    """
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+    _profiler = ImportProfiler()
+    sys.meta_path.insert(0, _profiler)
+
+    def _report():
+        if report and report.lower() not in _FLAG_VALUES:
+            with open(report, 'w') as f:
+                _profiler.write_table(f)
+        else:
+            _profiler.write_summary(sys.stderr)
+    atexit.register(_report)
+    return _profiler
+
+
+def enable_from_environment():
+    """Enable import profiling if DATALAD_PROFILE_IMPORTS is set"""
+    report = os.environ.get('DATALAD_PROFILE_IMPORTS')
+    if report and report.lower() not in ('0', 'no', 'off', 'false'):
+        enable_import_profiling(report)
@@ -0,0 +1,267 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Profiling of the memory use of DataLad commands
+
+Enabled by the configuration variable `datalad.runtime.profile-memory`.
+While a (top-level) DataLad command is executed, the resident set size (RSS)
+of the process is sampled in a background thread. At the end of the command,
+the peak RSS is written to stderr, together with the peak RSS observed while
+the results of each dataset were produced. The latter is determined by
+attributing all samples taken since the previous result to the dataset a
+result belongs to.
+
+With the value 'tracemalloc', Python's memory allocations are traced in
+addition, and the code locations with the largest allocations at the time
+of the highest traced memory use are reported too. Tracing allocations
+slows down the execution considerably.
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+
+import logging
+lgr = logging.getLogger('datalad.support.memprofile')
+
+# set while a command is profiled, to not profile commands called by it
+_profiling = False
+_rss_reader = None
+
+
+def _get_rss_reader():
+    """Return a function reporting the current RSS in bytes, or None"""
+    try:
+        from psutil import Process
+        memory_info = Process(os.getpid()).memory_info
+        return lambda: memory_info().rss
+    except ImportError:
+        pass
+    statm = '/proc/{}/statm'.format(os.getpid())
+    if os.path.exists(statm):
+        pagesize = os.sysconf('SC_PAGE_SIZE')
+
+        def _read_statm():
+            with open(statm) as f:
+                return int(f.read().split()[1]) * pagesize
+        return _read_statm
+    return None
+
+
+def get_rss():
+    """Return the current resident set size of the process in bytes
+
+    Returns
+    -------
+    int or None
+      None, if the RSS cannot be determined on this system (psutil is
+      not installed, and no procfs is available).
+    """
+    global _rss_reader
+    if _rss_reader is None:
+        _rss_reader = _get_rss_reader() or (lambda: None)
+    return _rss_reader()
+
+
+def _format_size(nbytes):
+    if nbytes is None:
+        return 'N/A'
+    if nbytes < 1048576:
+        return '{:.1f} kB'.format(nbytes / 1024)
+    return '{:.1f} MB'.format(nbytes / 1048576)
+
+
+class MemoryProfiler(object):
+    """Samples the RSS of the process, and optionally traces allocations
+
+    Parameters
+    ----------
+    interval : float, optional
+      Seconds between two RSS samples.
+    trace_allocations : bool, optional
+      Whether to trace allocations with `tracemalloc`.
+
+    Attributes
+    ----------
+    start_rss, end_rss, peak_rss : int or None
+      In bytes.
+    label_peaks : dict
+      Maps labels given to `checkpoint()` to the peak RSS observed since
+      the respective previous checkpoint.
+    """
+    def __init__(self, interval=0.01, trace_allocations=False):
+        self.interval = interval
+        self.trace_allocations = trace_allocations
+        self.start_rss = self.end_rss = self.peak_rss = None
+        self.label_peaks = {}
+        self.ncheckpoints = 0
+        self._checkpoint_peak = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_tracing = False
+        self._traced_peak = 0
+        self._snapshot = None
+
+    def start(self):
+        self.start_rss = self._sample()
+        if self.start_rss is None:
+            lgr.warning(
+                "Cannot determine memory use on this system, "
+                "install psutil to enable it")
+        else:
+            self._thread = threading.Thread(
+                target=self._run, name='MemoryProfiler', daemon=True)
+            self._thread.start()
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = get_rss()
+        if rss is None:
+            return None
+        with self._lock:
+            if self.peak_rss is None or rss > self.peak_rss:
+                self.peak_rss = rss
+            if self._checkpoint_peak is None or rss > self._checkpoint_peak:
+                self._checkpoint_peak = rss
+        return rss
+
+    def checkpoint(self, label):
+        """Attribute the peak RSS since the previous checkpoint to a label"""
+        rss = self._sample()
+        with self._lock:
+            peak = self._checkpoint_peak
+            # the next interval starts at the current level
+            self._checkpoint_peak = rss
+            self.ncheckpoints += 1
+            if label is not None and peak is not None and \
+                    peak > self.label_peaks.get(label, 0):
+                self.label_peaks[label] = peak
+        if self._started_tracing:
+            self._snapshot_at_peak()
+
+    def _snapshot_at_peak(self):
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        # snapshots are expensive, only take one if the peak grew
+        # considerably
+        if traced_peak > self._traced_peak * 1.1:
+            self._snapshot = tracemalloc.take_snapshot()
+            self._traced_peak = traced_peak
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.end_rss = self._sample()
+        if self._started_tracing:
+            self._snapshot_at_peak()
+            tracemalloc.stop()
+
+    def get_top_allocations(self, n=10):
+        """Return the code locations with the largest allocations
+
+        Returns
+        -------
+        list
+          tracemalloc.Statistic instances, for the allocations at the
+          time of the highest traced memory use. Empty if allocations
+          were not traced.
+        """
+        if self._snapshot is None:
+            return []
+        snapshot = self._snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+        return snapshot.statistics('lineno')[:n]
+
+    def write_report(self, out, title='', n=10):
+        """Write a summary of the memory use
+
+        Parameters
+        ----------
+        out : file-like
+        title : str, optional
+          Label of what was profiled, e.g. the name of a command.
+        n : int, optional
+          Maximum number of datasets and allocations to list.
+        """
+        out.write('Memory use{}: peak RSS {} (start {}, end {})\n'.format(
+            ' during {}'.format(title) if title else '',
+            _format_size(self.peak_rss),
+            _format_size(self.start_rss),
+            _format_size(self.end_rss)))
+        if self.label_peaks:
+            out.write('Peak RSS per dataset ({} results):\n'.format(
+                self.ncheckpoints))
+            peaks = sorted(self.label_peaks.items(), key=lambda i: -i[1])
+            for label, peak in peaks[:n]:
+                out.write('  {:>10}  {}\n'.format(_format_size(peak), label))
+            if len(peaks) > n:
+                out.write('  ... and {} more\n'.format(len(peaks) - n))
+        top = self.get_top_allocations(n)
+        if top:
+            out.write('Largest allocations at peak of traced memory {}:\n'
+                      .format(_format_size(self._traced_peak)))
+            for stat in top:
+                frame = stat.traceback[0]
+                out.write('  {:>10} {:>8} blocks  {}:{}\n'.format(
+                    _format_size(stat.size), stat.count,
+                    frame.filename, frame.lineno))
+
+
+def _get_result_label(res):
+    """Return the path of the dataset a result belongs to"""
+    if res.get('type') == 'dataset' and 'parentds' not in res:
+        return res.get('path', None)
+    return res.get('parentds', None) or res.get('refds', None)
+
+
+def profile_results(results, name, cfg):
+    """Profile the memory use while results are generated
+
+    Parameters
+    ----------
+    results : iterable
+      Results of a DataLad command.
+    name : str
+      Label of the command in the report.
+    cfg : ConfigManager
+      Configuration to query whether profiling is enabled.
+
+    Returns
+    -------
+    iterable
+      `results` itself, if profiling is disabled, or if the memory use of
+      another command is already profiled.
+    """
+    mode = cfg.get('datalad.runtime.profile-memory', None)
+    if not mode or _profiling:
+        return results
+    return _profile_results(results, name, mode == 'tracemalloc')
+
+
+def _profile_results(results, name, trace_allocations):
+    global _profiling
+    _profiling = True
+    profiler = MemoryProfiler(trace_allocations=trace_allocations)
+    profiler.start()
+    try:
+        for res in results:
+            profiler.checkpoint(_get_result_label(res))
+            yield res
+    finally:
+        profiler.stop()
+        _profiling = False
+        profiler.write_report(sys.stderr, title=name)
@@ -13,6 +13,7 @@
 __docformat__ = 'restructuredtext'
 
 import concurrent.futures
+import contextvars
 import inspect
 import sys
 import time
@@ -26,6 +27,7 @@ from . import ansi_colors as colors
 from ..dochelpers import exc_str
 from ..log import log_progress
 from ..utils import path_is_subpath
+from .tracing import trace_span
 
 import logging
 lgr = logging.getLogger('datalad.parallel')
@@ -289,13 +291,20 @@ class ProducerConsumer:
                 yield producer_queue.get()
 
         for args in produce():
-            res = self.consumer(args)
-            if inspect.isgenerator(res):
-                lgr.debug("Got consumer worker which returned a generator %s", res)
-                yield from res
-            else:
-                lgr.debug("Got straight result %s, not a generator", res)
-                yield res
+            with self._trace_job(args):
+                res = self.consumer(args)
+                if inspect.isgenerator(res):
+                    lgr.debug("Got consumer worker which returned a generator %s", res)
+                    yield from res
+                else:
+                    lgr.debug("Got straight result %s, not a generator", res)
+                    yield res
+
+    def _trace_job(self, args):
+        """Return a context manager to trace the execution of a job"""
+        return trace_span(
+            getattr(self.consumer, '__name__', str(self.consumer)), 'job',
+            args=args)
 
     @property
     def _producer_iter(self):
@@ -329,21 +338,25 @@ class ProducerConsumer:
         def consumer_worker(callable, *args, **kwargs):
             """Since jobs could return a generator and we cannot really "inspect" for that
             """
-            res = callable(*args, **kwargs)
-            if inspect.isgenerator(res):
-                lgr.debug("Got consumer worker which returned a generator %s", res)
-                didgood = False
-                for r in res:
-                    didgood = True
-                    lgr.debug("Adding %s to queue", r)
-                    consumer_queue.put(r)
-                if not didgood:
-                    lgr.error("Nothing was obtained from %s :-(", res)
-            else:
-                lgr.debug("Got straight result %s, not a generator", res)
-                consumer_queue.put(res)
-
-        self._producer_thread = Thread(target=producer_worker)
+            with self._trace_job(args[0] if len(args) == 1 else args):
+                res = callable(*args, **kwargs)
+                if inspect.isgenerator(res):
+                    lgr.debug("Got consumer worker which returned a generator %s", res)
+                    didgood = False
+                    for r in res:
+                        didgood = True
+                        lgr.debug("Adding %s to queue", r)
+                        consumer_queue.put(r)
+                    if not didgood:
+                        lgr.error("Nothing was obtained from %s :-(", res)
+                else:
+                    lgr.debug("Got straight result %s, not a generator", res)
+                    consumer_queue.put(res)
+
+        # run producer and consumers in the context of the caller, e.g. to
+        # account for the git calls they make (see callaccounting)
+        self._producer_thread = Thread(
+            target=contextvars.copy_context().run, args=(producer_worker,))
         self._producer_thread.start()
         self._futures = futures = {}
 
@@ -392,7 +405,9 @@ class ProducerConsumer:
                             # args for the job
                             assert job_key not in futures
                             lgr.debug("Submitting worker future for %s", job_args)
-                            futures[job_key] = executor.submit(consumer_worker, self.consumer, job_args)
+                            futures[job_key] = executor.submit(
+                                contextvars.copy_context().run,
+                                consumer_worker, self.consumer, job_args)
                         except Empty:
                             pass
 
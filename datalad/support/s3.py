@@ -17,6 +17,7 @@ __docformat__ = 'restructuredtext'
 
 import mimetypes
 
+from collections import defaultdict
 from os.path import splitext
 import re
 
@@ -419,6 +420,100 @@ def add_version_to_url(url, version, replace=False):
     return URL(**dict(url.fields, query=query)).as_str()
 
 
+def _get_s3_bucket_and_path(url_rec):
+    """Return the name of the S3 bucket a URL points to, and the key path
+
+    Parameters
+    ----------
+    url_rec : URL
+
+    Returns
+    -------
+    tuple
+      (bucket name or None, key path)
+    """
+    s3_bucket, fpath = None, url_rec.path.lstrip('/')
+    if url_rec.hostname.endswith('.s3.amazonaws.com'):
+        if url_rec.scheme not in ('http', 'https'):
+            raise ValueError("Do not know how to handle %s scheme" % url_rec.scheme)
+        # bucket name could have . in it, e.g. openneuro.org
+        s3_bucket = url_rec.hostname[:-len('.s3.amazonaws.com')]
+    elif url_rec.hostname == 's3.amazonaws.com':
+        if url_rec.scheme not in ('http', 'https'):
+            raise ValueError("Do not know how to handle %s scheme" % url_rec.scheme)
+        # url is s3.amazonaws.com/bucket/PATH
+        s3_bucket, fpath = fpath.split('/', 1)
+    elif url_rec.scheme == 's3':
+        s3_bucket = url_rec.hostname  # must be
+        if not (url_rec.query and 'versionId=' in url_rec.query):
+            # and for now implement magical conversion to URL
+            # TODO: wouldn't work if needs special permissions etc
+            # actually for now
+            raise NotImplementedError
+    return s3_bucket, fpath
+
+
+def _get_bucket(s3_bucket, s3conn=None, providers=None):
+    """Return a bucket, connecting via a matching provider unless `s3conn`"""
+    if s3conn is not None:
+        return s3conn.get_bucket(s3_bucket)
+    # we need to reuse our providers
+    if providers is None:
+        from ..downloaders.providers import Providers
+        providers = Providers.from_config_files()
+    s3url = "s3://%s/" % s3_bucket
+    s3provider = providers.get_provider(s3url)
+    authenticator = s3provider.authenticator
+    if not authenticator:
+        # We will use anonymous one
+        from ..downloaders.s3 import S3Authenticator
+        authenticator = S3Authenticator()
+    if authenticator.bucket is not None and authenticator.bucket.name == s3_bucket:
+        # we have established connection before, so let's just reuse
+        return authenticator.bucket
+    return authenticator.authenticate(s3_bucket, s3provider.credential)  # s3conn or _get_bucket_connection(S3_TEST_CREDENTIAL)
+
+
+def _get_versioning_status(bucket):
+    try:
+        return bucket.get_versioning_status()  # TODO cache
+    except S3ResponseError as e:
+        # might be forbidden, i.e. "403 Forbidden" so we try then anyways
+        return 'maybe'
+
+
+def _sort_versions(versions, fpath):
+    """Return versions of `fpath`, newest first"""
+    # Filter and sort them so the newest one on top
+    return [x for x in sorted(versions, key=lambda x: (x.last_modified, x.is_latest))
+            if ((x.name == fpath)  # match exact name, not just prefix
+                )
+            ][::-1]
+
+
+def _get_latest_key(versions, fpath):
+    """Return the newest version of `fpath` that is not a delete marker"""
+    return next(
+        (x for x in _sort_versions(versions, fpath) if isinstance(x, Key)),
+        None)
+
+
+def _list_versions(bucket, fpath):
+    """Return versions of `fpath`, from a listing snapshot if possible
+
+    Like `bucket.list_versions(fpath)`, but a snapshot only reports versions
+    of exactly `fpath`.
+    """
+    from .s3listing import get_bucket_snapshot
+    snapshot = get_bucket_snapshot(bucket.name)
+    if snapshot:
+        versions = snapshot.get_versions(fpath, bucket=bucket)
+        if versions is not None:
+            lgr.debug("Using versions of %s from %s", fpath, snapshot)
+            return versions
+    return bucket.list_versions(fpath)
+
+
 def get_versioned_url(url, guarantee_versioned=False, return_all=False, verify=False,
                       s3conn=None, update=False):
     """Given a url return a versioned URL
@@ -449,67 +544,23 @@ def get_versioned_url(url, guarantee_versioned=False, return_all=False, verify=F
     """
     url_rec = URL(url)
 
-    s3_bucket, fpath = None, url_rec.path.lstrip('/')
-
     was_versioned = False
     all_versions = []
 
-    if url_rec.hostname.endswith('.s3.amazonaws.com'):
-        if url_rec.scheme not in ('http', 'https'):
-            raise ValueError("Do not know how to handle %s scheme" % url_rec.scheme)
-        # bucket name could have . in it, e.g. openneuro.org
-        s3_bucket = url_rec.hostname[:-len('.s3.amazonaws.com')]
-    elif url_rec.hostname == 's3.amazonaws.com':
-        if url_rec.scheme not in ('http', 'https'):
-            raise ValueError("Do not know how to handle %s scheme" % url_rec.scheme)
-        # url is s3.amazonaws.com/bucket/PATH
-        s3_bucket, fpath = fpath.split('/', 1)
-    elif url_rec.scheme == 's3':
-        s3_bucket = url_rec.hostname  # must be
-        if url_rec.query and 'versionId=' in url_rec.query:
-            was_versioned = True
-            all_versions.append(url)
-        else:
-            # and for now implement magical conversion to URL
-            # TODO: wouldn't work if needs special permissions etc
-            # actually for now
-            raise NotImplementedError
+    s3_bucket, fpath = _get_s3_bucket_and_path(url_rec)
+    if url_rec.scheme == 's3':
+        # only versioned s3:// URLs make it here
+        was_versioned = True
+        all_versions.append(url)
 
     if s3_bucket:
         # TODO: cache
-        if s3conn is None:
-            # we need to reuse our providers
-            from ..downloaders.providers import Providers
-            providers = Providers.from_config_files()
-            s3url = "s3://%s/" % s3_bucket
-            s3provider = providers.get_provider(s3url)
-            authenticator = s3provider.authenticator
-            if not authenticator:
-                # We will use anonymous one
-                from ..downloaders.s3 import S3Authenticator
-                authenticator = S3Authenticator()
-            if authenticator.bucket is not None and authenticator.bucket.name == s3_bucket:
-                # we have established connection before, so let's just reuse
-                bucket = authenticator.bucket
-            else:
-                bucket = authenticator.authenticate(s3_bucket, s3provider.credential)  # s3conn or _get_bucket_connection(S3_TEST_CREDENTIAL)
-        else:
-            bucket = s3conn.get_bucket(s3_bucket)
+        bucket = _get_bucket(s3_bucket, s3conn)
 
-        supports_versioning = True  # assume that it does
-        try:
-            supports_versioning = bucket.get_versioning_status()  # TODO cache
-        except S3ResponseError as e:
-            # might be forbidden, i.e. "403 Forbidden" so we try then anyways
-            supports_versioning = 'maybe'
+        supports_versioning = _get_versioning_status(bucket)
 
         if supports_versioning:
-            all_keys = bucket.list_versions(fpath)
-            # Filter and sort them so the newest one on top
-            all_keys = [x for x in sorted(all_keys, key=lambda x: (x.last_modified, x.is_latest))
-                        if ((x.name == fpath)  # match exact name, not just prefix
-                            )
-                        ][::-1]
+            all_keys = _sort_versions(_list_versions(bucket, fpath), fpath)
             # our current assumptions
             assert(all_keys[0].is_latest)
             # and now filter out delete markers etc
@@ -541,6 +592,136 @@ def get_versioned_url(url, guarantee_versioned=False, return_all=False, verify=F
         return all_versions[0]
 
 
+def _get_latest_version_ids(bucket, fpaths, jobs=None, prefix_min_keys=10):
+    """Return the latest version IDs of keys in a bucket
+
+    Versions of keys in a "directory" with at least `prefix_min_keys` of the
+    requested keys are determined by a single (paginated) listing of all
+    versions in that directory. All other keys are looked up individually,
+    with `jobs` requests in parallel.
+
+    Returns
+    -------
+    dict
+      Maps key paths to version IDs. Keys without any version are not
+      reported.
+    """
+    from .parallel import ProducerConsumer
+    from .s3listing import get_bucket_snapshot
+
+    by_dir = defaultdict(list)
+    for fpath in fpaths:
+        by_dir[fpath.rpartition('/')[0]].append(fpath)
+
+    snapshot = get_bucket_snapshot(bucket.name)
+    version_ids = {}
+    single = []
+    for dpath, dfpaths in by_dir.items():
+        if len(dfpaths) < prefix_min_keys or (
+                snapshot and snapshot.get_listing(dpath + '/' if dpath else '')):
+            # no need to list a directory already covered by a snapshot
+            single.extend(dfpaths)
+            continue
+        wanted = set(dfpaths)
+        versions = defaultdict(list)
+        lgr.debug("Listing versions of %d keys under '%s/' in %s",
+                  len(wanted), dpath, bucket.name)
+        # delimiter, to not descend into any subdirectory
+        for v in bucket.list_versions(
+                prefix=dpath + '/' if dpath else '', delimiter='/'):
+            if v.name in wanted:
+                versions[v.name].append(v)
+        for fpath, fversions in versions.items():
+            key = _get_latest_key(fversions, fpath)
+            if key:
+                version_ids[fpath] = key.version_id
+
+    def get_version_id(fpath):
+        key = _get_latest_key(_list_versions(bucket, fpath), fpath)
+        return fpath, key.version_id if key else None
+
+    for fpath, version_id in ProducerConsumer(
+            single, get_version_id, jobs=jobs):
+        if version_id:
+            version_ids[fpath] = version_id
+    return version_ids
+
+
+def get_versioned_urls(urls, s3conn=None, jobs=None, prefix_min_keys=10):
+    """Given many URLs return versioned URLs
+
+    Like `get_versioned_url()` with its default arguments, but optimized for
+    many URLs. For each bucket, a connection is established and its
+    versioning support is determined only once. Versions are listed per
+    "directory" of keys where many keys of the same directory are requested
+    (see `prefix_min_keys`), and with `jobs` parallel requests otherwise.
+    URLs that already have a version ID are returned as is.
+
+    Parameters
+    ----------
+    urls : iterable of str
+    s3conn : optional
+      Connection to use for all buckets, instead of the ones established
+      via matching providers.
+    jobs : int or None or "auto", optional
+      Number of parallel requests for individually looked up keys.
+    prefix_min_keys : int, optional
+      Minimum number of requested keys in a directory to list all versions
+      in that directory instead of looking up the keys individually.
+
+    Returns
+    -------
+    dict
+      Maps each URL to its versioned URL, or to the exception (ValueError or
+      NotImplementedError) that prevented versioning it.
+    """
+    versioned = {}
+    # bucket name -> key path -> [(url, URL record)]
+    by_bucket = defaultdict(lambda: defaultdict(list))
+    for url in urls:
+        if url in versioned:
+            continue
+        url_rec = URL(url)
+        try:
+            s3_bucket, fpath = _get_s3_bucket_and_path(url_rec)
+        except (ValueError, NotImplementedError) as exc:
+            versioned[url] = exc
+            continue
+        if url_rec.scheme == 's3':
+            # only versioned s3:// URLs make it here
+            versioned[url] = url
+        elif not s3_bucket or (url_rec.query and 'versionId=' in url_rec.query):
+            versioned[url] = url_rec.as_str()
+        else:
+            by_bucket[s3_bucket][fpath].append((url, url_rec))
+
+    providers = None
+    if by_bucket and s3conn is None:
+        from ..downloaders.providers import Providers
+        providers = Providers.from_config_files()
+    for s3_bucket, keys in by_bucket.items():
+        bucket = _get_bucket(s3_bucket, s3conn, providers)
+        if _get_versioning_status(bucket):
+            lgr.debug("Determining versions of %d keys in %s",
+                      len(keys), s3_bucket)
+            version_ids = _get_latest_version_ids(
+                bucket, list(keys), jobs=jobs, prefix_min_keys=prefix_min_keys)
+        else:
+            version_ids = None
+        for fpath, recs in keys.items():
+            for url, url_rec in recs:
+                if version_ids is None:
+                    versioned[url] = url_rec.as_str()
+                elif fpath in version_ids:
+                    versioned[url] = add_version_to_url(
+                        url_rec, version_ids[fpath])
+                else:
+                    versioned[url] = ValueError(
+                        "No version of %s found in bucket %s"
+                        % (fpath, s3_bucket))
+    return versioned
+
+
 if __name__ == '__main__':
     import sys
     lgr.setLevel(logging.INFO)
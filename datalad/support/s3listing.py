@@ -0,0 +1,310 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Local snapshots of S3 bucket listings
+
+A snapshot records (key, version, size, etag, mtime) of all objects under a
+prefix of a bucket, as obtained by a (paginated) listing. Key status and
+version queries can then be answered without a request per key, for as long
+as the listing is younger than 'datalad.s3.listing-cache-ttl' seconds.
+"""
+
+import logging
+import os.path as op
+import sqlite3
+import threading
+import time
+
+from datalad import cfg
+from datalad.utils import ensure_dir
+
+lgr = logging.getLogger('datalad.s3.listing')
+
+# number of records inserted at once, which is the page size of S3 listings
+_INSERT_CHUNK_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT NOT NULL,
+    version_id TEXT,
+    is_latest INTEGER,
+    deleted INTEGER,
+    size INTEGER,
+    etag TEXT,
+    last_modified TEXT);
+CREATE INDEX IF NOT EXISTS versions_name ON versions (name);
+CREATE TABLE IF NOT EXISTS listings (
+    prefix TEXT PRIMARY KEY,
+    versioned INTEGER,
+    timestamp REAL);
+"""
+
+_FIELDS = ('name', 'version_id', 'is_latest', 'deleted', 'size', 'etag',
+           'last_modified')
+
+# snapshots by bucket, cache location and TTL, to reuse their connection
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+class S3BucketSnapshot(object):
+    """Snapshot of the listing of a bucket, stored in an sqlite database
+
+    Parameters
+    ----------
+    bucket_name : str
+    path : str, optional
+      Location of the database. By default, a file named after the bucket
+      in the 's3listing' directory of 'datalad.locations.cache'.
+    ttl : float, optional
+      Age in seconds after which a listing is no longer used. By default,
+      'datalad.s3.listing-cache-ttl'.
+    """
+
+    def __init__(self, bucket_name, path=None, ttl=None):
+        self.bucket_name = bucket_name
+        if path is None:
+            path = op.join(cfg.obtain('datalad.locations.cache'),
+                           's3listing', bucket_name + '.sqlite')
+        self.path = path
+        self.ttl = cfg.obtain('datalad.s3.listing-cache-ttl') \
+            if ttl is None else ttl
+        # connection for queries, shared by all threads
+        self._conn = None
+        self._lock = threading.Lock()
+        self._schema_created = False
+
+    def _connect(self):
+        ensure_dir(op.dirname(self.path))
+        conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        if not self._schema_created:
+            conn.executescript(_SCHEMA)
+            self._schema_created = True
+        return conn
+
+    def _query(self, sql, params):
+        """Return all rows of a query, via the shared connection"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def record(self, entries, prefix='', versioned=True):
+        """Record a listing of `prefix` while passing its entries through
+
+        The listing replaces any previously recorded one of `prefix` only
+        once `entries` are exhausted, so that a partially consumed listing
+        is never used.
+
+        Parameters
+        ----------
+        entries : iterable
+          boto Key and DeleteMarker instances, as yielded by
+          `bucket.list_versions(prefix)` or `bucket.list(prefix)`. Any other
+          entries (e.g. Prefix) are passed through but not recorded.
+        prefix : str, optional
+        versioned : bool, optional
+          Whether `entries` come from a listing of versions.
+
+        Returns
+        -------
+        generator
+          `entries`
+        """
+        # A dedicated connection, the shared one must not see the
+        # listing before it is complete.
+        conn = self._connect()
+        try:
+            # everything in a single transaction
+            with conn:
+                upper = _get_prefix_upper_bound(prefix)
+                if upper is None:
+                    conn.execute(
+                        "DELETE FROM versions WHERE name >= ?", (prefix,))
+                else:
+                    # a range on the indexed column
+                    conn.execute(
+                        "DELETE FROM versions WHERE name >= ? AND name < ?",
+                        (prefix, upper))
+                chunk = []
+                for entry in entries:
+                    rec = _entry_to_record(entry, versioned)
+                    if rec is not None:
+                        chunk.append(rec)
+                        if len(chunk) >= _INSERT_CHUNK_SIZE:
+                            self._insert(conn, chunk)
+                            chunk = []
+                    yield entry
+                self._insert(conn, chunk)
+                conn.execute(
+                    "INSERT OR REPLACE INTO listings VALUES (?, ?, ?)",
+                    (prefix, int(versioned), time.time()))
+            lgr.debug("Recorded listing of '%s' in %s", prefix, self)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert(conn, recs):
+        conn.executemany(
+            "INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?, ?)", recs)
+
+    def update(self, bucket, prefix=''):
+        """(Re)list all versions of keys under `prefix` in `bucket`
+
+        If versions cannot be listed, e.g. due to permissions, just keys are
+        listed.
+        """
+        try:
+            for _ in self.record(bucket.list_versions(prefix), prefix):
+                pass
+        except Exception as exc:
+            lgr.debug("Failed to list versions in %s, listing keys: %s",
+                      bucket.name, exc)
+            for _ in self.record(bucket.list(prefix), prefix,
+                                 versioned=False):
+                pass
+
+    def get_listing(self, name):
+        """Return the fresh listing that covers a key
+
+        Returns
+        -------
+        dict or None
+          With 'prefix', 'versioned', and 'timestamp' of the listing, or None
+          if there is no listing younger than the TTL.
+        """
+        if not self.ttl or self.ttl <= 0 or not op.exists(self.path):
+            return None
+        rows = self._query(
+            "SELECT prefix, versioned, timestamp FROM listings "
+            "WHERE substr(?, 1, length(prefix)) = prefix "
+            "AND timestamp >= ? "
+            "ORDER BY timestamp DESC LIMIT 1",
+            (name, time.time() - self.ttl))
+        if not rows:
+            return None
+        return dict(zip(('prefix', 'versioned', 'timestamp'), rows[0]))
+
+    def get_versions(self, name, bucket=None):
+        """Return recorded versions of a key
+
+        Parameters
+        ----------
+        name : str
+        bucket : optional
+          Bucket to associate the returned objects with.
+
+        Returns
+        -------
+        list or None
+          boto Key and DeleteMarker instances, like those of
+          `bucket.list_versions(name)` (but only for exactly `name`), or None
+          if no fresh listing covers `name`.
+        """
+        if self.get_listing(name) is None:
+            return None
+        return self._get_versions(name, bucket)
+
+    def _get_versions(self, name, bucket):
+        rows = self._query(
+            "SELECT %s FROM versions WHERE name = ?" % ', '.join(_FIELDS),
+            (name,))
+        return [_record_to_entry(dict(zip(_FIELDS, row)), bucket)
+                for row in rows]
+
+    def get_key(self, name, version_id=None, bucket=None):
+        """Return a key as recorded in a fresh listing
+
+        Returns
+        -------
+        Key or None or False
+          None, if the (version of the) key does not exist according to the
+          listing. False, if no fresh listing can tell.
+        """
+        listing = self.get_listing(name)
+        if listing is None or (version_id and not listing['versioned']):
+            return False
+        from boto.s3.key import Key
+        for entry in self._get_versions(name, bucket):
+            if version_id:
+                if entry.version_id == version_id:
+                    return entry if isinstance(entry, Key) else None
+            elif entry.is_latest:
+                return entry if isinstance(entry, Key) else None
+        return None
+
+    def __str__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.bucket_name)
+
+
+def _get_prefix_upper_bound(prefix):
+    """Return the smallest string greater than all strings with `prefix`
+
+    Returns
+    -------
+    str or None
+      None, if there is no such string (e.g. for an empty prefix).
+    """
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _entry_to_record(entry, versioned):
+    from boto.s3.key import Key
+    from boto.s3.deletemarker import DeleteMarker
+    if isinstance(entry, Key):
+        return (entry.name, entry.version_id,
+                # without versions, each key is the latest
+                int(entry.is_latest or not versioned), 0,
+                entry.size, entry.etag, entry.last_modified)
+    elif isinstance(entry, DeleteMarker):
+        return (entry.name, entry.version_id, int(entry.is_latest), 1,
+                None, None, entry.last_modified)
+    return None
+
+
+def _record_to_entry(rec, bucket=None):
+    from boto.s3.key import Key
+    from boto.s3.deletemarker import DeleteMarker
+    if rec['deleted']:
+        entry = DeleteMarker(bucket=bucket, name=rec['name'])
+    else:
+        entry = Key(bucket=bucket, name=rec['name'])
+        entry.size = rec['size']
+        entry.etag = rec['etag']
+    entry.version_id = rec['version_id']
+    entry.is_latest = bool(rec['is_latest'])
+    entry.last_modified = rec['last_modified']
+    return entry
+
+
+def get_bucket_snapshot(bucket_name):
+    """Return the listing snapshot of a bucket, if snapshots are enabled
+
+    Returns
+    -------
+    S3BucketSnapshot or None
+      None, unless 'datalad.s3.listing-cache-ttl' is positive.
+    """
+    ttl = cfg.obtain('datalad.s3.listing-cache-ttl')
+    if not ttl or ttl <= 0:
+        return None
+    key = (bucket_name, cfg.obtain('datalad.locations.cache'), ttl)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = _snapshots[key] = S3BucketSnapshot(bucket_name, ttl=ttl)
+    return snapshot
@@ -2003,7 +2003,7 @@ def test_AnnexRepo_metadata(path):
     eq_(['best'], dict(ar.get_metadata(playfile))[playfile]['novel'])
 
 
-@with_tree(tree={'file.txt': 'content'})
+@with_tree(tree={'file.txt': 'content', 'other.txt': 'other'})
 @serve_path_via_http()
 @with_tempfile
 def test_AnnexRepo_addurl_batched_and_set_metadata(path, url, dest):
@@ -2012,6 +2012,20 @@ def test_AnnexRepo_addurl_batched_and_set_metadata(path, url, dest):
     ar.add_url_to_file(fname, urljoin(url, fname), batch=True)
     ar.set_metadata(fname, init={"number": "one"})
     eq_(["one"], dict(ar.get_metadata(fname))[fname]["number"])
+    # batched metadata writer right after a batched addurl
+    ar.add_url_to_file("other.txt", urljoin(url, "other.txt"), batch=True)
+    res = list(ar.set_metadata_batched(
+        [(fname, {"number": "two", "tag": ["a", "b"]}),
+         ("other.txt", {"number": 3}),
+         ("nothere", {"number": "four"})]))
+    eq_([r["success"] for r in res], [True, True, False])
+    eq_(res[2]["file"], "nothere")
+    deq_({fname: {"number": ["two"], "tag": ["a", "b"]},
+          "other.txt": {"number": ["3"]}},
+         dict(ar.get_metadata([fname, "other.txt"])))
+    # add to existing values
+    list(ar.set_metadata_batched([(fname, {"number": "one"})], add=True))
+    eq_(["one", "two"], dict(ar.get_metadata(fname))[fname]["number"])
 
 
 @with_tempfile(mkdir=True)
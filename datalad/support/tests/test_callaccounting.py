@@ -0,0 +1,147 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for accounting of git calls"""
+
+import sys
+from io import StringIO
+
+from datalad import cfg as dlcfg
+from ..callaccounting import (
+    CallAccounting,
+    _accounting,
+    account_calls,
+    account_generator_function,
+    get_call_accounting,
+)
+from ..gitrepo import GitRepo
+from ..parallel import ProducerConsumer
+from ...cmd import (
+    BatchedCommand,
+    WitlessRunner,
+)
+from ...tests.utils import (
+    assert_in,
+    assert_not_in,
+    eq_,
+    ok_,
+    patch_config,
+    with_tempfile,
+)
+from ...utils import swallow_outputs
+
+
+def test_call_accounting():
+    executed = []
+
+    def call(value):
+        def _call():
+            executed.append(value)
+            return value
+        return _call
+
+    acc = CallAccounting(memoize=True)
+    eq_(acc.call('/r', ('git', 'a'), True, call(1)), 1)
+    # memoized
+    eq_(acc.call('/r', ('git', 'a'), True, call(2)), 1)
+    # other repository
+    eq_(acc.call('/s', ('git', 'a'), True, call(3)), 3)
+    # a write invalidates everything
+    eq_(acc.call('/s', ('git', 'b'), False, call(4)), 4)
+    eq_(acc.call('/r', ('git', 'a'), True, call(5)), 5)
+    eq_(executed, [1, 3, 4, 5])
+    eq_(acc.get_repeated_calls()[0][:4], ('/r', ('git', 'a'), 3, 1))
+    eq_(len(acc.get_repeated_calls()), 1)
+
+    out = StringIO()
+    acc.write_report(out, title='Test')
+    report = out.getvalue()
+    assert_in('git calls during Test: 5 in total, 2 repeated identical '
+              'calls, 1 served from memory', report)
+    assert_in('git a [/r]', report)
+    assert_not_in('/s', report)
+
+    # without memoization, calls are only counted
+    acc = CallAccounting()
+    eq_(acc.call('/r', ('git', 'a'), True, call(6)), 6)
+    eq_(acc.call('/r', ('git', 'a'), True, call(7)), 7)
+    eq_(acc.get_repeated_calls()[0][2:4], (2, 0))
+
+
+@with_tempfile(mkdir=True)
+def test_repo_call_accounting(path):
+    repo = GitRepo(path, create=True)
+    repo.commit('empty', options=['--allow-empty'])
+    cmd = ['rev-parse', 'HEAD']
+    with account_calls(memoize=True) as acc:
+        # nested accounting is shared
+        with account_calls() as nested:
+            ok_(nested is acc)
+        hexsha = repo.call_git_oneline(cmd, read_only=True)
+        eq_(repo.call_git_oneline(cmd, read_only=True), hexsha)
+        key = (repo.path, ('git', 'rev-parse', 'HEAD'))
+        eq_(acc.calls[key][:2], [2, 1])
+        # any other command invalidates
+        WitlessRunner(cwd=path).run([sys.executable, '-c', ''])
+        repo.call_git_oneline(cmd, read_only=True)
+        eq_(acc.calls[key][:2], [3, 1])
+        repo.call_git_oneline(cmd, read_only=True)
+        eq_(acc.calls[key][:2], [4, 2])
+        # so does a git call that is not read-only
+        repo.commit('empty', options=['--allow-empty'])
+        ok_(repo.call_git_oneline(cmd, read_only=True) != hexsha)
+        eq_(acc.calls[key][:2], [5, 2])
+    eq_(get_call_accounting(), None)
+
+
+def test_account_generator_function():
+    def gen():
+        yield get_call_accounting()
+        # accounting is propagated into threads
+        yield from ProducerConsumer([1], lambda i: get_call_accounting())
+        yield get_call_accounting()
+
+    ok_(account_generator_function(gen, 'gen', dlcfg) is gen)
+    with patch_config({'datalad.runtime.memoize-git-calls': True}):
+        res = list(account_generator_function(gen, 'gen', dlcfg)())
+    ok_(res[0].memoize)
+    ok_(res[0] is res[1] is res[2])
+    eq_(get_call_accounting(), None)
+
+    # accounting is only active while the generator executes
+    with patch_config({'datalad.runtime.report-git-calls': True}), \
+            swallow_outputs() as cmo:
+        accounted = account_generator_function(gen, 'gen', dlcfg)()
+        ok_(next(accounted) is not None)
+        eq_(get_call_accounting(), None)
+        eq_(cmo.err, '')
+        # report is written when the generator is closed
+        accounted.close()
+        assert_in('git calls during gen', cmo.err)
+
+
+def test_batched_command_invalidates():
+    acc = CallAccounting(memoize=True)
+    acc.call('/r', ('git', 'a'), True, lambda: 1)
+    bc = BatchedCommand([sys.executable, '-c',
+                         'import sys; [print(l, end="", flush=True) '
+                         'for l in sys.stdin]'])
+    try:
+        with account_calls() as active:
+            ok_(active is not acc)
+            eq_(bc('x'), 'x')
+        # inactive accounting is not affected
+        eq_(acc.call('/r', ('git', 'a'), True, lambda: 2), 1)
+        token = _accounting.set(acc)
+        try:
+            eq_(bc('y'), 'y')
+        finally:
+            _accounting.reset(token)
+        eq_(acc.call('/r', ('git', 'a'), True, lambda: 3), 3)
+    finally:
+        bc.close()
@@ -0,0 +1,75 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for entry point discovery"""
+
+import os.path as op
+from unittest.mock import patch
+
+from .. import entrypoints
+from ..entrypoints import (
+    EntryPoint,
+    iter_entry_points,
+)
+from ...metadata.extractors.base import BaseMetadataExtractor
+from ...tests.utils import (
+    assert_in,
+    eq_,
+    ok_,
+    patch_config,
+    with_tempfile,
+)
+
+
+def test_entrypoint_load():
+    ep = EntryPoint(
+        'base', 'datalad.test',
+        'datalad.metadata.extractors.base:BaseMetadataExtractor')
+    eq_(ep.module_name, 'datalad.metadata.extractors.base')
+    ok_(ep.load() is BaseMetadataExtractor)
+    eq_(EntryPoint('op', 'datalad.test', 'os.path').load(), op)
+    eq_(EntryPoint('join', 'datalad.test', 'os : path.join [extra]').load(),
+        op.join)
+
+
+@with_tempfile(mkdir=True)
+def test_iter_entry_points(cachedir):
+    entrypoints._get_entry_points.cache_clear()
+    try:
+        with patch_config({'datalad.locations.cache': cachedir}), \
+                patch.object(entrypoints, '_discover',
+                             wraps=entrypoints._discover) as discover:
+            # datalad declares its own metadata extractors
+            eps = {ep.name: ep for ep in
+                   iter_entry_points('datalad.metadata.extractors')}
+            assert_in('datalad_core', eps)
+            eq_(eps['datalad_core'].group, 'datalad.metadata.extractors')
+            eq_([ep.name for ep in iter_entry_points(
+                    'datalad.metadata.extractors', 'annex')],
+                ['annex'])
+            eq_(list(iter_entry_points('datalad.nonexistent')), [])
+            ok_(op.exists(op.join(cachedir, 'entrypoints.json')))
+            # memoized
+            list(iter_entry_points('datalad.metadata.extractors'))
+            eq_(discover.call_count, 1)
+
+            # a new process would read the cache
+            entrypoints._get_entry_points.cache_clear()
+            eq_([ep.value for ep in
+                 iter_entry_points('datalad.metadata.extractors')],
+                [ep.value for ep in eps.values()])
+            eq_(discover.call_count, 1)
+
+            # but not after the installed distributions changed
+            entrypoints._get_entry_points.cache_clear()
+            with patch.object(entrypoints, 'get_environment_fingerprint',
+                              return_value='changed'):
+                list(iter_entry_points('datalad.metadata.extractors'))
+            eq_(discover.call_count, 2)
+    finally:
+        entrypoints._get_entry_points.cache_clear()
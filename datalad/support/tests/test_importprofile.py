@@ -0,0 +1,57 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for import time profiling"""
+
+import os
+import sys
+from subprocess import (
+    PIPE,
+    run,
+)
+
+from ...tests.utils import (
+    assert_in,
+    assert_not_in,
+    eq_,
+    ok_,
+    with_tempfile,
+)
+
+
+def _run_python(code, profile):
+    env = os.environ.copy()
+    if profile is None:
+        env.pop('DATALAD_PROFILE_IMPORTS', None)
+    else:
+        env['DATALAD_PROFILE_IMPORTS'] = profile
+    return run([sys.executable, '-c', code], env=env, stdout=PIPE,
+               stderr=PIPE, universal_newlines=True, check=True)
+
+
+@with_tempfile
+def test_profile_imports(path):
+    code = "import datalad, sys; " \
+           "print('datalad.support.importprofile' in sys.modules)"
+    eq_(_run_python(code, None).stdout.strip(), 'False')
+
+    proc = _run_python(code, '1')
+    eq_(proc.stdout.strip(), 'True')
+    assert_in('Slowest modules', proc.stderr)
+    assert_in('datalad.config', proc.stderr)
+
+    proc = _run_python(code, path)
+    assert_not_in('Slowest modules', proc.stderr)
+    with open(path) as f:
+        lines = [l.rstrip('\n').split('\t') for l in f]
+    eq_(lines[0], ['module', 'cumulative_ms', 'self_ms'])
+    times = {l[0]: (float(l[1]), float(l[2])) for l in lines[1:]}
+    # imported by datalad itself
+    assert_in('datalad.config', times)
+    cumulative, self_time = times['datalad.config']
+    ok_(0 <= self_time <= cumulative)
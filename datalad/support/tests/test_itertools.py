@@ -0,0 +1,17 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+
+from ..itertools import groupby_sorted
+from ...tests.utils import eq_
+
+
+def test_groupby_sorted():
+    eq_([(k, list(v)) for k, v in groupby_sorted('abab')],
+        [('a', ['a', 'a']), ('b', ['b', 'b'])])
+
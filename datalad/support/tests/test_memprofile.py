@@ -0,0 +1,73 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for memory profiling of commands"""
+
+from io import StringIO
+
+from datalad import cfg as dlcfg
+from ..memprofile import (
+    MemoryProfiler,
+    get_rss,
+    profile_results,
+)
+from ...tests.utils import (
+    SkipTest,
+    assert_greater,
+    assert_in,
+    eq_,
+    ok_,
+    patch_config,
+)
+from ...utils import swallow_outputs
+
+
+def test_memory_profiler():
+    if get_rss() is None:
+        raise SkipTest("RSS cannot be determined on this system")
+    profiler = MemoryProfiler(trace_allocations=True)
+    profiler.start()
+    profiler.checkpoint('/ds/a')
+    # touch every page to make it resident
+    blob = bytearray(b'x' * (64 * 1048576))
+    profiler.checkpoint('/ds/b')
+    del blob
+    profiler.checkpoint(None)
+    profiler.stop()
+
+    eq_(profiler.ncheckpoints, 3)
+    eq_(sorted(profiler.label_peaks), ['/ds/a', '/ds/b'])
+    assert_greater(profiler.label_peaks['/ds/b'],
+                   profiler.start_rss + 32 * 1048576)
+    ok_(profiler.peak_rss >= profiler.label_peaks['/ds/b'])
+    # the allocation is the largest one at the peak of traced memory
+    top = profiler.get_top_allocations()
+    eq_(top[0].traceback[0].filename, __file__)
+    assert_greater(top[0].size, 64 * 1048576)
+
+    out = StringIO()
+    profiler.write_report(out, title='Test')
+    report = out.getvalue()
+    assert_in('Memory use during Test: peak RSS', report)
+    assert_in('Peak RSS per dataset (3 results)', report)
+    assert_in('/ds/b', report)
+    assert_in('test_memprofile.py', report)
+
+
+def test_profile_results():
+    results = [
+        dict(path='/ds', type='dataset', status='ok'),
+        dict(path='/ds/file', parentds='/ds', type='file', status='ok'),
+    ]
+    ok_(profile_results(results, 'Test', dlcfg) is results)
+    with patch_config({'datalad.runtime.profile-memory': 'rss'}), \
+            swallow_outputs() as cmo:
+        eq_(list(profile_results(results, 'Test', dlcfg)), results)
+        if get_rss() is not None:
+            assert_in('Memory use during Test', cmo.err)
+            assert_in('  /ds\n', cmo.err)
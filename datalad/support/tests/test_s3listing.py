@@ -0,0 +1,176 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for S3 bucket listing snapshots"""
+
+import os.path as op
+from unittest.mock import (
+    MagicMock,
+    patch,
+)
+
+from ...tests.utils import (
+    assert_false,
+    assert_is_instance,
+    assert_true,
+    eq_,
+    patch_config,
+    SkipTest,
+    with_tempfile,
+)
+try:
+    from boto.s3.deletemarker import DeleteMarker
+    from boto.s3.key import Key
+except ImportError:
+    raise SkipTest
+
+from ..s3 import get_versioned_url
+from ..s3listing import (
+    S3BucketSnapshot,
+    _get_prefix_upper_bound,
+    get_bucket_snapshot,
+)
+from ...downloaders.s3 import S3Downloader
+
+
+def _mk_entry(cls, name, version_id, is_latest, last_modified, size=None):
+    entry = cls(bucket=None, name=name)
+    entry.version_id = version_id
+    entry.is_latest = is_latest
+    entry.last_modified = last_modified
+    if size is not None:
+        entry.size = size
+        entry.etag = '"etag-%s"' % version_id
+    return entry
+
+
+def _get_entries():
+    return [
+        _mk_entry(Key, 'd/a', 'va1', True, '2020-01-02T00:00:00.000Z', 2),
+        _mk_entry(Key, 'd/a', 'va0', False, '2020-01-01T00:00:00.000Z', 1),
+        _mk_entry(DeleteMarker, 'd/b', 'vb1', True, '2020-01-02T00:00:00.000Z'),
+        _mk_entry(Key, 'd/b', 'vb0', False, '2020-01-01T00:00:00.000Z', 3),
+        # anything else is passed through only
+        'd/sub/',
+    ]
+
+
+@with_tempfile(mkdir=True)
+def test_bucket_snapshot(path):
+    dbpath = op.join(path, 'bucket.sqlite')
+    snapshot = S3BucketSnapshot('bucket', path=dbpath, ttl=100)
+    eq_(snapshot.get_listing('d/a'), None)
+    eq_(snapshot.get_key('d/a'), False)
+
+    entries = _get_entries()
+    eq_(list(snapshot.record(iter(entries), 'd/')), entries)
+    eq_(snapshot.get_listing('d/a')['prefix'], 'd/')
+
+    key = snapshot.get_key('d/a')
+    assert_is_instance(key, Key)
+    eq_((key.version_id, key.size, key.etag), ('va1', 2, '"etag-va1"'))
+    eq_(snapshot.get_key('d/a', version_id='va0').size, 1)
+    # deleted, but its older version is known
+    eq_(snapshot.get_key('d/b'), None)
+    eq_(snapshot.get_key('d/b', version_id='vb0').size, 3)
+    # covered, but does not exist
+    eq_(snapshot.get_key('d/c'), None)
+    eq_(snapshot.get_versions('d/c'), [])
+    # not covered
+    eq_(snapshot.get_key('e/a'), False)
+    eq_(snapshot.get_versions('e/a'), None)
+    eq_(sorted(v.version_id for v in snapshot.get_versions('d/b')),
+        ['vb0', 'vb1'])
+
+    # a partially consumed listing is not recorded
+    gen = snapshot.record(iter(_get_entries()), 'e/')
+    next(gen)
+    gen.close()
+    eq_(snapshot.get_listing('e/a'), None)
+    # and did not spoil the previous one
+    eq_(snapshot.get_key('d/a').version_id, 'va1')
+
+    # a new listing replaces the previous one
+    list(snapshot.record(iter(_get_entries()[:2]), 'd/'))
+    eq_(snapshot.get_key('d/b', version_id='vb0'), None)
+
+    # listing of keys only does not know about versions
+    list(snapshot.record(iter(_get_entries()[:1]), 'k/', versioned=False))
+    eq_(snapshot.get_key('d/a', version_id='va1').size, 2)
+    eq_(snapshot.get_key('k/a', version_id='va1'), False)
+
+    # only keys under the prefix are replaced
+    list(snapshot.record(
+        iter([_mk_entry(Key, 'd0', 'v', True, '2020-01-01T00:00:00.000Z', 1)]),
+        'd0'))
+    list(snapshot.record(iter([]), 'd/'))
+    eq_(snapshot.get_versions('d/a'), [])
+    eq_(snapshot.get_key('d0').size, 1)
+    # an empty prefix covers everything
+    list(snapshot.record(iter([]), ''))
+    eq_(snapshot.get_key('d0'), None)
+    snapshot.close()
+
+    # expired or disabled
+    assert_false(S3BucketSnapshot('bucket', path=dbpath, ttl=0)
+                 .get_listing('d/a'))
+
+
+def test_prefix_upper_bound():
+    eq_(_get_prefix_upper_bound(''), None)
+    eq_(_get_prefix_upper_bound('d/'), 'd0')
+    eq_(_get_prefix_upper_bound('d' + chr(0x10FFFF)), 'e')
+
+
+@with_tempfile(mkdir=True)
+def test_get_bucket_snapshot(path):
+    with patch_config({'datalad.s3.listing-cache-ttl': '0'}):
+        eq_(get_bucket_snapshot('bucket'), None)
+    with patch_config({'datalad.s3.listing-cache-ttl': '100',
+                       'datalad.locations.cache': path}):
+        snapshot = get_bucket_snapshot('bucket')
+        eq_(snapshot.path, op.join(path, 's3listing', 'bucket.sqlite'))
+        # reused, along with its connection
+        assert_true(get_bucket_snapshot('bucket') is snapshot)
+        assert_false(get_bucket_snapshot('other') is snapshot)
+
+
+@with_tempfile(mkdir=True)
+def test_bucket_snapshot_queries(path):
+    snapshot = S3BucketSnapshot(
+        'bucket', path=op.join(path, 'bucket.sqlite'), ttl=100)
+    list(snapshot.record(iter(_get_entries()), 'd/'))
+
+    bucket = MagicMock()
+    bucket.name = 'bucket'
+    bucket.get_versioning_status.return_value = {'Versioning': 'Enabled'}
+    conn = MagicMock()
+    conn.get_bucket.return_value = bucket
+
+    with patch('datalad.support.s3listing.get_bucket_snapshot',
+               return_value=snapshot):
+        eq_(get_versioned_url('http://bucket.s3.amazonaws.com/d/a',
+                              s3conn=conn),
+            'http://bucket.s3.amazonaws.com/d/a?versionId=va1')
+        # not covered by the snapshot
+        bucket.list_versions.side_effect = lambda p: [
+            _mk_entry(Key, p, 'vx', True, '2020-01-01T00:00:00.000Z', 1)]
+        eq_(get_versioned_url('http://bucket.s3.amazonaws.com/x',
+                              s3conn=conn),
+            'http://bucket.s3.amazonaws.com/x?versionId=vx')
+        bucket.list_versions.assert_called_once_with('x')
+
+    downloader = S3Downloader()
+    downloader._bucket = bucket
+    with patch('datalad.downloaders.s3.get_bucket_snapshot',
+               return_value=snapshot):
+        session = downloader.get_downloader_session('s3://bucket/d/a')
+        eq_(session.size, 2)
+        eq_(session.headers['Last-Modified'], 1577923200)
+        eq_(downloader._get_key('d/b'), None)
+    bucket.get_key.assert_not_called()
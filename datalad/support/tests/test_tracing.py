@@ -0,0 +1,131 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for performance tracing"""
+
+import json
+import os
+import os.path as op
+import sys
+from unittest.mock import patch
+
+from .. import tracing
+from ..parallel import ProducerConsumer
+from ..tracing import (
+    Tracer,
+    trace_generator_function,
+    trace_span,
+)
+from ...cmd import (
+    StdOutErrCapture,
+    WitlessRunner,
+)
+from ...tests.utils import (
+    assert_greater_equal,
+    assert_in,
+    assert_not_in,
+    eq_,
+    ok_,
+    with_tempfile,
+)
+
+
+def test_tracing_disabled():
+    with patch.object(tracing, '_tracer', False):
+        with trace_span('some', 'test', value=1) as span:
+            eq_(span, None)
+
+        def gen():
+            yield 1
+        ok_(trace_generator_function(gen, 'gen', 'test') is gen)
+
+
+@with_tempfile
+def test_tracing(path):
+    tracer = Tracer(path)
+    with patch.object(tracing, '_tracer', tracer):
+        with trace_span('outer', 'test', value=1, obj=object(),
+                        long='x' * 1000) as span:
+            span['late'] = 'info'
+            out = WitlessRunner().run(
+                [sys.executable, '-c', 'print("123")'],
+                protocol=StdOutErrCapture)
+        eq_(out['stdout'].strip(), '123')
+        ok_('_nbytes' not in out)
+
+        def gen(n):
+            yield from range(n)
+        eq_(list(trace_generator_function(gen, 'gen', 'test', n=3)(3)),
+            [0, 1, 2])
+
+        eq_(sorted(ProducerConsumer(range(4), lambda i: i * 2, jobs=2)),
+            [0, 2, 4, 6])
+    tracer.close()
+    with open(path) as f:
+        events = json.load(f)
+
+    spans = {}
+    for e in events:
+        if e['ph'] == 'X':
+            spans.setdefault(e['name'], []).append(e)
+    outer = spans['outer'][0]
+    eq_(outer['cat'], 'test')
+    eq_(outer['args']['value'], 1)
+    eq_(outer['args']['late'], 'info')
+    assert_in('object', outer['args']['obj'])
+    eq_(len(outer['args']['long']), 500)
+
+    runs = [e for e in events if e.get('cat') == 'run']
+    eq_(len(runs), 1)
+    run = runs[0]
+    eq_(run['args']['code'], 0)
+    assert_greater_equal(run['args']['stdout_bytes'], 4)
+    # nested in the outer span
+    ok_(outer['ts'] <= run['ts'])
+    ok_(run['ts'] + run['dur'] <= outer['ts'] + outer['dur'])
+
+    eq_(spans['gen'][0]['args']['n_items'], 3)
+    eq_(sorted(e['args']['args'] for e in spans['<lambda>']),
+        [0, 1, 2, 3])
+    eq_({e['cat'] for e in spans['<lambda>']}, {'job'})
+    # thread names are reported
+    assert_in('MainThread',
+              [e['args']['name'] for e in events if e['ph'] == 'M'])
+
+
+@with_tempfile(mkdir=True)
+def test_tracer_per_process(path):
+    trace_file = op.join(path, 'trace.json')
+    code = (
+        'from datalad.support.tracing import get_tracer, trace_span; '
+        'print(get_tracer().path); '
+        'trace_span("child", "test").__enter__()')
+    env = {'DATALAD_TRACE_FILE': trace_file}
+    with patch.dict(os.environ, env), \
+            patch.object(tracing, '_tracer', None):
+        os.environ.pop(tracing._ROOT_PID_VAR, None)
+        tracer = tracing.get_tracer()
+        eq_(tracer.path, trace_file)
+        # a process started by the traced one does not overwrite its trace
+        out = WitlessRunner().run(
+            [sys.executable, '-c', code], protocol=StdOutErrCapture)
+        tracer.close()
+        child_file = out['stdout'].strip()
+        ok_(child_file != trace_file)
+        ok_(child_file.startswith(op.join(path, 'trace.')))
+        ok_(child_file.endswith('.json'))
+        with open(trace_file) as f:
+            json.load(f)
+
+        # an explicit placeholder is respected
+        os.environ['DATALAD_TRACE_FILE'] = op.join(path, 'trace-{pid}.json')
+        out = WitlessRunner().run(
+            [sys.executable, '-c', code], protocol=StdOutErrCapture)
+        assert_in(op.join(path, 'trace-'), out['stdout'])
+        assert_not_in('.json.', out['stdout'])
+        os.environ.pop(tracing._ROOT_PID_VAR, None)
@@ -0,0 +1,240 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Opt-in tracing of where time is spent
+
+If the configuration variable `datalad.trace.file` (or the environment
+variable DATALAD_TRACE_FILE) names a file, spans of all external command
+executions (`WitlessRunner.run`), DataLad command calls (`eval_results`),
+and `ProducerConsumer` jobs are written to it in the Chrome trace event
+format. Such a file can be inspected with chrome://tracing,
+https://ui.perfetto.dev, or speedscope. A '{pid}' placeholder in the file
+name is replaced by the ID of the tracing process. Without it, only the
+first traced process writes to the given file, and any process started by
+it (including forked worker processes) writes to a file with its process
+ID inserted before the extension (e.g. 'trace.1234.json').
+
+Events are written as they happen, using the JSON array variant of the
+format. The closing bracket is only added on exit, which is also accepted
+by trace viewers if a process did not exit cleanly.
+"""
+
+import atexit
+import json
+import os
+import os.path as op
+import threading
+import time
+from contextlib import contextmanager
+
+import logging
+lgr = logging.getLogger('datalad.support.tracing')
+
+# None if not yet determined, False if tracing is disabled
+_tracer = None
+_lock = threading.Lock()
+# environment variable that passes the ID of the first traced process on to
+# the processes it starts (not a DATALAD_ variable, as these are config)
+_ROOT_PID_VAR = '_DATALAD_TRACE_ROOT_PID'
+
+
+class Tracer(object):
+    """Writes spans as Chrome trace events to a file
+
+    Parameters
+    ----------
+    path : str
+      File to write the trace to. Any existing file is overwritten.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w')
+        self._file.write('[')
+        self._nevents = 0
+        self._pid = os.getpid()
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._encode = json.JSONEncoder(default=str).encode
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            # a forked process must neither write buffered events of its
+            # parent again, nor write to its file at all
+            os.register_at_fork(
+                before=self._flush, after_in_child=self._detach)
+
+    def _flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def _detach(self):
+        self._file = None
+        self._lock = threading.Lock()
+
+    def add_span(self, name, cat, start, duration, args):
+        """Record a span
+
+        Parameters
+        ----------
+        name : str
+        cat : str
+          Category of the span, e.g. 'run' or 'command'.
+        start : float
+          Time the span started, in seconds since the epoch.
+        duration : float
+          In seconds.
+        args : dict
+          Any additional information on the span.
+        """
+        tid = threading.get_ident()
+        events = []
+        if tid not in self._threads:
+            self._threads.add(tid)
+            # give the thread a readable name in the viewer
+            events.append(dict(
+                name='thread_name', ph='M', pid=self._pid, tid=tid,
+                args=dict(name=threading.current_thread().name)))
+        events.append(dict(
+            name=name, cat=cat, ph='X', pid=self._pid, tid=tid,
+            # microseconds
+            ts=round(start * 1e6), dur=round(duration * 1e6),
+            args=args))
+        with self._lock:
+            if self._file is None:
+                return
+            for e in events:
+                self._file.write(',\n' if self._nevents else '\n')
+                self._file.write(self._encode(e))
+                self._nevents += 1
+            # worker processes may exit without running atexit handlers
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write('\n]\n')
+            self._file.close()
+            self._file = None
+
+
+def get_tracer():
+    """Return the Tracer of this process, or None if tracing is disabled"""
+    global _tracer
+    if _tracer and _tracer._pid != os.getpid():
+        # forked from a traced process, trace into a file of our own
+        _tracer = None
+    if _tracer is None:
+        path = os.environ.get('DATALAD_TRACE_FILE', None)
+        if path is None:
+            try:
+                from datalad import cfg
+            except ImportError:
+                # we are called while the configuration is loaded, no
+                # decision can be made yet
+                return None
+            path = cfg.get('datalad.trace.file', None)
+        with _lock:
+            if _tracer is None:
+                _tracer = False
+                if path:
+                    _tracer = _create_tracer(path)
+    return _tracer or None
+
+
+def _create_tracer(path):
+    pid = str(os.getpid())
+    root_pid = os.environ.get(_ROOT_PID_VAR)
+    if root_pid is None:
+        os.environ[_ROOT_PID_VAR] = pid
+    elif root_pid != pid and '{pid}' not in path:
+        # do not overwrite the trace of the process that started us
+        base, ext = op.splitext(path)
+        path = base + '.{pid}' + ext
+    path = path.format(pid=pid)
+    try:
+        tracer = Tracer(path)
+    except OSError as e:
+        lgr.warning("Cannot write trace to %s: %s", path, e)
+        return False
+    lgr.debug("Writing trace to %s", path)
+    return tracer
+
+
+def _summarize(value, maxlen=500):
+    """Return a JSON-compatible representation of a value of limited size"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    value = str(value)
+    return value if len(value) <= maxlen else value[:maxlen - 3] + '...'
+
+
+@contextmanager
+def trace_span(name, cat, **args):
+    """Context manager to record a span, if tracing is enabled
+
+    Parameters
+    ----------
+    name : str
+    cat : str
+      Category of the span.
+    **args
+      Any additional information on the span. Values other than numbers
+      are converted to (possibly truncated) strings.
+
+    Yields
+    ------
+    dict or None
+      Information on the span, which can be amended with information that
+      is only available at its end, or None if tracing is disabled.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    args = {k: _summarize(v) for k, v in args.items()}
+    start = time.time()
+    start_counter = time.perf_counter()
+    try:
+        yield args
+    finally:
+        tracer.add_span(
+            name, cat, start, time.perf_counter() - start_counter, args)
+
+
+def trace_generator_function(func, name, cat, **args):
+    """Wrap a generator function to record a span for its execution
+
+    The span covers the entire iteration over the generator, and reports
+    the number of items it yielded.
+
+    Parameters
+    ----------
+    func : callable
+      Generator function.
+    name : str
+    cat : str
+      Category of the span.
+    **args
+      Any additional information on the span.
+
+    Returns
+    -------
+    callable
+      `func` itself if tracing is disabled.
+    """
+    if get_tracer() is None:
+        return func
+
+    def traced(*_args, **_kwargs):
+        with trace_span(name, cat, **args) as span:
+            span['n_items'] = 0
+            for item in func(*_args, **_kwargs):
+                span['n_items'] += 1
+                yield item
+    return traced
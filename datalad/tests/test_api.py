@@ -16,6 +16,7 @@ from datalad.tests.utils import SkipTest
 from datalad.tests.utils import eq_
 
 from datalad.tests.utils import assert_in
+from datalad.tests.utils import with_tree
 
 
 def test_basic_setup():
@@ -34,6 +35,82 @@ def test_basic_setup():
     assert_in('Parameters', api.Dataset.create.__doc__)
 
 
+def test_lazy_loading():
+    import sys
+    from datalad.cmd import (
+        StdOutErrCapture,
+        WitlessRunner,
+    )
+    out = WitlessRunner().run(
+        [sys.executable, '-c',
+         'import sys; import datalad.api as api; '
+         'print("datalad.plugin.addurls" in sys.modules); '
+         'api.addurls; '
+         'print("datalad.plugin.addurls" in sys.modules); '
+         'print("datalad.distribution.get" in sys.modules)'],
+        protocol=StdOutErrCapture)
+    eq_(out['stdout'].split(), ['False', 'True', 'False'])
+
+    from datalad import api
+    assert_in('addurls', dir(api))
+    assert_in('get', api.__all__)
+    # the summary of all commands is generated on demand
+    assert_in('Commands for dataset operations', api.__doc__)
+
+
+_fake_extension = {
+    'dlext_fake': {
+        '__init__.py': """
+command_suite = (
+    'Fake extension',
+    [('dlext_fake.cmd', 'FakeCmd', 'fake-cmd', 'fake_cmd')],
+)
+""",
+        'cmd.py': """
+from datalad.interface.base import Interface, build_doc
+from datalad.distribution.dataset import datasetmethod
+
+
+@build_doc
+class FakeCmd(Interface):
+    \"\"\"Fake command\"\"\"
+    _params_ = {}
+
+    @staticmethod
+    @datasetmethod(name='fake_cmd')
+    def __call__(dataset=None):
+        return 'fake called'
+""",
+    },
+}
+
+
+@with_tree(tree=_fake_extension)
+def test_extension_datasetmethod(path):
+    import sys
+    from datalad.cmd import (
+        StdOutErrCapture,
+        WitlessRunner,
+    )
+    out = WitlessRunner().run(
+        [sys.executable, '-c',
+         'import sys; sys.path.insert(0, sys.argv[1]); '
+         'from importlib.metadata import EntryPoint; '
+         'from unittest.mock import patch; '
+         'import datalad.support.entrypoints as e; '
+         'ep = EntryPoint("fake", "dlext_fake:command_suite", '
+         '"datalad.extensions"); '
+         'patch.object(e, "iter_entry_points", '
+         'lambda group, name=None: iter('
+         '[ep] if group == "datalad.extensions" else [])).start(); '
+         'import datalad.api; '
+         'from datalad.distribution.dataset import Dataset; '
+         'print(Dataset(sys.argv[1]).fake_cmd())',
+         path],
+        protocol=StdOutErrCapture)
+    eq_(out['stdout'].strip(), 'fake called')
+
+
 def _test_consistent_order_of_args(intf, spec_posargs):
     f = getattr(intf, '__call__')
     args, varargs, varkw, defaults = getargspec(f)
@@ -11,9 +11,15 @@
 """
 
 from datalad.support.network import URL
-from datalad.support.s3 import add_version_to_url, get_versioned_url
+from datalad.support.s3 import (
+    add_version_to_url,
+    get_versioned_url,
+    get_versioned_urls,
+)
 from datalad.tests.utils import (
+    assert_false,
     assert_raises,
+    assert_true,
     eq_,
     ok_startswith,
     skip_if_no_network,
@@ -111,3 +117,72 @@ def test_version_url_deleted():
     eq_(get_versioned_url(url), turl)
     # too heavy for verification!
     #eq_(get_versioned_url(url, verify=True), turl)
+
+
+def test_get_versioned_urls():
+    from unittest.mock import MagicMock
+    from boto.s3.deletemarker import DeleteMarker
+    from boto.s3.key import Key
+
+    def version(cls, name, version_id, last_modified, is_latest=False):
+        v = cls(name=name)
+        v.version_id = version_id
+        v.last_modified = last_modified
+        v.is_latest = is_latest
+        return v
+
+    versions = [
+        version(Key, 'd/a', 'a1', '2020-01-01'),
+        version(Key, 'd/a', 'a2', '2020-01-02', is_latest=True),
+        version(Key, 'd/ab', 'ab1', '2020-01-01', is_latest=True),
+        version(Key, 'd/b', 'b1', '2020-01-01'),
+        version(DeleteMarker, 'd/b', 'b2', '2020-01-02', is_latest=True),
+        version(DeleteMarker, 'd/c', 'c1', '2020-01-01', is_latest=True),
+        version(Key, 'e', 'e1', '2020-01-01', is_latest=True),
+    ]
+    bucket = MagicMock()
+    bucket.get_versioning_status.return_value = {'Versioning': 'Enabled'}
+    bucket.list_versions.side_effect = \
+        lambda prefix='', delimiter='': [
+            v for v in versions if v.name.startswith(prefix)]
+    s3conn = MagicMock()
+    s3conn.get_bucket.return_value = bucket
+
+    base = 'http://bucket.s3.amazonaws.com/'
+    urls = [base + 'd/a', base + 'd/a?k=v', base + 'd/b', base + 'd/c',
+            base + 'e', base + 'e?versionId=old', 'http://example.com/f',
+            's3://bucket/e', 's3://bucket/e?versionId=old']
+    target = {
+        base + 'd/a': base + 'd/a?versionId=a2',
+        base + 'd/a?k=v': base + 'd/a?k=v&versionId=a2',
+        # latest non-deleted version
+        base + 'd/b': base + 'd/b?versionId=b1',
+        base + 'e': base + 'e?versionId=e1',
+        # already versioned
+        base + 'e?versionId=old': base + 'e?versionId=old',
+        's3://bucket/e?versionId=old': 's3://bucket/e?versionId=old',
+        # not on S3
+        'http://example.com/f': 'http://example.com/f',
+    }
+    for prefix_min_keys in (10, 1):
+        res = get_versioned_urls(urls, s3conn=s3conn,
+                                 prefix_min_keys=prefix_min_keys)
+        eq_({u: v for u, v in res.items() if not isinstance(v, Exception)},
+            target)
+        # deleted
+        assert_true(isinstance(res[base + 'd/c'], ValueError))
+        assert_true(isinstance(res['s3://bucket/e'], NotImplementedError))
+        # a single connection, and versioning status check
+        s3conn.get_bucket.assert_called_once_with('bucket')
+        bucket.get_versioning_status.assert_called_once_with()
+        # one request per key, or one per directory
+        eq_(bucket.list_versions.call_count,
+            4 if prefix_min_keys == 10 else 2)
+        # also resets the bucket
+        s3conn.get_bucket.reset_mock()
+
+    # no lookups without versioning
+    bucket.get_versioning_status.return_value = {}
+    res = get_versioned_urls([base + 'd/a'], s3conn=s3conn)
+    eq_(res, {base + 'd/a': base + 'd/a'})
+    assert_false(bucket.list_versions.called)
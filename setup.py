@@ -69,7 +69,7 @@ requires = {
         'mutagen>=1.36',  # audio metadata
         'exifread',  # EXIF metadata
         'python-xmp-toolkit',  # XMP metadata, also requires 'exempi' to be available locally
-        'Pillow',  # generic image metadata
+        'Pillow>=7.0',  # generic image metadata
     ],
     'duecredit': [
         'duecredit',  # needs >= 0.6.6 to be usable, but should be "safe" with prior ones